@@ -2,22 +2,135 @@ import streamlit as st
 import google.generativeai as genai
 import os
 import json
+import time
 from streamlit_agraph import agraph, Node, Edge, Config
 from dotenv import load_dotenv
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+from extraction_cache import ExtractionCache, extraction_key
+from sectioned_extraction import SectionedExtraction
+from shared_graph import GraphStore
+from graph_index import GraphIndex
+from extraction import GraphStreamParser, prepare_contents
+from extraction_jobs import JobManager, JobRejected, blocking_work, sections_work, streaming_work
+from inference_rules import default_rules
+from ip_filter import check_access, get_rate_limiter
+from layout import force_layout
+from level_of_detail import DEFAULT_LOD_THRESHOLD, build_lod_elements, lod_applies
+from metrics import deep_sizeof, metrics, start_metrics_server
+from graph_logic import COLOR_MAP, SPACING_LEVELS, calculate_node_size
+from prompts import SYSTEM_PROMPT, EXTRACTION_PROMPT
+from view_cache import ViewCache
+from views import build_network_config, create_sankey_diagram, create_skills_matrix
+
+# Début du rerun (durée totale exportée en fin de script)
+rerun_started_at = time.perf_counter()
+
+# Configuration de la page (doit être la première commande Streamlit)
+st.set_page_config(
+    page_title="AI Knowledge Graph CV Builder",
+    page_icon="🌐",
+    layout="wide"
+)
 
-# Chargement des variables d'env
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
+# Portée maximale du focus (sauts)
+MAX_FOCUS_HOPS = 4
+
+# Résultats affichés par la recherche de nœud
+SEARCH_RESULTS = 10
+
+# Sources d'importance proposées (taille des nœuds, flux du Sankey, poids de la matrice)
+IMPORTANCE_LABELS = {"LLM (Gemini)": "llm", "PageRank": "pagerank", "Betweenness": "betweenness"}
+
+# Intervalle de sondage d'une extraction en tâche de fond (secondes)
+JOB_POLL_INTERVAL = 0.5
+
+# --- RESSOURCES PAR PROCESS (créées une seule fois, pas à chaque rerun) ---
+
+@st.cache_resource
+def init_gemini():
+    """Charge les variables d'env et configure le client Gemini"""
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if api_key:
+        genai.configure(api_key=api_key)
+    return api_key
+
+@st.cache_resource
+def get_gemini_model(model_name):
+    """Modèle Gemini partagé par toutes les sessions (un par nom de modèle)"""
+    return genai.GenerativeModel(f'models/{model_name}', system_instruction=SYSTEM_PROMPT)
+
+@st.cache_resource
+def get_network_config(spacing_level, static_layout=False):
+    """Configuration agraph par niveau d'espacement (et mode de layout)"""
+    return build_network_config(spacing_level, static_layout)
+
+@st.cache_resource
+def get_extraction_cache():
+    """Cache d'extraction partagé par toutes les sessions du process"""
+    return ExtractionCache()
+
+@st.cache_resource
+def get_view_cache():
+    """Figures et payloads agraph partagés entre sessions, indexés par version du graphe"""
+    return ViewCache(max_entries=128)
+
+@st.cache_resource
+def get_job_manager():
+    """Pool d'extraction du process : concurrence bornée pour toutes les sessions"""
+    return JobManager()
+
+@st.cache_resource
+def get_graph_store():
+    """Graphes figés partagés entre sessions (démo, CV déjà analysés), avec leur index"""
+    return GraphStore(max_entries=32)
+
+@st.cache_resource
+def get_demo_graph():
+    """Démo chargée une seule fois par process, figée et épinglée ; None si le fichier manque"""
+    demo_path = os.path.join(os.path.dirname(__file__), "demo_cv_data.json")
+    if not os.path.exists(demo_path):
+        return None
+    with open(demo_path, 'r', encoding='utf-8') as f:
+        shared = get_graph_store().share(json.load(f), pin=True)
+    warm_views(shared.index)
+    return shared
+
+@st.cache_resource
+def get_metrics_server():
+    """Endpoint /metrics local (Prometheus) et stats des caches, une fois par process"""
+    metrics.register_collector("extraction_cache", lambda: get_extraction_cache().stats(),
+                               counters=("memory_hits", "disk_hits", "hits", "misses", "writes", "evictions",
+                                         "seconds_saved"))
+    metrics.register_collector("view_cache", lambda: get_view_cache().stats(),
+                               counters=("hits", "misses", "evictions"))
+    metrics.register_collector("graph_store", lambda: get_graph_store().stats(), counters=("hits", "misses"))
+    metrics.register_collector("extraction_jobs", lambda: get_job_manager().stats(),
+                               counters=("submitted", "rejected", "done", "failed", "cancelled", "timeout"))
+    metrics.register_collector("rate_limit", lambda: get_rate_limiter().stats(),
+                               counters=("allowed", "limited", "evictions"))
+    return start_metrics_server(metrics)
+
+def record_session_memory(min_interval=30.0):
+    """Taille mémoire de la session (graphe, index, jobs) : recalculée au plus toutes les 30 s"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    now = time.monotonic()
+    if ctx is None or now - st.session_state.get('memory_measured_at', -min_interval) < min_interval:
+        return
+    st.session_state.memory_measured_at = now
+    state = {key: st.session_state[key] for key in st.session_state}
+    # Les graphes partagés (démo...) ne sont pas comptés dans la session qui les référence
+    metrics.set_session_memory(ctx.session_id, deep_sizeof(state, exclude=get_graph_store().shared_objects()))
+
+get_metrics_server()
+# Bots bloqués et rate limit par IP, avant tout travail pour la session
+check_access()
+api_key = init_gemini()
 
 if not api_key:
     st.error("api key missing ! configure google_api_key.")
     st.stop()
 
-genai.configure(api_key=api_key)
-
 # Initialisation de la mémoire pour éviter de relancer Gemini au clic
 if "graph_data" not in st.session_state:
     st.session_state.graph_data = None
@@ -28,595 +141,179 @@ if "gemini_model" not in st.session_state:
 if "viz_mode" not in st.session_state:
     st.session_state.viz_mode = "Network Graph"
 if "show_uploader" not in st.session_state:
-    st.session_state.show_uploader = False
-
-
+    # Arrivée depuis la démo statique (lien « Upload Your Own CV » -> ?upload=1) : uploader ouvert d'emblée
+    st.session_state.show_uploader = st.query_params.get("upload") == "1"
+
+
+
+def get_view(index, name, params, builder):
+    """Vue mémoïsée sur (version du graphe, vue, paramètres de la vue)"""
+    def timed_builder():
+        # Chronométré seulement quand la vue est réellement construite (miss)
+        with metrics.timer("view", view=name):
+            return builder()
+    return get_view_cache().get_or_build((index.version, name) + params, timed_builder)
+
+def warm_views(index, spacing_level="Ultra Wide"):
+    """Précalcule les vues par défaut d'un graphe (tous types, sans focus) dans le cache partagé"""
+    selected_types = sorted(index.type_counts())
+    types_key = tuple(selected_types)
+    selection = index.select_types(selected_types)
+    threshold, lod_key = lod_settings(index, selected_types, True, "community", DEFAULT_LOD_THRESHOLD, frozenset())
+    get_view(index, 'network', (types_key, None, False, None, "llm", lod_key),
+             lambda: build_lod_elements(index, selected_types, threshold=threshold))
+    positions = get_view(index, 'layout', (spacing_level,), lambda: force_layout(index, spacing_level))
+    get_view(index, 'network', (types_key, None, False, spacing_level, "llm", lod_key),
+             lambda: build_lod_elements(index, selected_types, positions=positions, threshold=threshold))
+    get_view(index, 'sankey', (types_key, "llm"), lambda: create_sankey_diagram(selection.data()))
+    get_view(index, 'matrix', (types_key, "llm"), lambda: create_skills_matrix(index, selection.node_mask))
+
+def lod_settings(index, selected_types, enabled, group_by, threshold, expanded):
+    """(seuil effectif, clé de cache) du niveau de détail ; (None, None) quand le graphe est envoyé en entier"""
+    if not enabled or not lod_applies(index, selected_types, threshold):
+        return None, None
+    return threshold, (group_by, threshold, tuple(sorted(expanded)))
+
+def node_importance(index, source):
+    """Importance alignée sur index.nodes pour une source calculée, None pour celle du LLM (champ des nœuds)"""
+    return None if source == "llm" else index.analytics.importance(source)
 
 # Load demo CV by default for Dev.to challenge showcase
 if "demo_loaded" not in st.session_state:
     st.session_state.demo_loaded = False
 
-if st.session_state.graph_data is None and not st.session_state.demo_loaded:
-    # Load demo CV automatically
+if st.session_state.graph_data is None and not st.session_state.demo_loaded and not st.session_state.show_uploader:
+    # Load demo CV automatically (référence au graphe partagé du process, pas de copie)
     try:
-        demo_path = os.path.join(os.path.dirname(__file__), "demo_cv_data.json")
-        if os.path.exists(demo_path):
-            with open(demo_path, 'r', encoding='utf-8') as f:
-                st.session_state.graph_data = json.load(f)
-                st.session_state.demo_loaded = True
-                st.info("💡 **Demo Mode**: Pascal Cescato's CV loaded automatically. Upload your own to try it!")
+        demo_graph = get_demo_graph()
+        if demo_graph is not None:
+            st.session_state.graph_data = demo_graph.data
+            st.session_state.demo_loaded = True
+            st.info("💡 **Demo Mode**: Pascal Cescato's CV loaded automatically. Upload your own to try it!")
     except Exception as e:
         pass  # Si erreur, ignorer silencieusement
 
-SYSTEM_PROMPT = """You are an expert Knowledge Engineer analyzing professional CVs to create DENSE, INTERCONNECTED knowledge graphs.
-
-EXTRACTION STRATEGY:
-1. PERSON NODE: Create exactly ONE node for the candidate (use their name from CV)
-2. CORE SKILLS: Extract ALL significant technical skills mentioned (10-15 skills including languages, frameworks, tools)
-   - Include: Programming languages (Python, PHP, JavaScript, etc.)
-   - Include: Frameworks (Astro, Hugo, Django, etc.)
-   - Include: Tools (Docker, PostgreSQL, Git, etc.)
-   - Include: Methodologies (RAG, SSG, CI/CD, etc.)
-3. KEY PROJECTS: Identify ALL significant projects (5-8 projects)
-4. PROFESSIONAL ROLES: Extract all mentioned positions/companies (3-5 roles)
-5. EXPERTISE AREAS: Create 3-5 high-level concept nodes (e.g., "Web Performance", "AI Automation", "Migration Engineering")
-
-CRITICAL: DO NOT artificially limit extraction. If a CV lists 15 skills, extract all 15. Better to have complete information than arbitrary limits.
-
-relationshipsHIP STRATEGY - CREATE A DENSE GRAPH:
-
-LEVEL 1 - Direct relationshipships (Person-centric):
-- Person -> MASTERS -> Core Skills (for main expertise)
-- Person -> CREATED -> Key Projects
-- Person -> WORKED_AS -> Roles
-- Role -> AT_COMPANY -> Companies
-
-LEVEL 2 - Cross-connections (Project-centric):
-- Project -> USES -> Multiple Skills (list ALL technologies used in each project, minimum 3-5 per project)
-- Project -> DEMONSTRATES -> Concepts (what domain expertise it shows)
-- Project -> BUILT_WITH -> Specific tech stack
-
-LEVEL 3 - Skill interconnections (create the network effect):
-- Skill -> ENABLES -> Other Skill (e.g., "Python" enables "LLM Integration")
-- Skill -> PART_OF -> Concept (e.g., "Astro" is part of "SSG Ecosystem")
-- Concept -> IMPLEMENTED_IN -> Project
-
-LEVEL 4 - Transversal relationshipships (the magic):
-- Project -> RELATED_TO -> Project (if they share technologies or concepts)
-- Skill -> REQUIRED_FOR -> Role
-- Concept -> SPANS -> Multiple Projects
-
-LEVEL 5 - Technological relationshipships (CRITICAL FOR ACCURACY):
-- Technology Stack relationshipships:
-  * PHP -> ENABLES -> WordPress (WordPress is built with PHP)
-  * WordPress -> REQUIRES -> PHP (WordPress needs PHP to run)
-  * Docker -> REQUIRES -> Linux (Docker runs on Linux)
-  * NGINX/Apache -> RUNS_ON -> Linux
-  * PostgreSQL/MySQL -> RUNS_ON -> Linux
-  * Git -> ENABLES -> Collaboration/DevOps
-  
-- Framework/Language relationshipships:
-  * Astro/Hugo -> BUILT_WITH -> JavaScript/Go
-  * Python Libraries (lxml, Pillow) -> PART_OF -> Python
-  * SSG Frameworks -> ENABLES -> Web Performance
-  
-- Ecosystem relationshipships:
-  * Astro -> ALTERNATIVE_TO -> Hugo (both are SSG)
-  * PostgreSQL -> ALTERNATIVE_TO -> MySQL (both are databases)
-  * NGINX -> ALTERNATIVE_TO -> Apache (both are web servers)
-
-IMPORTANT: Add these technological relationshipships even if not explicitly stated in the CV.
-They are common knowledge relationshipships that enrich the graph's accuracy.
-
-LEVEL 6 - Bidirectional Concept-Project links (CRITICAL - MOST OFTEN FORGOTTEN):
-For EVERY concept identified, create IMPLEMENTED_IN relationshipships to ALL relevant projects:
-- Migration Engineering -> IMPLEMENTED_IN -> [all migration-related projects]
-- SSG Ecosystem -> IMPLEMENTED_IN -> [all SSG projects: wp2md, Hugo sites, Astro migrations]
-- AI Automation -> IMPLEMENTED_IN -> [all AI/LLM projects]
-- Web Performance -> IMPLEMENTED_IN -> [all performance-focused projects]
-- Data Engineering -> IMPLEMENTED_IN -> [all data pipeline/database projects]
-
-IMPORTANT EXAMPLES OF BIDIRECTIONAL relationshipsHIPS (ALWAYS CREATE BOTH):
-✅ wp2md -> DEMONSTRATES -> SSG Ecosystem (project shows concept)
-✅ SSG Ecosystem -> IMPLEMENTED_IN -> wp2md (concept realized in project)
-✅ wp2md -> DEMONSTRATES -> Migration Engineering
-✅ Migration Engineering -> IMPLEMENTED_IN -> wp2md
-✅ Newsletter Engine -> DEMONSTRATES -> AI Automation
-✅ AI Automation -> IMPLEMENTED_IN -> Newsletter Engine
-✅ WordPress to Astro -> DEMONSTRATES -> Web Performance
-✅ Web Performance -> IMPLEMENTED_IN -> WordPress to Astro
-
-ADDITIONAL VALUABLE relationshipsHIPS:
-- Person -> EXPERTISE_IN -> Concept (for main domains of expertise)
-- Skill -> PART_OF -> Expertise Area (e.g., LLM Integration -> PART_OF -> AI Automation)
-
-CRITICAL RULES:
-1. STRICT JSON OUTPUT (no markdown, no explanations)
-2. IMPORTANCE SCORING:
-   - Person: 10
-   - Core Skills (used in 2+ projects): 8-9
-   - Secondary Skills (used in 1 project): 6-7
-   - Key Projects: 7-9
-   - Concepts: 6-8
-   - Roles/Companies: 4-6
-3. DEDUPLICATION: Use consistent IDs (lowercase, underscores, no spaces)
-4. TARGET: 20-30 nodes for comprehensive coverage (NOT a hard limit)
-5. TARGET EDGES: Aim for 60-80 relationshipships (very dense graph)
-6. IDs must be unique and descriptive (e.g., "python_language", not just "python")
-7. COMPLETENESS: Extract ALL mentioned skills, even if briefly mentioned. Better complete than filtered.
-
-QUALITY CHECK - VERIFY THESE relationshipsHIPS EXIST:
-- Each concept has 2+ IMPLEMENTED_IN edges to projects
-- Each major project has 1-2 DEMONSTRATES edges to concepts
-- Core technologies have PART_OF relationshipships to concepts
-- Technologies have ENABLES relationshipships to related skills
-- Person has EXPERTISE_IN relationshipships to main concept domains
-
-DENSE GRAPH EXAMPLE:
-{
-  "nodes": [
-    {"id": "pascal_cescato", "label": "Pascal Cescato", "type": "Person", "importance": 10},
-    {"id": "python_language", "label": "Python", "type": "Skill", "importance": 9},
-    {"id": "astro_framework", "label": "Astro", "type": "Skill", "importance": 9},
-    {"id": "wp2md_project", "label": "wp2md", "type": "Project", "importance": 8},
-    {"id": "newsletter_engine", "label": "Newsletter Engine", "type": "Project", "importance": 8},
-    {"id": "ai_automation", "label": "AI Automation", "type": "Concept", "importance": 7},
-    {"id": "web_performance", "label": "Web Performance", "type": "Concept", "importance": 7}
-  ],
-  "edges": [
-    {"from": "pascal_cescato", "to": "python_language", "label": "MASTERS"},
-    {"from": "pascal_cescato", "to": "astro_framework", "label": "MASTERS"},
-    {"from": "pascal_cescato", "to": "wp2md_project", "label": "CREATED"},
-    {"from": "pascal_cescato", "to": "newsletter_engine", "label": "CREATED"},
-    {"from": "wp2md_project", "to": "python_language", "label": "USES"},
-    {"from": "wp2md_project", "to": "astro_framework", "label": "USES"},
-    {"from": "newsletter_engine", "to": "python_language", "label": "USES"},
-    {"from": "python_language", "to": "ai_automation", "label": "ENABLES"},
-    {"from": "wp2md_project", "to": "web_performance", "label": "DEMONSTRATES"},
-    {"from": "newsletter_engine", "to": "ai_automation", "label": "DEMONSTRATES"},
-    {"from": "wp2md_project", "to": "newsletter_engine", "label": "RELATED_TO"}
-  ]
-}
-
-ALLOWED NODE CATEGORIES:
-- "Person": The candidate/author
-- "Role": Job titles or positions
-- "Skill": Technologies, frameworks, languages, tools
-- "Project": Specific achievements or work samples
-- "Entity": Companies, schools, or organizations
-- "Concept": High-level domains (e.g., "Web Performance", "AI/ML", "Migration Engineering")
-
-ALLOWED relationshipsHIPS (expanded for density):
-PRIMARY:
-- "MASTERS" (Person -> Skill)
-- "CREATED" (Person -> Project)
-- "WORKED_AS" (Person -> Role)
-- "AT_COMPANY" (Role -> Entity)
-- "EXPERTISE_IN" (Person -> Concept) - for main domains of expertise
-
-SECONDARY (CREATE DENSITY):
-- "USES" (Project -> Skill) [Use multiple times per project]
-- "DEMONSTRATES" (Project -> Concept)
-- "ENABLES" (Skill -> Skill or Concept)
-- "PART_OF" (Skill -> Concept)
-- "RELATED_TO" (Project -> Project)
-- "REQUIRED_FOR" (Skill -> Role)
-- "IMPLEMENTED_IN" (Concept -> Project) [CRITICAL: Create for all concepts]
-
-TECHNOLOGICAL (ADD THESE FOR ACCURACY):
-- "REQUIRES" (Technology -> Dependency) - e.g., WordPress REQUIRES PHP
-- "RUNS_ON" (Tool -> Platform) - e.g., Docker RUNS_ON Linux
-- "BUILT_WITH" (Framework -> Language) - e.g., Astro BUILT_WITH JavaScript
-- "ALTERNATIVE_TO" (Technology -> Technology) - e.g., Astro ALTERNATIVE_TO Hugo
-- "SPANS" (Concept -> Concept) - e.g., SEO SPANS Web Performance
-
-QUALITY CHECK:
-- Minimum 60 edges for a comprehensive graph
-- Each project should have 4-6 "USES" relationshipships
-- Each concept should have 2+ "IMPLEMENTED_IN" relationshipships
-- Each major project should have 1-2 "DEMONSTRATES" relationshipships
-- Skills used in multiple projects should be highly connected
-- Concepts should span multiple projects
-- Add technological relationshipships (PHP-WordPress, Docker-Linux, etc.)"""
-
-model = genai.GenerativeModel('models/gemini-3-flash-preview', system_instruction=SYSTEM_PROMPT)
-
-def validate_and_enhance_graph(data):
-    """Nettoie et enrichit le graphe retourné par Gemini"""
-    
-    # 1. Déduplication des nodes
-    seen_ids = set()
-    unique_nodes = []
-    id_mapping = {}  # Pour remapper les IDs
-    
-    for node in data['nodes']:
-        # Normalisation de l'ID
-        original_id = node['id']
-        node_id = original_id.lower().replace(' ', '_').replace('-', '_')
-        
-        if node_id not in seen_ids:
-            node['id'] = node_id
-            seen_ids.add(node_id)
-            unique_nodes.append(node)
-            id_mapping[original_id] = node_id
-        else:
-            # Si doublon, on mappe quand même l'ancien ID
-            id_mapping[original_id] = node_id
-    
-    # 2. Validation et normalisation des edges
-    valid_edges = []
-    edge_set = set()  # Pour éviter les doublons d'edges
-    
-    for edge in data['edges']:
-        # Remapper les IDs avec normalisation
-        edge_from = edge['from'].lower().replace(' ', '_').replace('-', '_')
-        edge_to = edge['to'].lower().replace(' ', '_').replace('-', '_')
-        
-        # Utiliser le mapping si disponible
-        edge_from = id_mapping.get(edge['from'], edge_from)
-        edge_to = id_mapping.get(edge['to'], edge_to)
-        
-        if edge_from in seen_ids and edge_to in seen_ids:
-            edge['from'] = edge_from
-            edge['to'] = edge_to
-            # Normaliser le label si manquant
-            if 'label' not in edge or not edge['label']:
-                edge['label'] = 'RELATES_TO'
-            
-            # Éviter les doublons d'edges
-            edge_key = (edge_from, edge_to, edge['label'])
-            if edge_key not in edge_set:
-                edge_set.add(edge_key)
-                valid_edges.append(edge)
-    
-    # 3. Inférence de relationships supplémentaires (enrichissement automatique)
-    
-    # 3a. Trouver les projects qui partagent des technologies
-    projects = [n for n in unique_nodes if n['type'] == 'Project']
-    skills = [n for n in unique_nodes if n['type'] == 'Skill']
-    
-    # Créer un mapping project -> skills utilisées
-    project_skills = {}
-    for project in projects:
-        project_skills[project['id']] = set()
-        for edge in valid_edges:
-            if edge['from'] == project['id'] and edge['label'] == 'USES':
-                project_skills[project['id']].add(edge['to'])
-    
-    # Ajouter des relationships RELATED_TO entre projects partageant 2+ skills
-    for i, proj1 in enumerate(projects):
-        for proj2 in projects[i+1:]:
-            shared_skills = project_skills[proj1['id']] & project_skills[proj2['id']]
-            if len(shared_skills) >= 2:
-                edge_key = (proj1['id'], proj2['id'], 'RELATED_TO')
-                reverse_key = (proj2['id'], proj1['id'], 'RELATED_TO')
-                if edge_key not in edge_set and reverse_key not in edge_set:
-                    valid_edges.append({
-                        'from': proj1['id'],
-                        'to': proj2['id'],
-                        'label': 'RELATED_TO'
-                    })
-                    edge_set.add(edge_key)
-    
-    # 3b. Connecter les skills fréquemment utilisées aux concepts
-    concepts = [n for n in unique_nodes if n['type'] == 'Concept']
-    for skill in skills:
-        skill_usage_count = sum(1 for e in valid_edges if e['to'] == skill['id'] and e['label'] == 'USES')
-        
-        # Si une skill est utilisée dans 2+ projects, la relier aux concepts pertinents
-        if skill_usage_count >= 2:
-            for concept in concepts:
-                # Heuristique simple basée sur les mots-clés
-                concept_lower = concept['label'].lower()
-                skill_lower = skill['label'].lower()
-                
-                # Exemples de connexions logiques
-                if ('ai' in concept_lower or 'automation' in concept_lower) and \
-                   ('python' in skill_lower or 'llm' in skill_lower or 'gemini' in skill_lower):
-                    edge_key = (skill['id'], concept['id'], 'ENABLES')
-                    if edge_key not in edge_set:
-                        valid_edges.append({
-                            'from': skill['id'],
-                            'to': concept['id'],
-                            'label': 'ENABLES'
-                        })
-                        edge_set.add(edge_key)
-                
-                elif ('performance' in concept_lower or 'web' in concept_lower) and \
-                     ('astro' in skill_lower or 'hugo' in skill_lower or 'ssg' in skill_lower):
-                    edge_key = (skill['id'], concept['id'], 'ENABLES')
-                    if edge_key not in edge_set:
-                        valid_edges.append({
-                            'from': skill['id'],
-                            'to': concept['id'],
-                            'label': 'ENABLES'
-                        })
-                        edge_set.add(edge_key)
-    
-    # 3c. Ajouter des relationships technologiques logiques (NOUVEAU V6)
-    # Créer des mappings des nodes par label (case-insensitive)
-    nodes_by_label = {}
-    for node in unique_nodes:
-        label_lower = node['label'].lower()
-        nodes_by_label[label_lower] = node
-    
-    # relationships technologiques à ajouter automatiquement
-    tech_relationshipships = [
-        # PHP <-> WordPress
-        ('php', 'wordpress', 'ENABLES'),
-        ('wordpress', 'php', 'REQUIRES'),
-        
-        # Docker <-> Linux
-        ('docker', 'linux', 'RUNS_ON'),
-        
-        # Web servers <-> Linux
-        ('nginx', 'linux', 'RUNS_ON'),
-        ('apache', 'linux', 'RUNS_ON'),
-        
-        # Databases <-> Linux (optionnel)
-        ('postgresql', 'linux', 'RUNS_ON'),
-        ('mysql', 'linux', 'RUNS_ON'),
-        
-        # SSG alternatives
-        ('astro', 'hugo', 'ALTERNATIVE_TO'),
-    ]
-    
-    for skill_a_key, skill_b_key, relationshipship in tech_relationshipships:
-        # Chercher les nodes correspondants (partiel match)
-        skill_a_node = None
-        skill_b_node = None
-        
-        for label, node in nodes_by_label.items():
-            if skill_a_key in label and node['type'] == 'Skill':
-                skill_a_node = node
-            if skill_b_key in label and (node['type'] == 'Skill' or node['type'] == 'Concept'):
-                skill_b_node = node
-        
-        # Si les deux nodes existent, créer la relation
-        if skill_a_node and skill_b_node:
-            edge_key = (skill_a_node['id'], skill_b_node['id'], relationshipship)
-            reverse_key = (skill_b_node['id'], skill_a_node['id'], relationshipship)
-            
-            if edge_key not in edge_set and reverse_key not in edge_set:
-                valid_edges.append({
-                    'from': skill_a_node['id'],
-                    'to': skill_b_node['id'],
-                    'label': relationshipship
-                })
-                edge_set.add(edge_key)
-    
-    # 4. Calcul des connexions pour ajuster l'importance
-    connections = {nid: 0 for nid in seen_ids}
-    for edge in valid_edges:
-        connections[edge['from']] += 1
-        connections[edge['to']] += 1
-    
-    for node in unique_nodes:
-        # Boost l'importance des nodes très connectés
-        base_importance = node.get('importance', 5)
-        if connections[node['id']] >= 5:
-            node['importance'] = min(10, base_importance + 2)
-        elif connections[node['id']] >= 3:
-            node['importance'] = min(10, base_importance + 1)
-    
-    return {'nodes': unique_nodes, 'edges': valid_edges}
-
-def calculate_node_size(node_type, importance):
-    """Calcule la taille du nœud en fonction du type et de l'importance"""
-    base_sizes = {
-        "Person": 55,      # Réduit de 70 à 55 (-21%)
-        "Skill": 32,       # Réduit de 40 à 32 (-20%)
-        "Project": 36,     # Réduit de 45 à 36 (-20%)
-        "Role": 28,        # Réduit de 35 à 28 (-20%)
-        "Entity": 26,      # Réduit de 33 à 26 (-21%)
-        "Concept": 30      # Réduit de 37 à 30 (-19%)
-    }
-    base = base_sizes.get(node_type, 24)  # Réduit de 30 à 24
-    # Légèrement moins d'impact de l'importance pour garder les bulles compactes
-    return base + (importance * 2.0)  # Réduit de 2.5 à 2.0
-
-def get_connected_nodes(node_id, edges):
-    """Retourne tous les nodes directement connectés à un nœud donné"""
-    connected = set()
-    for edge in edges:
-        if edge['from'] == node_id:
-            connected.add(edge['to'])
-        if edge['to'] == node_id:
-            connected.add(edge['from'])
-    return connected
-
-def get_relevant_edges(node_id, edges):
-    """Retourne les edges connectés à un nœud donné"""
-    relevant = []
-    for edge in edges:
-        if edge['from'] == node_id or edge['to'] == node_id:
-            relevant.append(edge)
-    return relevant
-
-def create_sankey_diagram(data):
-    """Crée un diagramme Sankey montrant les flux Person → Skills → Projects → Concepts"""
-    
-    # Définir colors par type
-    color_map = {
-        "Person": "rgba(255, 75, 75, 0.8)",
-        "Role": "rgba(243, 156, 18, 0.8)",
-        "Skill": "rgba(0, 173, 238, 0.8)",
-        "Project": "rgba(46, 204, 113, 0.8)",
-        "Entity": "rgba(155, 89, 182, 0.8)",
-        "Concept": "rgba(149, 165, 166, 0.8)"
-    }
-    
-    # Créer un mapping id -> index
-    node_dict = {node['id']: i for i, node in enumerate(data['nodes'])}
-    
-    # Préparer les nodes
-    node_labels = [node['label'] for node in data['nodes']]
-    node_colors = [color_map.get(node['type'], "rgba(189, 195, 199, 0.8)") for node in data['nodes']]
-    
-    # Préparer les liens avec values basées sur l'importance
-    sources = []
-    targets = []
-    values = []
-    link_colors = []
-    
-    for edge in data['edges']:
-        if edge['from'] in node_dict and edge['to'] in node_dict:
-            sources.append(node_dict[edge['from']])
-            targets.append(node_dict[edge['to']])
-            
-            # value basée sur l'importance du nœud cible
-            target_node = data['nodes'][node_dict[edge['to']]]
-            values.append(target_node.get('importance', 5))
-            
-            # Couleur du lien = couleur du nœud source avec transparence
-            source_node = data['nodes'][node_dict[edge['from']]]
-            link_colors.append(color_map.get(source_node['type'], "rgba(189, 195, 199, 0.4)").replace("0.8", "0.3"))
-    
-    # Créer le diagramme Sankey
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=40,  # EXTRÊME : 40px entre nodes (+33% vs V7.5)
-            thickness=15,  # Très fin : 15px (-25% vs V7.5)
-            line=dict(color="white", width=2),
-            label=node_labels,
-            color=node_colors,
-            hovertemplate='%{label}<br>Importance: %{value}<extra></extra>'
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=link_colors,
-            hovertemplate='%{source.label} → %{target.label}<br>Importance: %{value}<extra></extra>'
-        ),
-        # Paramètres d'arrangement
-        arrangement='snap',
-        orientation='h'
-    )])
-    
-    fig.update_layout(
-        title={
-            'text': "Career Flow: Skills → Projects → Expertise",
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 24, 'family': 'Verdana, Segoe UI, Noto Sans, sans-serif'}
-        },
-        font=dict(
-            size=14,  # Réduit de 15 à 14 (labels moins volumineux)
-            family="Verdana, Segoe UI, Noto Sans, sans-serif", 
-            color="#000000"
-        ),
-        height=1500,  # EXTRÊME : 1500px (+25% vs V7.5)
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=10, r=10, t=80, b=10)
-    )
-    
-    # Désactiver les effets de bordure/ombre sur les labels
-    fig.update_traces(
-        textfont=dict(
-            family="Verdana, Segoe UI, Noto Sans, sans-serif",
-            size=14,  # Cohérent avec font global
-            color="#000000"
-        )
-    )
-    
-    return fig
-
-def create_skills_matrix(data):
-    """Crée une matrice heatmap Skills × Projects"""
-    
-    # Extraire les skills et projects
-    skills = [n for n in data['nodes'] if n['type'] == 'Skill']
-    projects = [n for n in data['nodes'] if n['type'] == 'Project']
-    
-    if not skills or not projects:
-        return None
-    
-    # Créer la matrice
-    matrix = []
-    skill_labels = []
-    project_labels = []
-    
-    for skill in skills:
-        row = []
-        skill_labels.append(skill['label'])
-        
-        for project in projects:
-            # Chercher si le projet utilise cette skill
-            uses_skill = any(
-                e['from'] == project['id'] and e['to'] == skill['id'] and e['label'] == 'USES'
-                for e in data['edges']
-            )
-            
-            if uses_skill:
-                # value = importance de la skill
-                row.append(skill.get('importance', 5))
-            else:
-                row.append(0)
-        
-        matrix.append(row)
-    
-    project_labels = [p['label'] for p in projects]
-    
-    # Créer le DataFrame
-    df = pd.DataFrame(matrix, index=skill_labels, columns=project_labels)
-    
-    # Créer la heatmap
-    fig = go.Figure(data=go.Heatmap(
-        z=df.values,
-        x=df.columns,
-        y=df.index,
-        colorscale=[
-            [0, 'rgba(240, 240, 240, 0.3)'],      # Pas utilisé (gris très clair)
-            [0.3, 'rgba(135, 206, 235, 0.5)'],    # Faible importance (bleu clair)
-            [0.6, 'rgba(0, 173, 238, 0.7)'],      # Moyenne importance (bleu)
-            [1, 'rgba(0, 123, 167, 0.9)']         # Haute importance (bleu foncé)
-        ],
-        text=df.values,
-        texttemplate='%{text}',
-        textfont={"size": 10},
-        hovertemplate='<b>%{y}</b><br>Project: %{x}<br>Importance: %{z}<extra></extra>',
-        showscale=True,
-        colorbar=dict(
-            title="Importance",
-            titleside="right",
-            tickmode="linear",
-            tick0=0,
-            dtick=2
+def resolve_focus(index, focused_node):
+    """(Focus, clé de cache) du mode focus selon les réglages de la sidebar ; (None, None) sans focus"""
+    if not focused_node:
+        return None, None
+    hops = st.session_state.get('focus_hops', 1)
+    labels = index.focus.labels_key(st.session_state.get('focus_labels'))
+    target = st.session_state.get('focus_path_target')
+    if target and index.node(target):
+        focus = index.focus.path(focused_node, target, labels)
+        if focus is not None:
+            return focus, ('path', focused_node, target, labels)
+        st.warning("🚫 no path between these nodes" + (" via the selected relations" if labels else ""))
+    return index.focus.neighborhood(focused_node, hops, labels), ('hops', focused_node, hops, labels)
+
+def get_graph_index(data):
+    """Retourne l'index du graphe courant, reconstruit seulement quand le graphe change"""
+    shared = get_graph_store().get(data)
+    if shared is not None:
+        # Graphe partagé : index commun à toutes les sessions
+        st.session_state.pop('graph_index', None)
+        return shared.index
+    index = st.session_state.get('graph_index')
+    if index is None or index.nodes is not data['nodes'] or index.edges is not data['edges']:
+        index = GraphIndex(data)
+        st.session_state.graph_index = index
+    return index
+
+def render_stream_preview(placeholder, nodes, edges, elapsed, revision):
+    """Affiche le graphe partiel reçu pendant une extraction en streaming"""
+    node_ids = {n['id'] for n in nodes if 'id' in n}
+    preview_nodes = [
+        Node(
+            id=n['id'],
+            label=n.get('label', n['id']),
+            size=calculate_node_size(n.get('type'), n.get('importance', 5)),
+            color=COLOR_MAP.get(n.get('type'), "#BDC3C7"),
+            shape="dot"
         )
-    ))
-    
-    fig.update_layout(
-        title={
-            'text': "Skills × Projects Matrix",
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20}
-        },
-        xaxis=dict(
-            title="Projects",
-            tickangle=-45,
-            side='top'
-        ),
-        yaxis=dict(
-            title="Skills",
-            autorange='reversed'
-        ),
-        font=dict(size=11, family="Arial"),
-        height=600 + len(skills) * 25,  # Hauteur dynamique
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    return fig
-
-# Configuration de la page
-st.set_page_config(
-    page_title="AI Knowledge Graph CV Builder",
-    page_icon="🌐",
-    layout="wide"
-)
+        for n in nodes if 'id' in n
+    ]
+    preview_edges = [
+        Edge(source=e['from'], target=e['to'], color="#95A5A6")
+        for e in edges if e.get('from') in node_ids and e.get('to') in node_ids
+    ]
+    with metrics.timer("render", view="stream_preview"), placeholder.container():
+        st.caption(f"⏳ {len(nodes)} nodes • {len(edges)} relationships received ({elapsed:.1f}s)")
+        # streamRevision rend chaque aperçu unique (sinon Streamlit voit des widgets identiques)
+        agraph(nodes=preview_nodes, edges=preview_edges, config=Config(
+            width=1600,
+            height=600,
+            directed=True,
+            physics=True,
+            streamRevision=revision
+        ))
+
+def cancel_extraction_job():
+    """Annule l'extraction en cours de la session (upload annulé, modèle changé)"""
+    job = st.session_state.pop('extraction_job', None)
+    if job is not None:
+        job.stop()
+    st.session_state.section_job = None
+
+def clear_extraction_job():
+    """Oublie le job terminé : le prochain rerun soumet une nouvelle extraction (bouton retry)"""
+    st.session_state.pop('extraction_job', None)
+
+def submit_extraction_job(model, file_bytes, cache_key, pre_extract_text, sectioned, streaming):
+    """Soumet l'extraction au pool du process (JobRejected si le process est saturé)"""
+    if sectioned:
+        # Sous-graphes par plages de pages ; un retry ne relance que les sections en échec
+        section_job = st.session_state.get('section_job')
+        if section_job is None or section_job.key != cache_key:
+            section_job = SectionedExtraction(file_bytes, pre_extract_text=pre_extract_text)
+            section_job.key = cache_key
+            st.session_state.section_job = section_job
+        return get_job_manager().submit(cache_key, sections_work(model, section_job.pending()), section_job)
+    
+    # Texte extrait localement (si demandé) ou PDF brut ; rapport octets / tokens économisés
+    with metrics.timer("prepare_input", mode="text" if pre_extract_text else "pdf"):
+        contents, input_report = prepare_contents(file_bytes, pre_extract_text)
+    st.session_state.input_report = input_report
+    if streaming:
+        # Nodes et edges visibles dans l'aperçu dès qu'ils sont complets dans le flux
+        return get_job_manager().submit(cache_key, streaming_work(model, contents), GraphStreamParser())
+    return get_job_manager().submit(cache_key, blocking_work(model, contents))
+
+def render_job_progress(job):
+    """Progression d'un job actif (aperçu du flux, sections terminées ou simple chrono)"""
+    if job.status == "queued":
+        st.info("⏳ waiting for a free analysis slot...")
+    elif isinstance(job.payload, GraphStreamParser):
+        parser = job.payload
+        nodes, edges = list(parser.nodes), list(parser.edges)
+        if nodes or edges:
+            render_stream_preview(st.empty(), nodes, edges, job.elapsed, len(nodes) + len(edges))
+        else:
+            st.info(f"🔍 Gemini analysis in progress... ({job.elapsed:.0f}s)")
+    elif isinstance(job.payload, SectionedExtraction):
+        done, total = job.progress.get("done", 0), job.progress.get("total") or len(job.payload.sections)
+        pages = job.progress.get("pages")
+        last_done = f" • last : pages {pages[0]}-{pages[1] or 'end'}" if pages else ""
+        st.progress(done / total, text=f"🧩 {done}/{total} section(s) done ({job.elapsed:.0f}s){last_done}")
+    else:
+        st.info(f"🔍 Gemini analysis in progress... ({job.elapsed:.0f}s)")
+
+def section_job_outcome(section_job):
+    """(graphe, complet) d'une extraction par sections ; s'arrête sur les boutons retry / partiel"""
+    if section_job.pending() and not st.session_state.get('accept_partial_sections'):
+        st.error(f"❌ {len(section_job.errors)}/{len(section_job.sections)} section(s) failed")
+        for index, error in sorted(section_job.errors.items()):
+            first_page, last_page = section_job.sections[index]['pages']
+            st.caption(f"pages {first_page}-{last_page or 'end'} : {error}")
+        col_retry, col_partial = st.columns(2)
+        col_retry.button("🔁 retry failed sections", key="retry_sections", on_click=clear_extraction_job)
+        if section_job.results:
+            col_partial.button("continue with partial graph", key="accept_partial_sections")
+        st.stop()
+    
+    st.session_state.section_job = None
+    # Union des sous-graphes validée une seule fois (fusion des ids + inférence)
+    return section_job.merge(), not section_job.pending()
 
 st.title("🌐 AI Knowledge Graph CV Builder")
 st.markdown("*Transform your resume into an interactive knowledge graph powered by AI*")
@@ -640,6 +337,7 @@ uploaded_file = None
 
 # Prepare a safe data object for the sidebar (may be empty when no graph yet)
 sidebar_data = st.session_state.graph_data if st.session_state.graph_data is not None else { 'nodes': [], 'edges': [] }
+sidebar_index = get_graph_index(sidebar_data)
 
 # Sidebar: render independently so the uploader can appear even when no graph is loaded
 with st.sidebar:
@@ -652,6 +350,7 @@ with st.sidebar:
             help="The file will be analyzed by Gemini to extract skills, projects and relationships"
         )
         if st.button("❌ Cancel Upload", use_container_width=True):
+            cancel_extraction_job()
             st.session_state.show_uploader = False
             st.rerun()
     elif st.session_state.graph_data is not None and st.session_state.demo_loaded:
@@ -693,11 +392,19 @@ with st.sidebar:
     else:
         st.caption("📊 **matrix view** : quick overview of which projects use which skills")
     
+    importance_label = st.selectbox(
+        "node importance",
+        options=list(IMPORTANCE_LABELS),
+        key="importance_label",
+        help="LLM : importance estimée par Gemini ; PageRank / Betweenness : centralité calculée sur la structure du graphe"
+    )
+    importance_source = IMPORTANCE_LABELS[importance_label]
+    
     st.divider()
     
     st.header("🔍 filters")
     
-    all_types = sorted(list(set(n['type'] for n in sidebar_data['nodes'])))
+    all_types = sorted(sidebar_index.type_counts())
     selected_types = st.multiselect(
         "categories:", 
         all_types, 
@@ -720,26 +427,35 @@ with st.sidebar:
     if gemini_model != st.session_state.gemini_model:
         st.session_state.gemini_model = gemini_model
         st.session_state.graph_data = None  # Reset pour forcer nouvelle analyse
+        cancel_extraction_job()
         st.info("💡 Modèle changé. Uploadez à nouveau votre CV pour réanalyser.")
     
     st.caption("💡 Pro recommandé pour graphes plus précis (relationships technologiques)")
     
-    st.divider()
+    streaming_extraction = st.checkbox(
+        "⚡ streaming extraction",
+        value=True,
+        help="Affiche le graphe au fur et à mesure de la réponse de Gemini"
+    )
     
-    # Contrôles d'espacement (forces ULTRA renforcées pour éviter chevauchement labels)
-    spacing_configs = {
-        "Compact": {"gravity": -20000, "spring": 350},     # Augmenté encore
-        "Normal": {"gravity": -40000, "spring": 500},      # Augmenté encore
-        "Large": {"gravity": -70000, "spring": 700},       # Augmenté encore
-        "Extra Large": {"gravity": -110000, "spring": 950},   # Augmenté encore
-        "Ultra Wide": {"gravity": -160000, "spring": 1300},   # Augmenté encore
-        "Mega Wide": {"gravity": -250000, "spring": 1800}     # EXTRÊME pour aucun chevauchement
-    }
+    sectioned_extraction = st.checkbox(
+        "🧩 section-parallel extraction",
+        value=False,
+        help="CV longs : une requête Gemini par plage de pages, en parallèle, fusionnées ensuite (remplace le streaming)"
+    )
+    
+    pre_extract_text = st.checkbox(
+        "📝 send extracted text",
+        value=False,
+        help="Extrait le texte du PDF localement et l'envoie à la place du PDF (moins de tokens, plus rapide) ; repli sur le PDF si l'extraction échoue"
+    )
+    
+    st.divider()
     
     with st.expander("⚙️ node spacing", expanded=False):
         spacing_level = st.select_slider(
             "spacing level",
-            options=["Compact", "Normal", "Large", "Extra Large", "Ultra Wide", "Mega Wide"],
+            options=SPACING_LEVELS,
             value="Ultra Wide",  # Défaut augmenté à Ultra Wide
             help="adjust space between nodes to avoid overlaps"
         )
@@ -750,8 +466,33 @@ with st.sidebar:
             help="hiding labels can improve readability"
         )
         
+        static_layout = st.checkbox(
+            "📌 server-side layout",
+            value=False,
+            help="positions calculées une fois côté serveur (physique désactivée dans le navigateur) : focus et filtres instantanés"
+        )
+        
         st.caption(f"💡 for very dense graphs (30+ nodes), use 'Ultra Wide' ou 'Mega Wide'")
     
+    with st.expander("🔭 level of detail", expanded=False):
+        # Groupes dépliés : propres au graphe affiché
+        if st.session_state.get('lod_version') != sidebar_index.version:
+            st.session_state.lod_version = sidebar_index.version
+            st.session_state.lod_expanded = frozenset()
+        lod_enabled = st.checkbox(
+            "cluster large graphs",
+            value=True,
+            key="lod_enabled",
+            help="Au-delà du seuil, les nœuds sont regroupés en super-nœuds (clic : déplier) ; seule la partie visible est envoyée au navigateur"
+        )
+        lod_group = st.radio("cluster by", ["community", "type"], key="lod_group", horizontal=True)
+        lod_threshold = st.slider("max nodes sent", 50, 2000, DEFAULT_LOD_THRESHOLD, step=50, key="lod_threshold")
+        if st.session_state.lod_expanded:
+            st.caption(f"{len(st.session_state.lod_expanded)} cluster(s) expanded")
+            if st.button("⏫ collapse clusters", use_container_width=True):
+                st.session_state.lod_expanded = frozenset()
+                st.rerun()
+    
     st.divider()
     
     # Mode debug (nouveauté)
@@ -765,22 +506,37 @@ with st.sidebar:
     
     # Mode focus
     if st.session_state.focused_node:
-        focused_info = next((n for n in sidebar_data['nodes'] if n['id'] == st.session_state.focused_node), None)
+        focused_info = sidebar_index.node(st.session_state.focused_node)
         if focused_info:
             st.info(f"🎯 Focus: **{focused_info['label']}**")
             if st.button("🔄 reset focus", use_container_width=True):
                 st.session_state.focused_node = None
+                st.session_state.focus_path_target = None
                 st.rerun()
+            
+            # Réglages devenus invalides (autre graphe, autre nœud en focus) : remis à zéro avant les widgets
+            relation_options = sorted(sidebar_index.relation_labels(), key=str)
+            st.session_state.focus_labels = [l for l in st.session_state.get('focus_labels', []) if l in relation_options]
+            path_targets = [n['id'] for n in sorted(sidebar_data['nodes'], key=lambda n: str(n.get('label', n['id'])))
+                            if n['id'] != st.session_state.focused_node]
+            if st.session_state.get('focus_path_target') not in path_targets:
+                st.session_state.focus_path_target = None
+            
+            # Portée du focus : k sauts, relations suivies, ou chemin vers un autre nœud
+            st.slider("hops", 1, MAX_FOCUS_HOPS, 1, key="focus_hops",
+                      help="Nœuds à au plus k relations du nœud en focus")
+            st.multiselect("via relations", relation_options, key="focus_labels",
+                           help="Ne suivre que ces relations (ex. USES, DEMONSTRATES) ; vide : toutes")
+            st.selectbox("path to", [None] + path_targets, key="focus_path_target",
+                         format_func=lambda node_id: "—" if node_id is None else sidebar_index.node(node_id).get('label', node_id),
+                         help="Plus court chemin entre le nœud en focus et ce nœud")
             st.divider()
     
     # Statistiques
     st.subheader("📊 statistics")
-    filtered_nodes_data = [n for n in sidebar_data['nodes'] if n['type'] in selected_types]
-    filtered_node_ids = [n['id'] for n in filtered_nodes_data]
-    filtered_edges_data = [
-        e for e in sidebar_data['edges'] 
-        if e['from'] in filtered_node_ids and e['to'] in filtered_node_ids
-    ]
+    # Sélection de types résolue une fois (masques vectorisés) et partagée par les trois vues
+    type_selection = sidebar_index.select_types(selected_types)
+    filtered_nodes_data, filtered_edges_data = type_selection.nodes, type_selection.edges
     
     col1, col2 = st.columns(2)
     with col1:
@@ -816,28 +572,72 @@ with st.sidebar:
             st.write(f"**relationships totales extraites** : {len(sidebar_data['edges'])}")
             
             # distribution by type
-            node_types = {}
-            for node in sidebar_data['nodes']:
-                node_type = node['type']
-                node_types[node_type] = node_types.get(node_type, 0) + 1
+            node_types = sidebar_index.type_counts()
             
             st.write("**distribution by type** :")
             for node_type, count in sorted(node_types.items()):
                 st.write(f"  - {node_type}: {count}")
         
+        with st.expander("🕸️ Graph Analytics", expanded=False):
+            analytics = sidebar_index.analytics
+            summary = analytics.summary()
+            st.write(f"**communities** : {summary['communities']} (largest : {summary['largest_community']} nodes)"
+                     f" • modularity {summary['modularity']:.2f}")
+            st.write(f"**betweenness** : estimated from {summary['sampled_sources']} source(s)")
+            for measure in ("pagerank", "betweenness"):
+                top_nodes = ", ".join(sidebar_index.nodes[p]['label'] for p in analytics.top(measure))
+                st.write(f"**top {measure}** : {top_nodes}")
+        
+        with st.expander("🔭 Level of Detail", expanded=False):
+            for level, (n_nodes, n_edges, payload, render_ms) in sorted(st.session_state.get('lod_stats', {}).items()):
+                st.write(f"**level {level}** : {n_nodes} nodes / {n_edges} edges • {payload / 1024:.0f} KB • "
+                         f"render {render_ms:.0f} ms")
+        
+        with st.expander("⚡ Extraction Cache", expanded=False):
+            cache_stats = get_extraction_cache().stats()
+            st.write(f"**hits** : {cache_stats['hits']} (memory {cache_stats['memory_hits']} / disk {cache_stats['disk_hits']})")
+            st.write(f"**misses** : {cache_stats['misses']}")
+            st.write(f"**hit rate** : {cache_stats['hit_rate']:.0%}")
+            st.write(f"**Gemini time saved** : {cache_stats['seconds_saved']:.1f}s")
+            input_report = st.session_state.get('input_report')
+            if input_report:
+                if input_report['mode'] == 'text':
+                    st.write(f"**last upload** : text sent instead of PDF, {input_report['bytes_saved'] / 1024:.0f} KB "
+                             f"and ~{input_report['tokens_saved_est']} tokens saved")
+                else:
+                    st.write(f"**last upload** : PDF sent ({input_report['pdf_bytes'] / 1024:.0f} KB)"
+                             + (f" • fallback : {input_report['fallback_reason']}" if 'fallback_reason' in input_report else ""))
+            view_stats = get_view_cache().stats()
+            st.write(f"**view cache** : {view_stats['hits']} hits / {view_stats['misses']} misses ({view_stats['entries']} entries)")
+        
+        with st.expander("🧠 Inference Rules", expanded=False):
+            rule_stats = default_rules().stats()
+            st.write(f"**rules** : {len(rule_stats['rules'])} ({rule_stats['keywords']} keywords) • {rule_stats['graphs']} graph(s) enriched")
+            for rule in rule_stats['rules']:
+                if rule['hits']:
+                    st.write(f"  - `{rule['name']}` ({rule['kind']}) : {rule['hits']} edge(s)")
+        
+        with st.expander("📈 Metrics", expanded=False):
+            metrics_server = get_metrics_server()
+            if metrics_server:
+                st.write(f"**endpoint** : `http://{metrics_server.server_address[0]}:{metrics_server.server_address[1]}/metrics`")
+            for phase, (count, mean_seconds) in metrics.phase_summary().items():
+                st.write(f"  - {phase} : {count} × {mean_seconds * 1000:.1f} ms")
+            st.code(metrics.render_prometheus(), language="text")
+        
         with st.expander("📋 Liste Complète des nodes", expanded=False):
             for node in sorted(sidebar_data['nodes'], key=lambda x: x.get('importance', 0), reverse=True):
                 st.write(f"**{node['label']}** ({node['type']}) - Importance: {node.get('importance', '?')}/10")
                 st.write(f"  ID: `{node['id']}`")
                 # Compter les connexions
-                connections = sum(1 for e in sidebar_data['edges'] if e['from'] == node['id'] or e['to'] == node['id'])
+                connections = sidebar_index.degree(node['id'])
                 st.write(f"  Connexions: {connections}")
                 st.caption("")  # Espacement
         
         with st.expander("🔗 Liste Complète des relationships", expanded=False):
             for edge in sidebar_data['edges']:
-                from_node = next((n for n in sidebar_data['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in sidebar_data['nodes'] if n['id'] == edge['to']), None)
+                from_node = sidebar_index.node(edge['from'])
+                to_node = sidebar_index.node(edge['to'])
                 if from_node and to_node:
                     st.write(f"{from_node['label']} **{edge.get('label', '→')}** {to_node['label']}")
         
@@ -851,23 +651,29 @@ with st.sidebar:
     search_query = st.text_input(
         "Nom du nœud",
         placeholder="Ex: PHP, Python, wp2md...",
-        help="Recherche case-insensitive dans les labels",
+        help="Recherche par début de mot, sous-chaîne ou approchée (fautes de frappe), sans accents ni casse",
         key="node_search"
     )
+    search_everywhere = st.checkbox(
+        "also match types & relations",
+        key="search_everywhere",
+        help="Inclut les types de nœuds (Skill, Project...) et les labels des relations (USES...)"
+    )
     
     if search_query:
-        matching_nodes = [
-            n for n in sidebar_data['nodes'] 
-            if search_query.lower() in n['label'].lower()
-        ]
+        # Index construit une fois par graphe : k meilleurs résultats classés par pertinence
+        fields = ("label", "type", "relation") if search_everywhere else ("label",)
+        matching_nodes, total_matches, exhaustive = sidebar_index.search(search_query, SEARCH_RESULTS, fields)
         
         if matching_nodes:
-            st.success(f"✅ {len(matching_nodes)} nœud(s) trouvé(s)")
+            st.success(f"✅ {total_matches}{'' if exhaustive else '+'} nœud(s) trouvé(s)")
+            if total_matches > len(matching_nodes):
+                st.caption(f"top {len(matching_nodes)} by relevance")
             
             for node in matching_nodes:
                 # Badge avec type et importance
                 badge = f"{node['type']} • {node.get('importance', '?')}/10"
-                connections_count = sum(1 for e in sidebar_data['edges'] if e['from'] == node['id'] or e['to'] == node['id'])
+                connections_count = sidebar_index.degree(node['id'])
                 
                 col1, col2 = st.columns([3, 1])
                 with col1:
@@ -892,18 +698,9 @@ with st.sidebar:
     
     # Légende des couleurs
     st.subheader("🎨 legend")
-    color_map = {
-        "Person": "#FF4B4B",   # Rouge
-        "Role": "#F39C12",     # Orange
-        "Skill": "#00ADEE",    # Bleu
-        "Project": "#2ECC71",  # Vert
-        "Entity": "#9B59B6",   # Violet
-        "Concept": "#95A5A6"   # Gris
-    }
-    
     for node_type in all_types:
-        color = color_map.get(node_type, "#BDC3C7")
-        count = sum(1 for n in sidebar_data['nodes'] if n['type'] == node_type)
+        color = COLOR_MAP.get(node_type, "#BDC3C7")
+        count = sidebar_index.type_counts().get(node_type, 0)
         st.markdown(
             f'<span style="color:{color}; font-size:20px;">●</span> **{node_type}** ({count})',
             unsafe_allow_html=True
@@ -920,208 +717,103 @@ if uploaded_file or st.session_state.graph_data is not None or st.session_state.
     # --- PHASE D'ANALYSE (Seulement si pas déjà en mémoire) ---
     if uploaded_file and st.session_state.graph_data is None:
 
-        with st.spinner("🔍 Gemini analysis in progress..."):
-            file_bytes = uploaded_file.read()
-            
-            # Utiliser le modèle sélectionné
-            selected_model = st.session_state.get('gemini_model', 'gemini-3-flash-preview')
-            model = genai.GenerativeModel(f'models/{selected_model}', system_instruction=SYSTEM_PROMPT)
+        # Utiliser le modèle sélectionné
+        selected_model = st.session_state.get('gemini_model', 'gemini-3-flash-preview')
+        model = get_gemini_model(selected_model)
+        
+        # Cache adressé par contenu : même PDF + même modèle + mêmes prompts = pas d'appel Gemini
+        extraction_cache = get_extraction_cache()
+        variant = "+".join(v for v, on in (("sections", sectioned_extraction), ("text", pre_extract_text)) if on)
+        job = st.session_state.get('extraction_job')
+        upload = (uploaded_file.file_id, selected_model, variant)
+        
+        if job is not None and st.session_state.get('extraction_upload') == upload:
+            # Reruns de sondage : même upload que le job soumis, ni relecture ni hachage du PDF
+            file_bytes, cache_key = None, job.key
+        else:
+            with metrics.timer("upload_read"):
+                file_bytes = uploaded_file.read()
+            cache_key = extraction_key(file_bytes, f'models/{selected_model}', SYSTEM_PROMPT, EXTRACTION_PROMPT, variant)
+        
+        if job is None or job.key != cache_key:
+            with metrics.timer("cache_lookup"):
+                cached_graph = extraction_cache.get(cache_key)
             
-            try:
-                response = model.generate_content([
-                    {"mime_type": "application/pdf", "data": file_bytes},
-                    """Extract a COMPREHENSIVE and DENSE knowledge graph with maximum interconnections.
-
-CRITICAL INSTRUCTIONS:
-- Extract 20-30 nodes minimum (be exhaustive, not selective)
-- Create 60-80 edges minimum for a richly connected graph
-- For EACH project, list ALL technologies used (minimum 4-6 USES relationshipships per project)
-- Extract ALL skills mentioned, even briefly (Python, PHP, JavaScript, Docker, Git, etc.)
-- Connect skills that enable each other (ENABLES relationshipships)
-- Link related projects (RELATED_TO relationshipships)
-- Connect concepts to multiple projects (IMPLEMENTED_IN)
-
-BIDIRECTIONAL CONCEPT-PROJECT relationshipsHIPS (CRITICAL):
-For EVERY concept you identify, create IMPLEMENTED_IN relationshipships to ALL relevant projects:
-- SSG Ecosystem -> IMPLEMENTED_IN -> [all SSG projects like wp2md, Hugo sites, Astro projects]
-- Migration Engineering -> IMPLEMENTED_IN -> [all migration projects]
-- AI Automation -> IMPLEMENTED_IN -> [all AI/LLM projects]
-- Web Performance -> IMPLEMENTED_IN -> [all performance-focused projects]
-
-IMPORTANT EXAMPLES (ALWAYS CREATE BOTH DIRECTIONS):
-✅ wp2md -> DEMONSTRATES -> SSG Ecosystem
-✅ SSG Ecosystem -> IMPLEMENTED_IN -> wp2md
-✅ Newsletter Engine -> DEMONSTRATES -> AI Automation
-✅ AI Automation -> IMPLEMENTED_IN -> Newsletter Engine
-
-PERSON-CONCEPT EXPERTISE:
-Create EXPERTISE_IN relationshipships from the person to their main domains:
-- Pascal -> EXPERTISE_IN -> AI Automation
-- Pascal -> EXPERTISE_IN -> Migration Engineering
-- Pascal -> EXPERTISE_IN -> Web Performance
-
-COMPLETENESS OVER BREVITY:
-If the CV mentions PHP, extract it. If it mentions 15 skills, extract all 15.
-Better to have complete information than filtered/curated content.
-
-QUALITY CHECK BEFORE RETURNING:
-✅ Each concept has 2+ IMPLEMENTED_IN edges to projects
-✅ Each major project has 1-2 DEMONSTRATES edges to concepts
-✅ Person has EXPERTISE_IN to main concept domains
-✅ 60+ total relationshipships
-
-Quality over quantity, but PRIORITIZE COMPLETENESS and DENSITY of interconnections.
-Do not artificially limit yourself to "top N" items - extract everything relevant."""
-                ])
-                
-                # Nettoyage de la réponse
-                clean_json = response.text.replace("```json", "").replace("```", "").strip()
-                
-                # Parsing et validation
-                raw_data = json.loads(clean_json)
-                st.session_state.graph_data = validate_and_enhance_graph(raw_data)
+            if cached_graph is not None:
+                st.session_state.graph_data = get_graph_store().share(cached_graph).data
                 st.session_state.show_uploader = False
-                
-                # Indicate success and force a rerun so the main view updates immediately
-                st.success("✅ analysis completed!")
+                st.success("⚡ analysis loaded from cache!")
                 st.rerun()
-                
-            except json.JSONDecodeError as e:
-                st.error(f"❌ json parsing error : {e}")
-                st.code(response.text)
-                st.stop()
-            except Exception as e:
-                st.error(f"❌ Erreur lors de l'analyse : {e}")
+            
+            # Extraction en tâche de fond : ce script ne fait que sonder le job à chaque rerun
+            if job is not None:
+                job.stop()
+            try:
+                job = submit_extraction_job(model, file_bytes, cache_key, pre_extract_text,
+                                            sectioned_extraction, streaming_extraction)
+            except JobRejected:
+                st.warning("⏳ too many analyses in progress on this server, please retry in a moment.")
+                st.button("🔁 retry", key="retry_busy")
                 st.stop()
+            st.session_state.extraction_job = job
+            st.session_state.extraction_upload = upload
+        
+        status = job.poll()
+        
+        if job.active:
+            render_job_progress(job)
+            st.button("⏹️ cancel analysis", key="cancel_analysis", on_click=job.stop)
+            # Sondage : rerun régulier tant que le job tourne (la session reste réactive)
+            time.sleep(JOB_POLL_INTERVAL)
+            st.rerun()
+        
+        if status == "done":
+            if isinstance(job.result, SectionedExtraction):
+                graph, complete = section_job_outcome(job.result)
+            else:
+                # Un flux tronqué échoue dans parser.finish() ; garde-fou avant la mise en cache
+                graph = job.result
+                complete = not isinstance(job.payload, GraphStreamParser) or job.payload.complete
+            
+            # Graphe figé et partagé : une autre session qui analyse le même CV le réutilise
+            st.session_state.graph_data = get_graph_store().share(graph).data
+            st.session_state.show_uploader = False
+            st.session_state.pop('extraction_job', None)
+            if complete:
+                # Un graphe partiel (sections abandonnées, flux tronqué) n'est pas mis en cache
+                extraction_cache.put(cache_key, st.session_state.graph_data, job.elapsed)
+            
+            # Indicate success and force a rerun so the main view updates immediately
+            st.success("✅ analysis completed!")
+            st.rerun()
+        
+        if status == "failed" and isinstance(job.error, json.JSONDecodeError):
+            st.error(f"❌ json parsing error : {job.error}")
+            st.code(job.response_text)
+        elif status == "failed":
+            st.error(f"❌ Erreur lors de l'analyse : {job.error}")
+        elif status == "timeout":
+            st.error(f"⌛ analysis timed out after {job.timeout:.0f}s")
+        else:
+            st.warning("⏹️ analysis cancelled")
+        st.button("🔁 retry analysis", key="retry_analysis", on_click=clear_extraction_job)
+        st.stop()
 
     # --- PHASE D'AFFICHAGE (Interactive) ---
     if st.session_state.graph_data:
         data = st.session_state.graph_data
+        index = get_graph_index(data)
 
         try:
-            # --- 1. DÉFINITION DE LA CONFIGURATION ---
-            config = Config(
-                width=1400,
-                height=900,
-                directed=True,
-                physics=True,
-                nodeHighlightBehavior=True,
-                highlightColor="#FFD700",
-                collapsible=True,
-                physicsOptions={
-                    "barnesHut": {
-                        "gravitationalConstant": -8000,  # Force de répulsion très élevée
-                        "centralGravity": 0.1,           # Faible gravité centrale
-                        "springLength": 250,             # Longueur des "ressorts" entre nodes
-                        "springConstant": 0.02,          # Rigidité des ressorts
-                        "damping": 0.5,                  # Amortissement du mouvement
-                        "avoidOverlap": 1                # Évite les chevauchements
-                    },
-                    "solver": "barnesHut",               # Meilleur pour les graphes denses
-                    "stabilization": {
-                        "enabled": True,
-                        "iterations": 500,               # Plus d'itérations pour convergence
-                        "updateInterval": 25,
-                        "fit": True
-                    },
-                    "minVelocity": 0.75                  # Vitesse minimale avant arrêt
-                }
-            )
-
+            # Clé commune des vues : seuls les paramètres dont dépend chaque vue en font partie
+            types_key = tuple(sorted(selected_types))
             
-
-            # --- 1. DÉFINITION DE LA CONFIGURATION (après récupération des paramètres) ---
-            # Récupérer les paramètres d'espacement
-            spacing_params = spacing_configs.get(spacing_level, spacing_configs["Large"])
-            
-            config = Config(
-                width=1600,  # Réduit pour fit tous les écrans
-                height=900,  # Réduit pour fit Full HD (1080p)
-                directed=True,
-                physics=True,
-                nodeHighlightBehavior=True,
-                highlightColor="#FFD700",
-                collapsible=True,
-                physicsOptions={
-                    "barnesHut": {
-                        "gravitationalConstant": spacing_params["gravity"],  # Paramètre ajustable
-                        "centralGravity": 0.1,
-                        "springLength": spacing_params["spring"],            # Paramètre ajustable
-                        "springConstant": 0.02,
-                        "damping": 0.5,
-                        "avoidOverlap": 1
-                    },
-                    "solver": "barnesHut",
-                    "stabilization": {
-                        "enabled": True,
-                        "iterations": 500,
-                        "updateInterval": 25,
-                        "fit": True
-                    },
-                    "minVelocity": 0.75
-                }
-            )
-
-            # --- 3. CRÉATION DES OBJETS GRAPH ---
-            # Déterminer les nodes et edges actifs si mode focus
-            if st.session_state.focused_node:
-                connected_nodes = get_connected_nodes(st.session_state.focused_node, data['edges'])
-                active_node_ids = {st.session_state.focused_node} | connected_nodes
-                active_edges = get_relevant_edges(st.session_state.focused_node, data['edges'])
-            else:
-                active_node_ids = set(filtered_node_ids)
-                active_edges = filtered_edges_data
-            
-            nodes = []
-            for n in filtered_nodes_data:
-                node_color = color_map.get(n['type'], "#BDC3C7")
-                node_size = calculate_node_size(n['type'], n.get('importance', 5))
-                
-                # Appliquer le style atténué si pas dans le focus
-                if st.session_state.focused_node and n['id'] not in active_node_ids:
-                    # Couleur grise et taille réduite pour les nodes non connectés
-                    node_color = "#E0E0E0"
-                    node_size = node_size * 0.6
-                    opacity = 0.3
-                else:
-                    opacity = 1.0
-                
-                nodes.append(Node(
-                    id=n['id'], 
-                    label=n['label'], 
-                    size=node_size, 
-                    color=node_color,
-                    shape="dot"
-                ))
-
-            edges = []
-            for e in filtered_edges_data:
-                # Déterminer si l'edge est active
-                is_active = (not st.session_state.focused_node) or (e in active_edges)
-                
-                edge_color = "#95A5A6" if is_active else "#E8E8E8"
-                edge_width = 2 if is_active else 1
-                
-                # Afficher le label seulement si demandé par l'utilisateur ET si l'edge est active
-                edge_label = ''
-                if show_edge_labels and is_active:
-                    edge_label = e.get('label', '')
-                
-                edges.append(
-                    Edge(
-                        source=e['from'], 
-                        target=e['to'],
-                        label=edge_label,
-                        color=edge_color
-                    )
-                )
-
             # --- 4. AFFICHAGE SELON LE MODE DE VISUALISATION ---
             
             if viz_mode == "Network Graph":
                 # Mode graphe réseau classique
                 if st.session_state.focused_node:
-                    st.success("✨ focus mode active ! grayed nodes are not directly connected. click 'reset focus' to return.")
+                    st.success("✨ focus mode active ! grayed nodes are outside the focus (hops, relations or path in the sidebar). click 'reset focus' to return.")
                 else:
                     st.success("✨ graph ready! ! click un nœud to activate focus mode.")
                 
@@ -1136,26 +828,69 @@ Do not artificially limit yourself to "top N" items - extract everything relevan
                     - Les **couleurs** represent different categories
                     """)
                 
+                # --- 1. DÉFINITION DE LA CONFIGURATION (une instance par niveau d'espacement) ---
+                config = get_network_config(spacing_level, static_layout)
+                
+                # --- 3. CRÉATION DES OBJETS GRAPH (mémoïsée) ---
+                focused_node = st.session_state.focused_node
+                focus, focus_key = resolve_focus(index, focused_node)
+                # Layout serveur : calculé une fois par (graphe, niveau d'espacement)
+                layout_level = spacing_level if static_layout else None
+                positions = get_view(
+                    index, 'layout', (layout_level,), lambda: force_layout(index, layout_level)
+                ) if static_layout else None
+                # Niveau de détail : au-delà du seuil, seule la tranche visible (super-nœuds + groupes dépliés) est envoyée
+                expanded = st.session_state.lod_expanded
+                lod_threshold_used, lod_key = lod_settings(index, selected_types, lod_enabled, lod_group,
+                                                           lod_threshold, expanded)
+                network = get_view(
+                    index, 'network', (types_key, focus_key, show_edge_labels, layout_level, importance_source, lod_key),
+                    lambda: build_lod_elements(index, selected_types, focus, show_edge_labels, positions,
+                                               node_importance(index, importance_source), lod_threshold_used,
+                                               lod_group, expanded, focused_node)
+                )
+                nodes, edges = network.nodes, network.edges
+                
                 clicked_node_id = None
                 
                 # Center the graph using columns
                 col_left, col_center, col_right = st.columns([0.5, 9, 0.5])
                 with col_center:
-                    clicked_node_id = agraph(nodes=nodes, edges=edges, config=config)
-
-                # --- 5. GESTION DU CLIC (Activation du mode focus) ---
-                if clicked_node_id and clicked_node_id != st.session_state.focused_node:
+                    render_started = time.perf_counter()
+                    with metrics.timer("render", view="network", lod=str(network.level)):
+                        clicked_node_id = agraph(nodes=nodes, edges=edges, config=config)
+                    render_ms = (time.perf_counter() - render_started) * 1000
+                
+                # Coût de chaque niveau : éléments et octets envoyés, temps de rendu côté serveur
+                metrics.inc("network_payload_bytes", network.payload_bytes, lod=str(network.level))
+                st.session_state.setdefault('lod_stats', {})[str(network.level)] = (
+                    len(nodes), len(edges), network.payload_bytes, render_ms
+                )
+                if lod_key is not None:
+                    st.caption(f"🔭 level {network.level} : {len(nodes)} nodes, {len(edges)} edges sent "
+                               f"({network.payload_bytes / 1024:.0f} KB, rendered in {render_ms:.0f} ms) • "
+                               f"click a ◆ cluster to expand it")
+
+                # --- 5. GESTION DU CLIC (dépliage d'un cluster, ou activation du mode focus) ---
+                if clicked_node_id in network.clusters:
+                    path = network.clusters[clicked_node_id]
+                    if path is None:
+                        st.info("➕ raise 'max nodes sent' (level of detail) to show more of this group")
+                    elif path not in expanded:
+                        st.session_state.lod_expanded = expanded | {path}
+                        st.rerun()
+                elif clicked_node_id and clicked_node_id != st.session_state.focused_node:
                     st.session_state.focused_node = clicked_node_id
                     st.rerun()
                 
                 # Afficher les détails du nœud en focus
                 if st.session_state.focused_node:
-                    node_info = next((n for n in data['nodes'] if n['id'] == st.session_state.focused_node), None)
+                    node_info = index.node(st.session_state.focused_node)
                     
                     if node_info:
                         # Trouver les relationships
-                        incoming = [e for e in data['edges'] if e['to'] == st.session_state.focused_node]
-                        outgoing = [e for e in data['edges'] if e['from'] == st.session_state.focused_node]
+                        incoming = [data['edges'][i] for i in index.in_edge_ids(st.session_state.focused_node)]
+                        outgoing = [data['edges'][i] for i in index.out_edge_ids(st.session_state.focused_node)]
                         
                         with details_container.container():
                             st.markdown(f"### 📄 {node_info['label']}")
@@ -1170,17 +905,29 @@ Do not artificially limit yourself to "top N" items - extract everything relevan
                                 total_connections = len(incoming) + len(outgoing)
                                 st.markdown(f"**Connexions** : {total_connections}")
                             
+                            # Centralités calculées une fois par graphe (partagées entre sessions)
+                            analytics = index.analytics
+                            position = index.position(node_info['id'])
+                            st.caption(f"🕸️ PageRank {analytics.importance('pagerank')[position]}/10 • "
+                                       f"betweenness {analytics.importance('betweenness')[position]}/10 • "
+                                       f"community #{analytics.communities[position] + 1}")
+                            
+                            if focus is not None and focus.path:
+                                steps = " → ".join(index.node(node_id)['label'] if index.node(node_id) else node_id
+                                                   for node_id in focus.path)
+                                st.markdown(f"**🧭 path** ({len(focus.path) - 1} hop(s)) : {steps}")
+                            
                             if incoming:
                                 st.markdown("**⬅️ relationships entrantes** :")
                                 for e in incoming:
-                                    from_node = next((n for n in data['nodes'] if n['id'] == e['from']), None)
+                                    from_node = index.node(e['from'])
                                     if from_node:
                                         st.markdown(f"- {from_node['label']} **{e.get('label', '→')}** {node_info['label']}")
                             
                             if outgoing:
                                 st.markdown("**➡️ relationships sortantes** :")
                                 for e in outgoing:
-                                    to_node = next((n for n in data['nodes'] if n['id'] == e['to']), None)
+                                    to_node = index.node(e['to'])
                                     if to_node:
                                         st.markdown(f"- {node_info['label']} **{e.get('label', '→')}** {to_node['label']}")
             
@@ -1198,19 +945,21 @@ Do not artificially limit yourself to "top N" items - extract everything relevan
                     """)
                 
                 # filterr les données selon les catégories sélectionnées
-                filtered_data = {
-                    'nodes': [n for n in data['nodes'] if n['type'] in selected_types],
-                    'edges': [e for e in data['edges'] 
-                             if any(n['id'] == e['from'] and n['type'] in selected_types for n in data['nodes']) and
-                                any(n['id'] == e['to'] and n['type'] in selected_types for n in data['nodes'])]
-                }
+                filtered_data = type_selection.data()
                 
-                sankey_fig = create_sankey_diagram(filtered_data)
+                sankey_fig = get_view(
+                    index, 'sankey', (types_key, importance_source),
+                    lambda: create_sankey_diagram(
+                        filtered_data,
+                        None if importance_source == "llm" else index.analytics.importance_by_id(importance_source)
+                    )
+                )
                 
                 # Center the diagram using columns
                 col_left, col_center, col_right = st.columns([0.5, 9, 0.5])
                 with col_center:
-                    st.plotly_chart(sankey_fig, use_container_width=True)
+                    with metrics.timer("render", view="sankey"):
+                        st.plotly_chart(sankey_fig, use_container_width=True)
                 
                 # Stats rapides
                 col1, col2, col3 = st.columns(3)
@@ -1235,39 +984,36 @@ Do not artificially limit yourself to "top N" items - extract everything relevan
                     - **value** = skill importance level (0-10)
                     """)
                 
-                # filterr les données pour la matrix
-                filtered_data = {
-                    'nodes': [n for n in data['nodes'] if n['type'] in selected_types],
-                    'edges': data['edges']
-                }
+                # filterr les données pour la matrix (masque de catégories)
+                node_mask = type_selection.node_mask
                 
-                matrix_fig = create_skills_matrix(filtered_data)
+                matrix_fig = get_view(
+                    index, 'matrix', (types_key, importance_source),
+                    lambda: create_skills_matrix(index, node_mask, node_importance(index, importance_source))
+                )
                 
                 if matrix_fig:
                     # Center the matrix using columns
                     col_left, col_center, col_right = st.columns([0.5, 9, 0.5])
                     with col_center:
-                        st.plotly_chart(matrix_fig, use_container_width=True)
+                        with metrics.timer("render", view="matrix"):
+                            st.plotly_chart(matrix_fig, use_container_width=True)
                     
-                    # Insights
-                    skills = [n for n in filtered_data['nodes'] if n['type'] == 'Skill']
-                    projects = [n for n in filtered_data['nodes'] if n['type'] == 'Project']
+                    # Insights : usages par skill = somme des lignes de l'incidence
+                    skill_positions, project_positions, uses = index.incidence_matrix('USES', 'Skill', 'Project')
+                    usage_counts = uses.sum(axis=1)
+                    projects_count = int(node_mask[project_positions].sum())
                     
                     # Trouver la skill la plus utilisée
-                    skill_usage = {}
-                    for skill in skills:
-                        count = sum(1 for e in data['edges'] 
-                                  if e['to'] == skill['id'] and e['label'] == 'USES')
-                        skill_usage[skill['label']] = count
-                    
-                    if skill_usage:
-                        most_used_skill = max(skill_usage.items(), key=lambda x: x[1])
+                    if usage_counts.size:
+                        best = int(usage_counts.argmax())
+                        most_used_skill = (index.nodes[skill_positions[best]]['label'], int(usage_counts[best]))
                         
                         col1, col2 = st.columns(2)
                         with col1:
                             st.success(f"🏆 **most used skill** : {most_used_skill[0]} ({most_used_skill[1]} projects)")
                         with col2:
-                            avg_skills_per_project = sum(skill_usage.values()) / len(projects) if projects else 0
+                            avg_skills_per_project = int(usage_counts.sum()) / projects_count if projects_count else 0
                             st.info(f"📈 **average** : {avg_skills_per_project:.1f} skills per project")
                 else:
                     st.warning("⚠️ not enough data to generate matrix. Assurez-vous d'avoir des Skills et Projects dans les filters.")
@@ -1327,4 +1073,8 @@ st.markdown("""
     <a href='https://github.com/pcescato/knowledge-graph-cv' target='_blank' style='color: #0066cc; text-decoration: none;'>📂 View Source</a> | 
     <a href='https://dev.to' target='_blank' style='color: #0066cc; text-decoration: none;'>📝 Read the Story</a>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Fin du rerun (non atteinte après st.stop() / st.rerun())
+metrics.observe("phase_seconds", time.perf_counter() - rerun_started_at, phase="rerun", view=viz_mode)
+record_session_memory()
@@ -0,0 +1,251 @@
+"""Extraction en lot : dossier de CV PDF -> un graphe JSON par CV + manifest.
+
+Usage :
+    python batch_extract.py cvs/ --output graphs/ --concurrency 4 --rpm 30
+    python batch_extract.py cvs/ --stub --stub-latency 0.5   # sans réseau, pour benchmarker
+    python batch_extract.py cvs/ --text                      # envoie le texte extrait au lieu du PDF
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from extraction import extract_graph, prepare_contents
+from extraction_cache import ExtractionCache, extraction_key
+from prompts import SYSTEM_PROMPT, EXTRACTION_PROMPT
+
+# Codes HTTP considérés comme transitoires (quota, surcharge, timeout)
+RETRYABLE_CODES = {429, 500, 503, 504}
+
+
+class RateLimiter:
+    """Limiteur de débit partagé entre threads : au plus `per_minute` appels par minute"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class StubQuotaError(Exception):
+    """Erreur de quota simulée (même code que ResourceExhausted de google.api_core)"""
+    code = 429
+
+
+class StubModel:
+    """Remplace Gemini hors réseau : renvoie un graphe fixe après une latence simulée"""
+
+    def __init__(self, graph_path, latency=0.5, quota_error_rate=0.0, seed=0):
+        with open(graph_path, 'r', encoding='utf-8') as f:
+            self.graph_text = f.read()
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        """Même signature que Gemini (request_options... acceptés et ignorés)"""
+        time.sleep(self.latency)
+        with self._lock:
+            fail = self._rng.random() < self.quota_error_rate
+        if fail:
+            raise StubQuotaError("429 Resource has been exhausted (stub)")
+        # Même format que Gemini, balises ``` comprises
+        text = f"```json\n{self.graph_text}\n```"
+        if stream:
+            # Réponse découpée en morceaux, comme un flux Gemini
+            return [type("StubChunk", (), {"text": text[i:i + 256]})() for i in range(0, len(text), 256)]
+        return type("StubResponse", (), {"text": text})()
+
+
+def is_retryable(exc):
+    """Vrai pour les erreurs de quota / indisponibilité transitoires"""
+    code = getattr(exc, 'code', None)
+    try:
+        return int(code) in RETRYABLE_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+def extract_with_retry(model, contents, limiter, retries=5, base_delay=2.0, max_delay=60.0, extract=extract_graph):
+    """Appel rate-limité avec backoff exponentiel (+ jitter) sur les erreurs transitoires"""
+    attempt = 0
+    while True:
+        attempt += 1
+        limiter.wait()
+        try:
+            return extract(model, contents), attempt
+        except Exception as e:
+            if attempt > retries or not is_retryable(e):
+                e.attempts = attempt
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def process_cv(pdf_path, output_dir, model, model_name, limiter, cache, retries, pre_extract_text=False):
+    """Extrait un CV et écrit son graphe ; retourne l'entrée du manifest"""
+    name = os.path.splitext(os.path.basename(pdf_path))[0]
+    output_path = os.path.join(output_dir, f"{name}.json")
+    entry = {"file": pdf_path, "output": output_path, "status": "ok", "attempts": 0, "cached": False}
+    started_at = time.perf_counter()
+
+    try:
+        with open(pdf_path, 'rb') as f:
+            file_bytes = f.read()
+
+        variant = "text" if pre_extract_text else ""
+        key = extraction_key(file_bytes, model_name, SYSTEM_PROMPT, EXTRACTION_PROMPT, variant)
+        graph = cache.get(key) if cache else None
+        if graph is not None:
+            entry["cached"] = True
+        else:
+            contents, entry["input"] = prepare_contents(file_bytes, pre_extract_text)
+            graph, entry["attempts"] = extract_with_retry(model, contents, limiter, retries)
+            if cache:
+                cache.put(key, graph, time.perf_counter() - started_at)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(graph, f, ensure_ascii=False, indent=2)
+        entry["nodes"] = len(graph['nodes'])
+        entry["edges"] = len(graph['edges'])
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = f"{type(e).__name__}: {e}"
+        entry["attempts"] = getattr(e, 'attempts', entry["attempts"])
+
+    entry["seconds"] = round(time.perf_counter() - started_at, 3)
+    return entry
+
+
+def run_batch(pdf_paths, output_dir, model, model_name, concurrency=4, rpm=0, retries=5, cache=None,
+              progress=None, pre_extract_text=False):
+    """Traite les CV dans un pool de threads borné ; retourne le manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    limiter = RateLimiter(rpm)
+    started_at = time.perf_counter()
+    entries = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(process_cv, path, output_dir, model, model_name, limiter, cache, retries, pre_extract_text)
+            for path in pdf_paths
+        ]
+        for future in as_completed(futures):
+            entry = future.result()
+            entries.append(entry)
+            if progress:
+                progress(entry, len(entries), len(futures))
+
+    elapsed = time.perf_counter() - started_at
+    entries.sort(key=lambda e: e["file"])
+    succeeded = sum(1 for e in entries if e["status"] == "ok")
+    return {
+        "model": model_name,
+        "concurrency": concurrency,
+        "rpm": rpm,
+        "total": len(entries),
+        "succeeded": succeeded,
+        "failed": len(entries) - succeeded,
+        "cache_hits": sum(1 for e in entries if e["cached"]),
+        "bytes_saved": sum(e.get("input", {}).get("bytes_saved", 0) for e in entries),
+        "seconds": round(elapsed, 3),
+        "cv_per_minute": round(len(entries) / elapsed * 60, 2) if elapsed else 0.0,
+        "files": entries,
+    }
+
+
+def _int_at_least(minimum):
+    """Type argparse : entier >= minimum (message d'erreur clair au lieu d'une trace)"""
+    def parse(value):
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be >= {minimum} (got {number})")
+        return number
+    return parse
+
+
+def _non_negative_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid float value: {value!r}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0 (got {value})")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch CV -> knowledge graph extraction")
+    parser.add_argument("input_dir", help="dossier contenant les CV PDF")
+    parser.add_argument("--output", default="graphs", help="dossier de sortie des graphes JSON")
+    parser.add_argument("--model", default="gemini-3-flash-preview")
+    parser.add_argument("--concurrency", type=_int_at_least(1), default=4, help="nombre d'extractions simultanées")
+    parser.add_argument("--rpm", type=_int_at_least(0), default=0, help="limite de requêtes par minute (0 = illimité)")
+    parser.add_argument("--retries", type=_int_at_least(0), default=5, help="tentatives supplémentaires sur erreur de quota")
+    parser.add_argument("--no-cache", action="store_true", help="désactive le cache d'extraction")
+    parser.add_argument("--text", action="store_true",
+                        help="pré-extrait le texte des PDF localement (repli sur le PDF en cas d'échec)")
+    parser.add_argument("--stub", action="store_true", help="remplace Gemini par un modèle local (sans réseau)")
+    parser.add_argument("--stub-graph", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "demo_cv_data.json"))
+    parser.add_argument("--stub-latency", type=_non_negative_float, default=0.5)
+    parser.add_argument("--stub-quota-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    pdf_paths = sorted(
+        os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir)
+        if name.lower().endswith(".pdf")
+    )
+    model_name = f"models/{args.model}"
+
+    if args.stub:
+        model = StubModel(args.stub_graph, args.stub_latency, args.stub_quota_error_rate)
+        model_name = "stub"
+    else:
+        import google.generativeai as genai
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            parser.error("GOOGLE_API_KEY missing (or use --stub)")
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name, system_instruction=SYSTEM_PROMPT)
+
+    # Le stub ne doit ni lire ni polluer le cache des vraies extractions
+    cache = None if args.no_cache or args.stub else ExtractionCache()
+
+    def progress(entry, done, total):
+        status = "cache" if entry["cached"] else entry["status"]
+        print(f"[{done}/{total}] {status:<5} {entry['seconds']:>7.2f}s {entry['file']}", flush=True)
+
+    manifest = run_batch(pdf_paths, args.output, model, model_name, args.concurrency, args.rpm,
+                         args.retries, cache, progress, args.text)
+
+    manifest_path = os.path.join(args.output, "manifest.json")
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"{manifest['succeeded']}/{manifest['total']} ok in {manifest['seconds']}s "
+          f"({manifest['cv_per_minute']} CV/min) -> {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,664 @@
+"""Benchmarks des fonctions chaudes du rendu.
+
+Usage :
+    python benchmark.py                                   # suite complète, démo -> 100k edges
+    python benchmark.py --sizes demo,1000 --no-history    # rapide, sans écrire l'historique
+    python benchmark.py --sections matrix,inference       # comparaisons avec les anciens algorithmes
+
+Chaque exécution ajoute une ligne JSON à .benchmarks/history.jsonl (commit, versions,
+ms par mesure) et signale les régressions par rapport à l'exécution précédente.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from columnar_graph import ColumnarGraph
+from graph_analytics import GraphAnalytics
+from graph_index import GraphIndex
+from graph_logic import get_connected_nodes, get_relevant_edges, validate_and_enhance_graph
+from inference_rules import RuleSet, default_rules
+from level_of_detail import DEFAULT_LOD_THRESHOLD, build_lod_elements, lod_applies, payload_bytes
+from metrics import deep_sizeof
+from search_index import SearchIndex
+from shared_graph import GraphStore
+from view_cache import ViewCache
+from views import build_network_config, build_network_elements, create_sankey_diagram, create_skills_matrix
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEMO_PATH = os.path.join(ROOT, "demo_cv_data.json")
+HISTORY_PATH = os.path.join(ROOT, ".benchmarks", "history.jsonl")
+# Régression signalée au-delà de +25 % (et d'au moins 1 ms) par rapport à l'exécution précédente
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 1.0
+# Au-delà, la heatmap Skills × Projects n'est pas construite (matrice dense trop grosse)
+MATRIX_MAX_CELLS = 20_000_000
+
+# Vocabulaire des labels synthétiques (déclenche les règles d'inférence par mot-clé)
+SKILL_WORDS = ["Python", "LLM", "Gemini", "Astro", "Hugo", "PHP", "WordPress", "Docker", "Linux",
+               "NGINX", "Apache", "PostgreSQL", "MySQL", "Rust", "Go", "Kotlin", "Terraform"]
+CONCEPT_WORDS = ["AI Automation", "Web Performance", "Data Engineering", "SEO Strategy", "Security"]
+
+
+def synthetic_graph(n_skills, n_projects, uses_per_project=8, n_concepts=0, seed=42):
+    """Graphe CV synthétique reproductible : Person -> Projects -> USES -> Skills (+ Concepts)"""
+    rng = random.Random(seed)
+    nodes = [{"id": "person", "label": "Person", "type": "Person", "importance": 10}]
+    nodes += [{"id": f"skill_{i}", "label": f"{SKILL_WORDS[i % len(SKILL_WORDS)]} {i}", "type": "Skill",
+               "importance": rng.randint(4, 10)}
+              for i in range(n_skills)]
+    nodes += [{"id": f"project_{j}", "label": f"Project {j}", "type": "Project", "importance": rng.randint(5, 10)}
+              for j in range(n_projects)]
+    nodes += [{"id": f"concept_{k}", "label": f"{CONCEPT_WORDS[k % len(CONCEPT_WORDS)]} {k}", "type": "Concept",
+               "importance": rng.randint(5, 10)}
+              for k in range(n_concepts)]
+
+    edges = []
+    for j in range(n_projects):
+        edges.append({"from": "person", "to": f"project_{j}", "label": "CREATED"})
+        for i in rng.sample(range(n_skills), min(uses_per_project, n_skills)):
+            edges.append({"from": f"project_{j}", "to": f"skill_{i}", "label": "USES"})
+    return {"nodes": nodes, "edges": edges}
+
+
+# Forme du graphe de démo : (type source, label, type cible, edges pour 70)
+CV_EDGE_PATTERNS = [
+    ("Project", "USES", "Skill", 18), ("Concept", "IMPLEMENTED_IN", "Project", 11),
+    ("Project", "DEMONSTRATES", "Concept", 8), ("Skill", "ENABLES", "Concept", 5),
+    ("Skill", "PART_OF", "Concept", 4), ("Person", "MASTERS", "Skill", 3),
+    ("Person", "CREATED", "Project", 3), ("Person", "WORKED_AS", "Role", 3),
+    ("Person", "EXPERTISE_IN", "Concept", 3), ("Skill", "RUNS_ON", "Skill", 3),
+    ("Project", "RELATED_TO", "Project", 2), ("Skill", "REQUIRED_FOR", "Role", 2),
+    ("Skill", "REQUIRES", "Skill", 2), ("Concept", "SPANS", "Concept", 1),
+    ("Role", "AT_COMPANY", "Entity", 2),
+]
+# Nœuds par type pour 70 edges (démo : 17 skills, 5 projects, 5 concepts, 3 roles, 1 entity)
+CV_NODE_RATIOS = {"Skill": 17, "Project": 5, "Concept": 5, "Role": 3, "Entity": 1}
+
+
+def synthetic_cv_graph(n_edges, seed=42):
+    """Graphe CV reproductible à la forme de la démo, mis à l'échelle pour ~n_edges edges.
+
+    Un seul nœud Person ; les premiers skills / concepts portent des noms réels (Python,
+    AI Automation...) comme dans un graphe fusionné dédupliqué, les suivants sont neutres.
+    """
+    rng = random.Random(seed)
+    scale = n_edges / 70
+    nodes = [{"id": "person", "label": "Person", "type": "Person", "importance": 10}]
+    ids_by_type = {"Person": ["person"]}
+    for node_type, ratio in CV_NODE_RATIOS.items():
+        count = max(1, round(ratio * scale))
+        words = SKILL_WORDS if node_type == "Skill" else CONCEPT_WORDS if node_type == "Concept" else []
+        ids_by_type[node_type] = []
+        for i in range(count):
+            node_id = f"{node_type.lower()}_{i}"
+            label = words[i] if i < len(words) else f"{node_type} {i}"
+            nodes.append({"id": node_id, "label": label, "type": node_type, "importance": rng.randint(4, 10)})
+            ids_by_type[node_type].append(node_id)
+
+    edges = []
+    seen = set()
+    for source_type, label, target_type, count in CV_EDGE_PATTERNS:
+        wanted = max(1, round(count * scale))
+        sources, targets = ids_by_type[source_type], ids_by_type[target_type]
+        # Plafond : pas plus d'edges distinctes que de paires possibles
+        wanted = min(wanted, len(sources) * len(targets))
+        attempts = 0
+        while wanted and attempts < wanted * 20:
+            attempts += 1
+            key = (rng.choice(sources), rng.choice(targets), label)
+            if key[0] != key[1] and key not in seen:
+                seen.add(key)
+                edges.append({"from": key[0], "to": key[1], "label": label})
+                wanted -= 1
+    return {"nodes": nodes, "edges": edges}
+
+
+def load_size(size):
+    """Graphe pour une taille : 'demo' = demo_cv_data.json, sinon nombre d'edges synthétiques"""
+    if size == "demo":
+        with open(DEMO_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return synthetic_cv_graph(int(size))
+
+
+def legacy_matrix(data):
+    """Ancienne construction : any() sur toutes les edges pour chaque cellule, O(S·P·E)"""
+    skills = [n for n in data['nodes'] if n['type'] == 'Skill']
+    projects = [n for n in data['nodes'] if n['type'] == 'Project']
+    matrix = []
+    for skill in skills:
+        row = []
+        for project in projects:
+            uses_skill = any(
+                e['from'] == project['id'] and e['to'] == skill['id'] and e['label'] == 'USES'
+                for e in data['edges']
+            )
+            row.append(skill.get('importance', 5) if uses_skill else 0)
+        matrix.append(row)
+    return np.asarray(matrix)
+
+
+def lookup_matrix(data, index):
+    """Construction cellule par cellule avec lookup O(1) dans l'index"""
+    skills = [n for n in data['nodes'] if n['type'] == 'Skill']
+    projects = [n for n in data['nodes'] if n['type'] == 'Project']
+    project_uses = {p['id']: set(index.successors(p['id'], 'USES')) for p in projects}
+    return np.asarray([
+        [skill.get('importance', 5) if skill['id'] in project_uses[p['id']] else 0 for p in projects]
+        for skill in skills
+    ])
+
+
+def synthetic_rules(n_rules, seed=42):
+    """Jeu de règles volumineux : règles par défaut + règles tech sur des outils fictifs"""
+    rng = random.Random(seed)
+    base = default_rules()
+    tech_rules = [dict(r) for r in base.tech_rules]
+    for i in range(n_rules - len(tech_rules) - len(base.concept_rules)):
+        words = [w.lower() for w in SKILL_WORDS] + [f"tool{rng.randrange(n_rules)}"]
+        tech_rules.append({"name": f"synthetic {i}", "from": rng.choice(words), "to": f"tool{i}",
+                           "label": "INTEGRATES_WITH"})
+    return RuleSet(base.concept_rules, tech_rules)
+
+
+def legacy_related_projects(data):
+    """Ancienne étape 3a : intersection des skills pour chaque paire de projects, O(P²)"""
+    projects = [n['id'] for n in data['nodes'] if n['type'] == 'Project']
+    project_skills = {p: set() for p in projects}
+    for e in data['edges']:
+        if e['label'] == 'USES' and e['from'] in project_skills:
+            project_skills[e['from']].add(e['to'])
+    return [
+        (p1, p2) for i, p1 in enumerate(projects) for p2 in projects[i + 1:]
+        if len(project_skills[p1] & project_skills[p2]) >= 2
+    ]
+
+
+def timed(fn, repeat=3):
+    """Meilleur temps (secondes) sur `repeat` exécutions, et le dernier résultat"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def per_call(fn, args_list):
+    """Durée moyenne (secondes) d'un appel sur une liste d'arguments"""
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / max(1, len(args_list))
+
+
+def simulated_rerun(data, index=None, view_cache=None):
+    """Travail de rendu d'un rerun de l'app (sidebar + les trois vues), hors Streamlit.
+
+    Sans index ni cache : premier rendu d'un graphe (tout est construit).
+    Avec : rerun suivant (index réutilisé, vues servies par le cache).
+    """
+    index = index or GraphIndex(data)
+    view_cache = view_cache if view_cache is not None else ViewCache()
+    selected_types = sorted(index.type_counts())
+    types_key = tuple(selected_types)
+
+    # Sidebar : statistiques, filtre de catégories, légende
+    index.type_counts()
+    selection = index.select_types(selected_types)
+
+    # Vues (mêmes clés que l'app)
+    threshold = DEFAULT_LOD_THRESHOLD if lod_applies(index, selected_types, DEFAULT_LOD_THRESHOLD) else None
+    lod_key = ("community", threshold, ()) if threshold else None
+    view_cache.get_or_build((index.version, 'network', (types_key, None, False, None, "llm", lod_key)),
+                            lambda: build_lod_elements(index, selected_types, threshold=threshold))
+    build_network_config("Ultra Wide")
+    view_cache.get_or_build((index.version, 'sankey', (types_key, "llm")),
+                            lambda: create_sankey_diagram(selection.data()))
+    type_counts = index.type_counts()
+    if type_counts.get('Skill', 0) * type_counts.get('Project', 0) <= MATRIX_MAX_CELLS:
+        view_cache.get_or_build((index.version, 'matrix', (types_key, "llm")),
+                                lambda: create_skills_matrix(index, selection.node_mask))
+    return index, view_cache
+
+
+def bench_suite(sizes, seed=42):
+    """Chronomètre chaque fonction chaude, de la démo à ~100k edges ; {mesure: secondes}"""
+    results = {}
+    for size in sizes:
+        raw_text = json.dumps(load_size(size))
+        data = validate_and_enhance_graph(json.loads(raw_text))
+        n_edges = len(data['edges'])
+        tag = size  # clé stable d'une exécution à l'autre (taille demandée)
+        repeat = 5 if n_edges < 5000 else 3 if n_edges < 50_000 else 1
+        print(f"-- {tag}: {len(data['nodes'])} nodes / {n_edges} edges", flush=True)
+
+        def record(name, seconds):
+            results[f"{name}/{tag}"] = seconds
+            print(f"{name:<40} {seconds * 1000:>12.3f} ms", flush=True)
+
+        # validate_and_enhance_graph modifie son entrée : copie fraîche hors chrono
+        best = float("inf")
+        for _ in range(repeat):
+            fresh = json.loads(raw_text)
+            start = time.perf_counter()
+            validate_and_enhance_graph(fresh)
+            best = min(best, time.perf_counter() - start)
+        record("validate_and_enhance_graph", best)
+
+        t_index, index = timed(lambda: GraphIndex(data), repeat)
+        record("GraphIndex", t_index)
+
+        # Mémoire de l'index seul (les dicts du graphe sont référencés, pas copiés)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        measured = GraphIndex(data)
+        index_bytes = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        print(f"{'  memory: dicts / GraphIndex':<40} {deep_sizeof(data) / 1024:>10.0f} KiB / "
+              f"{index_bytes / 1024:.0f} KiB (columns {measured.columns.nbytes / 1024:.0f} KiB)", flush=True)
+
+        t_columns, columns = timed(lambda: ColumnarGraph.from_json(data), repeat)
+        record("ColumnarGraph.from_json", t_columns)
+        record("ColumnarGraph.to_json", timed(columns.to_json, repeat)[0])
+        print(f"{'  memory: dicts / columns + attributes':<40} {deep_sizeof(data) / 1024:>10.0f} KiB / "
+              f"{columns.nbytes / 1024:.0f} KiB", flush=True)
+
+        def uncached_filter():
+            index._type_filters.clear()
+            return index.select_types(["Skill", "Project", "Concept"])
+        record("filter_by_types (uncached)", timed(uncached_filter, repeat)[0])
+
+        selected_types = sorted(index.type_counts())
+        selection = index.select_types(selected_types)
+        record("create_sankey_diagram", timed(lambda: create_sankey_diagram(selection.data()), repeat)[0])
+
+        skills, projects = index.type_counts().get('Skill', 0), index.type_counts().get('Project', 0)
+        if skills * projects <= MATRIX_MAX_CELLS:
+            mask = selection.node_mask
+            record("create_skills_matrix", timed(lambda: create_skills_matrix(GraphIndex(data), mask), repeat)[0])
+            record("create_skills_matrix (cached incidence)",
+                   timed(lambda: create_skills_matrix(index, mask), repeat)[0])
+        else:
+            print(f"{'create_skills_matrix':<40} skipped ({skills}x{projects} cells)")
+
+        # Appels unitaires : nœud le plus connecté + échantillon aléatoire
+        rng = random.Random(seed)
+        hub = index.nodes[int(np.argmax(index.degree_array))]['id']
+        sample = [(hub, index)] + [(rng.choice(index.nodes)['id'], index) for _ in range(999)]
+        record("get_connected_nodes (per call)", per_call(get_connected_nodes, sample))
+        record("get_relevant_edges (per call)", per_call(get_relevant_edges, sample))
+        focus = index.focus
+        record("focus 2 hops (per call)", per_call(lambda node_id, _: focus._neighborhood(node_id, 2, None), sample[:200]))
+        targets = [(node_id, rng.choice(index.nodes)['id']) for node_id, _ in sample[:200]]
+        record("focus shortest path (per call)", per_call(lambda a, b: focus._path(a, b, None), targets))
+
+        t_search, search_index = timed(lambda: SearchIndex(index), repeat)
+        record("SearchIndex", t_search)
+        queries = ["p", "py", "pyhton", "script", "data engin", "skill 12"]
+
+        def uncached_search(query):
+            search_index._cache.clear()
+            return search_index.search(query, 10)
+        record("node search top-10 (per query)", per_call(uncached_search, [(q,) for q in queries]))
+
+        def analytics(measure):
+            # Objet neuf à chaque mesure : le résultat est sinon mémoïsé
+            return lambda: getattr(GraphAnalytics(index), measure)
+        for measure in ("pagerank", "betweenness", "communities"):
+            record(f"analytics {measure}", timed(analytics(measure), repeat)[0])
+        pagerank_importance = index.analytics.importance("pagerank")
+        record("network Node/Edge build (PageRank sizes)",
+               timed(lambda: build_network_elements(index, selected_types, importance=pagerank_importance), repeat)[0])
+
+        if lod_applies(index, selected_types, DEFAULT_LOD_THRESHOLD):
+            overview = build_lod_elements(index, selected_types, threshold=DEFAULT_LOD_THRESHOLD)
+            record("network LOD overview build", timed(
+                lambda: build_lod_elements(index, selected_types, threshold=DEFAULT_LOD_THRESHOLD), repeat)[0])
+            first = next(path for path in overview.clusters.values() if path is not None)
+            record("network LOD expanded cluster build", timed(
+                lambda: build_lod_elements(index, selected_types, threshold=DEFAULT_LOD_THRESHOLD,
+                                           expanded=frozenset([first])), repeat)[0])
+            full_nodes, full_edges = build_network_elements(index, selected_types)
+            print(f"{'  payload: full / LOD overview':<40} {payload_bytes(full_nodes, full_edges) / 1024:>10.0f} KiB / "
+                  f"{overview.payload_bytes / 1024:.0f} KiB ({len(overview.nodes)} nodes, {len(overview.edges)} edges)",
+                  flush=True)
+
+        record("network Node/Edge build", timed(lambda: build_network_elements(index, selected_types), repeat)[0])
+        record("network Node/Edge build (focus hub)",
+               timed(lambda: build_network_elements(index, selected_types, focus.neighborhood(hub)), repeat)[0])
+
+        record("rerun (cold: first render)", timed(lambda: simulated_rerun(data), repeat)[0])
+        warm_index, warm_cache = simulated_rerun(data)
+        record("rerun (warm: cached views)",
+               timed(lambda: simulated_rerun(data, warm_index, warm_cache), max(repeat, 5))[0])
+    return results
+
+
+def bench_app_rerun(reruns=20):
+    """Reruns réels de app.py (Streamlit AppTest) sur la démo : médiane en secondes"""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    app.run()
+    durations = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        durations.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(f"app.py raised: {app.exception[0].value}")
+    return statistics.median(durations)
+
+
+def bench_sessions(n_sessions=200):
+    """Mémoire et temps d'ouverture par session : démo chargée par session vs graphe partagé.
+
+    Retourne [(mesure, valeur)] : octets par session (tracemalloc) et secondes par session.
+    """
+    def legacy_session():
+        with open(DEMO_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {"graph_data": data, "graph_index": GraphIndex(data)}
+
+    store = GraphStore()
+    process = {}
+
+    def shared_session():
+        # Comme get_demo_graph() : chargée au premier appel du process, simple référence ensuite
+        if "demo" not in process:
+            with open(DEMO_PATH, 'r', encoding='utf-8') as f:
+                process["demo"] = store.share(json.load(f), pin=True)
+        return {"graph_data": process["demo"].data}
+
+    results = []
+    for name, open_session in (("per-session copy", legacy_session), ("shared", shared_session)):
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        sessions = [open_session() for _ in range(n_sessions)]
+        seconds = (time.perf_counter() - start) / n_sessions
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        results.append((f"{name}: bytes per session (tracemalloc)", allocated / n_sessions))
+        results.append((f"{name}: bytes per session (deep_sizeof)",
+                        deep_sizeof(sessions[-1], exclude=store.shared_objects())))
+        results.append((f"{name}: seconds per session open", seconds))
+    return results
+
+
+def bench_snapshot(visits=20, sessions=5):
+    """Coût d'une visite de la démo : snapshot statique (serveur de fichiers) vs session Streamlit live.
+
+    Retourne [(mesure, valeur, unité)]. Côté statique, le CPU compte aussi le client
+    HTTP (même process) : c'est un majorant, Caddy fait mieux que http.server. Côté
+    live, AppTest n'a ni websocket ni navigateur : c'est un minorant.
+    """
+    import shutil
+    import tempfile
+    import threading
+    import urllib.request
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    from streamlit.testing.v1 import AppTest
+
+    from build_snapshot import build_snapshot
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    results = []
+    out_dir = tempfile.mkdtemp(prefix="snapshot-")
+    try:
+        t_build, manifest = timed(lambda: build_snapshot(DEMO_PATH, out_dir), repeat=1)
+        results.append(("snapshot build", t_build * 1000, "ms"))
+        results.append(("static first visit: transferred (gzip)", manifest['first_visit']['gzip'] / 1024, "KiB"))
+
+        # Première visite : page, Plotly, figure du Network
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=out_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/"
+        paths = ["index.html", f"assets/plotly-{manifest['plotly']}.min.js", manifest['views']['network']]
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        cpu = time.process_time()
+        for _ in range(visits):
+            for path in paths:
+                with urllib.request.urlopen(base + path) as response:
+                    response.read()
+        results.append(("static visit: CPU (server + client)", (time.process_time() - cpu) / visits * 1000, "ms"))
+        results.append(("static visit: memory kept per visitor",
+                        max(0, tracemalloc.get_traced_memory()[0] - baseline) / visits / 1024, "KiB"))
+        tracemalloc.stop()
+        server.shutdown()
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # Sessions live : premier rendu de la démo, sessions gardées ouvertes comme des websockets
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    app_path = os.path.join(ROOT, "app.py")
+    AppTest.from_file(app_path, default_timeout=60).run()   # imports et caches du process
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    cpu = time.process_time()
+    open_sessions = []
+    for _ in range(sessions):
+        app = AppTest.from_file(app_path, default_timeout=60)
+        app.run()
+        open_sessions.append(app)
+    results.append(("live session: CPU (first render)", (time.process_time() - cpu) / sessions * 1000, "ms"))
+    results.append(("live session: memory kept per session",
+                    (tracemalloc.get_traced_memory()[0] - baseline) / sessions / 1024, "KiB"))
+    tracemalloc.stop()
+    return results
+
+
+def git_revision():
+    """(commit court, arbre modifié ?) ou (None, None) hors dépôt git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(results, path=HISTORY_PATH):
+    """Ajoute une exécution (ms par mesure) à l'historique JSON Lines"""
+    commit, dirty = git_revision()
+    entry = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results_ms": {name: round(seconds * 1000, 4) for name, seconds in results.items()},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def regressions(results, previous):
+    """Mesures plus lentes que dans l'exécution précédente : [(nom, avant ms, après ms)]"""
+    before = previous.get("results_ms", {})
+    slower = []
+    for name, seconds in results.items():
+        ms = seconds * 1000
+        if name in before and ms > before[name] * REGRESSION_RATIO and ms - before[name] >= REGRESSION_MIN_MS:
+            slower.append((name, before[name], ms))
+    return slower
+
+
+def bench_skills_matrix(n_skills, n_projects, legacy_skills, legacy_projects):
+    """Compare les constructions de la matrice Skills × Projects"""
+    results = []
+
+    small = synthetic_graph(legacy_skills, legacy_projects)
+    t_legacy, legacy = timed(lambda: legacy_matrix(small), repeat=1)
+    _, _, vectorised_small = GraphIndex(small).weighted_incidence('USES', 'Skill', 'Project')
+    assert np.array_equal(legacy, vectorised_small), "vectorised matrix differs from legacy"
+    results.append((f"legacy any() scan {legacy_skills}x{legacy_projects}", t_legacy))
+    t_small, _ = timed(lambda: GraphIndex(small).weighted_incidence('USES', 'Skill', 'Project'))
+    results.append((f"vectorised (cold) {legacy_skills}x{legacy_projects}", t_small))
+
+    data = synthetic_graph(n_skills, n_projects)
+    index = GraphIndex(data)
+    t_lookup, lookup = timed(lambda: lookup_matrix(data, index))
+    results.append((f"per-cell index lookup {n_skills}x{n_projects}", t_lookup))
+
+    t_cold, (_, _, vectorised) = timed(lambda: GraphIndex(data).weighted_incidence('USES', 'Skill', 'Project'))
+    assert np.array_equal(lookup, vectorised), "vectorised matrix differs from lookup"
+    results.append((f"vectorised incl. index build {n_skills}x{n_projects}", t_cold))
+
+    # Filtre de catégories = masque sur la matrice déjà en cache
+    mask = index.type_mask(["Skill", "Project"])
+    index.incidence_matrix('USES', 'Skill', 'Project')
+    t_warm, _ = timed(lambda: index.weighted_incidence('USES', 'Skill', 'Project', mask), repeat=10)
+    results.append((f"vectorised cached + mask {n_skills}x{n_projects}", t_warm))
+
+    return results
+
+
+def bench_inference(n_nodes, legacy_nodes, n_rules):
+    """Enrichissement (validate_and_enhance_graph) sur un graphe fusionné de n_nodes nœuds"""
+    results = []
+
+    def sized_graph(total):
+        # Répartition type CV fusionné : 50 % skills, 45 % projects, 5 % concepts
+        return synthetic_graph(total // 2, total * 9 // 20, uses_per_project=4, n_concepts=total // 20)
+
+    small = sized_graph(legacy_nodes)
+    t_legacy, pairs = timed(lambda: legacy_related_projects(small), repeat=1)
+    results.append((f"legacy project pairs (step 3a) {legacy_nodes} nodes", t_legacy))
+
+    # validate_and_enhance_graph modifie son entrée : une copie fraîche par exécution
+    text = json.dumps(small)
+    enhanced = validate_and_enhance_graph(json.loads(text))
+    related = {(e['from'], e['to']) for e in enhanced['edges'] if e['label'] == 'RELATED_TO'}
+    assert related == set(pairs), "inverted-index pairs differ from legacy"
+
+    for total in (legacy_nodes, n_nodes):
+        text = json.dumps(sized_graph(total))
+        best = float("inf")
+        for _ in range(3):
+            data = json.loads(text)
+            start = time.perf_counter()
+            enhanced = validate_and_enhance_graph(data)
+            best = min(best, time.perf_counter() - start)
+        results.append((f"validate_and_enhance_graph {total} nodes / {len(enhanced['edges'])} edges", best))
+
+    # Table de règles volumineuse : compilation une fois, puis une passe par graphe
+    t_compile, rules = timed(lambda: synthetic_rules(n_rules), repeat=1)
+    results.append((f"compile {n_rules} rules", t_compile))
+    data = json.loads(text)
+    t_rules, _ = timed(lambda: validate_and_enhance_graph(data, rules), repeat=1)
+    results.append((f"validate_and_enhance_graph {n_nodes} nodes, {n_rules} rules", t_rules))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", default="suite,app,sessions",
+                        help="sections à exécuter parmi suite, app, sessions, matrix, inference, snapshot "
+                             "(séparées par des virgules)")
+    parser.add_argument("--sizes", default="demo,1000,10000,100000",
+                        help="tailles de la suite : 'demo' ou un nombre d'edges synthétiques")
+    parser.add_argument("--app-reruns", type=int, default=20, help="reruns réels de app.py (section app)")
+    parser.add_argument("--sessions", type=int, default=200, help="sessions simulées (section sessions)")
+    parser.add_argument("--history", default=HISTORY_PATH, help="historique JSON Lines des résultats")
+    parser.add_argument("--no-history", action="store_true", help="n'écrit pas l'historique")
+    parser.add_argument("--skills", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--legacy-skills", type=int, default=100,
+                        help="taille réduite pour l'ancien algorithme (O(S·P·E))")
+    parser.add_argument("--legacy-projects", type=int, default=100)
+    parser.add_argument("--inference-nodes", type=int, default=12000,
+                        help="taille du graphe fusionné pour l'enrichissement")
+    parser.add_argument("--legacy-inference-nodes", type=int, default=3000)
+    parser.add_argument("--rules", type=int, default=5000, help="taille de la table de règles synthétique")
+    parser.add_argument("--visits", type=int, default=20, help="visites de la démo statique (section snapshot)")
+    args = parser.parse_args()
+    sections = args.sections.split(",")
+    results = {}
+
+    if "suite" in sections:
+        print("== hot functions ==")
+        results.update(bench_suite(args.sizes.split(",")))
+
+    if "app" in sections:
+        print("== app.py reruns (AppTest, demo) ==")
+        median = bench_app_rerun(args.app_reruns)
+        results["app rerun (median)/demo"] = median
+        print(f"{'app rerun (median)':<40} {median * 1000:>12.3f} ms")
+
+    if "sessions" in sections:
+        print(f"== demo sessions ({args.sessions}) ==")
+        for name, value in bench_sessions(args.sessions):
+            if name.endswith("open"):
+                results[f"sessions/{name}"] = value
+                print(f"{name:<55} {value * 1000:>10.3f} ms")
+            else:
+                print(f"{name:<55} {value / 1024:>10.1f} KiB")
+
+    if "matrix" in sections:
+        print("== skills matrix ==")
+        for name, seconds in bench_skills_matrix(args.skills, args.projects,
+                                                 args.legacy_skills, args.legacy_projects):
+            results[f"matrix/{name}"] = seconds
+            print(f"{name:<55} {seconds * 1000:>10.2f} ms")
+
+    if "inference" in sections:
+        print("== relationship inference ==")
+        for name, seconds in bench_inference(args.inference_nodes, args.legacy_inference_nodes, args.rules):
+            results[f"inference/{name}"] = seconds
+            print(f"{name:<55} {seconds * 1000:>10.2f} ms")
+
+    if "snapshot" in sections:
+        print("== demo visit: static snapshot vs live session ==")
+        for name, value, unit in bench_snapshot(args.visits):
+            if unit == "ms":
+                results[f"snapshot/{name}"] = value / 1000
+            print(f"{name:<55} {value:>10.1f} {unit}")
+
+    if args.no_history or not results:
+        return
+    history = load_history(args.history)
+    entry = append_history(results, args.history)
+    print(f"== history: {args.history} ({len(history) + 1} runs, commit {entry['commit']}"
+          f"{' + local changes' if entry['dirty'] else ''}) ==")
+    if history:
+        slower = regressions(results, history[-1])
+        for name, before_ms, after_ms in slower:
+            print(f"REGRESSION {name}: {before_ms:.3f} ms -> {after_ms:.3f} ms")
+        if not slower:
+            print(f"no regression vs previous run (commit {history[-1].get('commit')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Liste de blocage IP unique (blocklist.txt) : matcher CIDR en arbre radix + génération Caddy.
+
+Usage :
+    python blocklist.py --caddyfile Caddyfile   # régénère le bloc @denylist du Caddyfile
+    python blocklist.py --check 185.136.92.10   # teste une adresse
+"""
+import argparse
+import ipaddress
+import os
+import re
+import threading
+import time
+
+DEFAULT_BLOCKLIST_PATH = os.getenv(
+    "BLOCKLIST_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "blocklist.txt")
+)
+
+
+class _RadixNode:
+    __slots__ = ("key", "length", "network", "children")
+
+    def __init__(self, key, length, network=None):
+        self.key = key          # les `length` premiers bits du préfixe
+        self.length = length
+        self.network = network  # réseau bloqué qui se termine sur ce nœud, sinon None
+        self.children = [None, None]
+
+
+class PrefixTree:
+    """Arbre radix compressé (Patricia) des préfixes d'une famille d'adresses.
+
+    Recherche en O(longueur de préfixe) : on descend bit à bit le long des seuls
+    nœuds de branchement, le premier réseau rencontré contient l'adresse.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = _RadixNode(0, 0)
+        self.size = 0
+
+    def insert(self, network):
+        key = int(network.network_address) >> (self.bits - network.prefixlen)
+        length = network.prefixlen
+        self.size += 1
+        node = self.root
+        while True:
+            if node.length == length:
+                node.network = node.network or network
+                return
+            bit = (key >> (length - node.length - 1)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _RadixNode(key, length, network)
+                return
+
+            # Préfixe commun entre le fils existant et le nouveau réseau
+            common = min(child.length, length)
+            child_head = child.key >> (child.length - common)
+            diff = child_head ^ (key >> (length - common))
+            if diff == 0 and child.length <= length:
+                node = child
+                continue
+            if diff == 0:
+                # Le nouveau réseau contient le fils : il s'insère au-dessus
+                inserted = _RadixNode(key, length, network)
+                inserted.children[(child.key >> (child.length - length - 1)) & 1] = child
+                node.children[bit] = inserted
+                return
+
+            # Branchement au premier bit qui diffère
+            split_length = common - diff.bit_length()
+            split = _RadixNode(child_head >> (common - split_length), split_length)
+            split.children[(child.key >> (child.length - split_length - 1)) & 1] = child
+            split.children[(key >> (length - split_length - 1)) & 1] = _RadixNode(key, length, network)
+            node.children[bit] = split
+            return
+
+    def lookup(self, address):
+        """Réseau bloqué contenant l'adresse (entier), ou None"""
+        node = self.root
+        while node is not None:
+            if address >> (self.bits - node.length) != node.key:
+                return None
+            if node.network is not None:
+                return node.network
+            if node.length == self.bits:
+                return None
+            node = node.children[(address >> (self.bits - node.length - 1)) & 1]
+        return None
+
+
+def parse_blocklist(text):
+    """Réseaux (ip_network) d'un fichier de blocage ; ValueError avec le numéro de ligne"""
+    networks = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        entry = line.split('#', 1)[0].strip()
+        if not entry:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError as e:
+            raise ValueError(f"blocklist line {line_number}: {e}") from None
+    return networks
+
+
+class Blocklist:
+    """Matcher IPv4/IPv6 rechargé à chaud quand le fichier source change.
+
+    Le fichier est re-vérifié au plus toutes les `check_interval` secondes ; un fichier
+    invalide est ignoré (la liste précédente reste active, l'erreur est dans stats()).
+    """
+
+    def __init__(self, path=DEFAULT_BLOCKLIST_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._trees = {4: PrefixTree(32), 6: PrefixTree(128)}
+        self._mtime = None
+        self._next_check = 0.0
+        self.networks = []
+        self.reloads = 0
+        self.matches = 0
+        self.last_error = None
+        self.reload()
+
+    def reload(self):
+        """Relit le fichier et remplace les arbres d'un bloc"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                networks = parse_blocklist(f.read())
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            return False
+
+        trees = {4: PrefixTree(32), 6: PrefixTree(128)}
+        for network in networks:
+            trees[network.version].insert(network)
+        with self._lock:
+            self._trees, self.networks, self._mtime = trees, networks, mtime
+            self.reloads += 1
+            self.last_error = None
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            changed = False
+        if changed:
+            self.reload()
+
+    def match(self, ip):
+        """Réseau bloqué contenant `ip` (chaîne), ou None (adresse invalide comprise)"""
+        self._maybe_reload()
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        network = self._trees[address.version].lookup(int(address))
+        if network is not None:
+            with self._lock:
+                self.matches += 1
+        return network
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ranges": len(self.networks),
+                "reloads": self.reloads,
+                "matches": self.matches,
+                "last_error": self.last_error,
+            }
+
+
+def caddy_matcher(networks, per_line=16):
+    """Bloc @denylist Caddy (matcher client_ip, CIDR natif) pour les réseaux donnés"""
+    ranges = [str(n) for n in networks]
+    lines = [
+        "    # Généré par blocklist.py depuis blocklist.txt : ne pas éditer à la main",
+        "    @denylist {",
+    ]
+    for i in range(0, len(ranges), per_line):
+        lines.append("        client_ip " + " ".join(ranges[i:i + per_line]))
+    lines.append("    }")
+    return "\n".join(lines)
+
+
+# Bloc @denylist existant (et son commentaire éventuel) dans le Caddyfile
+DENYLIST_BLOCK = re.compile(r"(?:[ \t]*#[^\n]*\n)?[ \t]*@denylist \{\n.*?\n[ \t]*\}", re.S)
+
+
+def update_caddyfile(caddyfile_path, networks):
+    """Remplace le bloc @denylist du Caddyfile par celui généré depuis la liste"""
+    with open(caddyfile_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if not DENYLIST_BLOCK.search(content):
+        raise ValueError(f"no @denylist block found in {caddyfile_path}")
+    content = DENYLIST_BLOCK.sub(lambda _: caddy_matcher(networks), content, count=1)
+    with open(caddyfile_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IP blocklist tools")
+    parser.add_argument("--source", default=DEFAULT_BLOCKLIST_PATH, help="fichier de blocage (CIDR par ligne)")
+    parser.add_argument("--caddyfile", help="Caddyfile dont le bloc @denylist est régénéré")
+    parser.add_argument("--check", metavar="IP", help="indique si une adresse est bloquée")
+    args = parser.parse_args()
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        networks = parse_blocklist(f.read())
+    if not networks:
+        parser.error(f"{args.source} contains no ranges")
+
+    if args.check:
+        network = Blocklist(args.source).match(args.check)
+        print(f"{args.check}: blocked by {network}" if network else f"{args.check}: allowed")
+    elif args.caddyfile:
+        update_caddyfile(args.caddyfile, networks)
+        print(f"{args.caddyfile}: @denylist regenerated ({len(networks)} ranges)")
+    else:
+        print(caddy_matcher(networks))
+
+
+if __name__ == "__main__":
+    main()
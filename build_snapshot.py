@@ -0,0 +1,209 @@
+"""Snapshot statique de la démo : CV de démo pré-rendu, servi par Caddy sans session Streamlit.
+
+Usage :
+    python build_snapshot.py                                  # demo_cv_data.json -> snapshot/
+    python build_snapshot.py --graph autre.json --out public/ --app-url /app/
+
+Bundle autonome (aucune ressource externe) :
+    index.html                      page : onglets Network / Flow / Matrix, lien vers l'app live
+    assets/plotly-<version>.min.js  Plotly, servi localement
+    data/<vue>.<empreinte>.json     figures Plotly (layout du Network précalculé côté serveur)
+    manifest.json                   empreinte du graphe, fichiers, tailles brutes et gzip
+
+Les figures portent l'empreinte du graphe dans leur nom : elles peuvent être mises
+en cache indéfiniment, seul index.html change d'une démo à l'autre.
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+
+import plotly
+from plotly.offline import get_plotlyjs
+
+from graph_index import GraphIndex
+from layout import force_layout
+from views import create_network_figure, create_sankey_diagram, create_skills_matrix
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GRAPH = os.path.join(ROOT, "demo_cv_data.json")
+DEFAULT_OUT = os.path.join(ROOT, "snapshot")
+# Streamlit est servi sous ce chemin (--server.baseUrlPath) ; ?upload=1 ouvre directement l'uploader
+DEFAULT_APP_URL = "/app/"
+SPACING_LEVEL = "Ultra Wide"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>AI Knowledge Graph CV Builder</title>
+<style>
+  body { margin: 0; font-family: Verdana, "Segoe UI", "Noto Sans", sans-serif; color: #262730; }
+  header { display: flex; align-items: center; justify-content: space-between; flex-wrap: wrap;
+           gap: 12px; padding: 16px 24px; border-bottom: 1px solid #e6e6e6; }
+  h1 { font-size: 22px; margin: 0; }
+  .cta { background: #FF4B4B; color: white; padding: 10px 18px; border-radius: 8px; text-decoration: none; }
+  .notice { margin: 16px 24px; padding: 12px 16px; background: #e8f4fd; border-radius: 8px; }
+  nav { margin: 0 24px; display: flex; gap: 8px; }
+  nav button { border: 1px solid #d0d0d0; background: white; padding: 8px 14px; border-radius: 8px; cursor: pointer; }
+  nav button.active { background: #262730; color: white; border-color: #262730; }
+  .stats { margin: 12px 24px; color: #555; font-size: 14px; }
+  .view { display: none; margin: 0 24px 24px; }
+  .view.active { display: block; }
+</style>
+</head>
+<body>
+<header>
+  <h1>🕸️ AI Knowledge Graph CV Builder</h1>
+  <a class="cta" href="__APP_URL__?upload=1">🚀 Upload Your Own CV</a>
+</header>
+<div class="notice">💡 <b>Demo Mode</b>: pre-rendered snapshot of the demo CV. Upload your own CV to start a live analysis.</div>
+<nav>
+  <button data-view="network" class="active">🕸️ Network Graph</button>
+  <button data-view="sankey">🌊 Flow Diagram</button>
+  <button data-view="matrix">📊 Skills Matrix</button>
+</nav>
+<div class="stats">__STATS__ • <span id="focus">click a node to highlight its connections</span></div>
+<div id="network" class="view active"></div>
+<div id="sankey" class="view"></div>
+<div id="matrix" class="view"></div>
+<script src="__PLOTLY__"></script>
+<script id="neighbors" type="application/json">__NEIGHBORS__</script>
+<script>
+const FIGURES = __FIGURES__;
+const NEIGHBORS = JSON.parse(document.getElementById("neighbors").textContent);
+const loaded = {};
+let focused = null;
+
+// Figures chargées à la demande : la première visite ne télécharge que le Network
+async function show(view) {
+  document.querySelectorAll("nav button").forEach(b => b.classList.toggle("active", b.dataset.view === view));
+  document.querySelectorAll(".view").forEach(v => v.classList.toggle("active", v.id === view));
+  const div = document.getElementById(view);
+  if (!FIGURES[view]) { div.textContent = "No data for this view."; return; }
+  if (!loaded[view]) {
+    loaded[view] = true;
+    const figure = await (await fetch(FIGURES[view])).json();
+    await Plotly.newPlot(div, figure.data, figure.layout, {responsive: true, displaylogo: false});
+    if (view === "network") div.on("plotly_click", event => focus(div, event.points[0]));
+  }
+  Plotly.Plots.resize(div);
+}
+
+// Mode focus : le nœud cliqué et ses voisins restent opaques, un second clic réinitialise
+function focus(div, point) {
+  const id = point.customdata;
+  if (id === undefined) return;
+  focused = focused === id ? null : id;
+  const active = new Set(focused ? [focused, ...(NEIGHBORS[focused] || [])] : []);
+  const traces = div.data.map((trace, i) => i).filter(i => div.data[i].customdata);
+  const opacity = traces.map(i => div.data[i].customdata.map(c => !focused || active.has(c) ? 1 : 0.15));
+  Plotly.restyle(div, {"marker.opacity": opacity}, traces);
+  document.getElementById("focus").textContent = focused
+    ? `focus: ${point.text} (${active.size - 1} connections) • click it again to reset`
+    : "click a node to highlight its connections";
+}
+
+document.querySelectorAll("nav button").forEach(b => b.addEventListener("click", () => show(b.dataset.view)));
+show("network");
+</script>
+</body>
+</html>
+"""
+
+
+def render_views(data, spacing_level=SPACING_LEVEL):
+    """Figures des trois vues (tous types, sans focus) et voisins de chaque nœud"""
+    index = GraphIndex(data)
+    positions = force_layout(index, spacing_level)
+    figures = {
+        "network": create_network_figure(index, positions),
+        "sankey": create_sankey_diagram(data),
+        "matrix": create_skills_matrix(index),
+    }
+    neighbors = {node['id']: sorted(index.neighbors(node['id']), key=str) for node in index.nodes}
+    return index, figures, neighbors
+
+
+def _script_json(value):
+    """JSON inclus dans une balise <script> (pas de fermeture de balise possible)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).replace("</", "<\\/")
+
+
+def _write(out_dir, relative_path, content):
+    path = os.path.join(out_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = content.encode("utf-8") if isinstance(content, str) else content
+    with open(path, "wb") as f:
+        f.write(payload)
+    return {"bytes": len(payload), "gzip": len(gzip.compress(payload, 9))}
+
+
+def build_snapshot(graph_path=DEFAULT_GRAPH, out_dir=DEFAULT_OUT, app_url=DEFAULT_APP_URL):
+    """Écrit le bundle statique dans out_dir et retourne son manifest"""
+    with open(graph_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    index, figures, neighbors = render_views(data)
+    fingerprint = index.version[:12]
+
+    plotly_path = f"assets/plotly-{plotly.__version__}.min.js"
+    files = {plotly_path: _write(out_dir, plotly_path, get_plotlyjs())}
+
+    figure_paths = {}
+    for view, figure in figures.items():
+        if figure is None:
+            continue
+        figure_paths[view] = f"data/{view}.{fingerprint}.json"
+        files[figure_paths[view]] = _write(out_dir, figure_paths[view], figure.to_json())
+
+    # Fichiers d'un build précédent (autre empreinte, autre version de Plotly) : supprimés
+    for folder in ("assets", "data"):
+        for name in os.listdir(os.path.join(out_dir, folder)) if os.path.isdir(os.path.join(out_dir, folder)) else ():
+            if f"{folder}/{name}" not in files:
+                os.remove(os.path.join(out_dir, folder, name))
+
+    density = len(index.edges) / len(index.nodes) if index.nodes else 0
+    page = (PAGE_TEMPLATE
+            .replace("__APP_URL__", app_url)
+            .replace("__PLOTLY__", plotly_path)
+            .replace("__STATS__", f"{len(index.nodes)} nodes • {len(index.edges)} relationships • density {density:.1f}")
+            .replace("__NEIGHBORS__", _script_json(neighbors))
+            .replace("__FIGURES__", _script_json(figure_paths)))
+    files["index.html"] = _write(out_dir, "index.html", page)
+
+    manifest = {
+        "graph": os.path.basename(graph_path),
+        "version": index.version,
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "plotly": plotly.__version__,
+        "views": figure_paths,
+        "files": files,
+        # Première visite : page + Plotly + figure du Network (les autres vues à la demande)
+        "first_visit": {
+            key: sum(files[p][key] for p in ("index.html", plotly_path, figure_paths.get("network", "index.html")))
+            for key in ("bytes", "gzip")
+        },
+    }
+    _write(out_dir, "manifest.json", json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graph", default=DEFAULT_GRAPH, help="graphe JSON à pré-rendre")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="dossier du bundle (servi par Caddy)")
+    parser.add_argument("--app-url", default=DEFAULT_APP_URL, help="URL de l'app Streamlit live")
+    args = parser.parse_args()
+
+    manifest = build_snapshot(args.graph, args.out, args.app_url)
+    print(f"snapshot {manifest['version'][:12]} -> {args.out}")
+    for path, size in sorted(manifest['files'].items()):
+        print(f"  {path:<45} {size['bytes'] / 1024:>9.1f} KiB  (gzip {size['gzip'] / 1024:.1f} KiB)")
+    first = manifest['first_visit']
+    print(f"  first visit: {first['bytes'] / 1024:.0f} KiB ({first['gzip'] / 1024:.0f} KiB gzip), no Streamlit session")
+
+
+if __name__ == "__main__":
+    main()
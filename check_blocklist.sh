@@ -0,0 +1,79 @@
+#!/bin/bash
+# Vérifie que le @denylist du Caddyfile bloque vraiment les IPs de blocklist.txt.
+#
+# client_ip ne lit X-Forwarded-For que si la requête vient d'un proxy de confiance
+# (trusted_proxies du Caddyfile). Sinon Caddy voit l'adresse du proxy, aucune plage
+# ne correspond et rien n'est bloqué, sans erreur : d'où ce test.
+#
+#   ./check_blocklist.sh                                   # local : caddy adapt + Caddy lancé (root : alias réseau)
+#   ./check_blocklist.sh https://knowledge-graph-cv-xxx.run.app   # derrière le vrai proxy (Cloud Run)
+
+CADDYFILE="${CADDYFILE:-Caddyfile}"
+# Une IP d'une plage bloquée et une IP libre (TEST-NET-1)
+BLOCKED_IP="${BLOCKED_IP:-185.136.92.10}"
+ALLOWED_IP="${ALLOWED_IP:-192.0.2.1}"
+# Adresse source locale dans la plage trusted_proxies (169.254.0.0/16, front-end Cloud Run)
+PROXY_IP="${PROXY_IP:-169.254.10.1}"
+PORT=8080
+FAILED=0
+
+status() {
+    # status <url> <X-Forwarded-For> [options curl] -> code HTTP
+    local url="$1" forwarded="$2"
+    shift 2
+    curl -s -o /dev/null -w '%{http_code}' -H "X-Forwarded-For: $forwarded" "$@" "$url"
+}
+
+expect() {
+    # expect <description> <code attendu : 403 ou "not 403"> <code obtenu>
+    local description="$1" expected="$2" got="$3"
+    if { [ "$expected" = "403" ] && [ "$got" = "403" ]; } || { [ "$expected" != "403" ] && [ "$got" != "403" ]; }; then
+        echo "✅ $description : $got"
+    else
+        echo "❌ $description : $got (attendu : $expected)"
+        FAILED=1
+    fi
+}
+
+python blocklist.py --check "$BLOCKED_IP" | grep -q "blocked by" || {
+    echo "❌ $BLOCKED_IP n'est pas dans blocklist.txt : choisir BLOCKED_IP dans une plage bloquée"
+    exit 1
+}
+
+if [ -n "${1:-}" ]; then
+    # Derrière le vrai proxy : le front-end ajoute l'IP réelle après celle envoyée,
+    # client_ip retient la première ; un 200 ici veut dire que le proxy n'est pas de confiance
+    URL="${1%/}/"
+    expect "IP bloquée via le proxy ($BLOCKED_IP)" 403 "$(status "$URL" "$BLOCKED_IP")"
+    expect "IP libre via le proxy ($ALLOWED_IP)" "not 403" "$(status "$URL" "$ALLOWED_IP")"
+    exit $FAILED
+fi
+
+# 1. Le Caddyfile se charge et garde client_ip + trusted_proxies
+ADAPTED=$(caddy adapt --config "$CADDYFILE" --adapter caddyfile 2>/dev/null) || {
+    echo "❌ caddy adapt : $CADDYFILE invalide"
+    exit 1
+}
+echo "$ADAPTED" | grep -q '"trusted_proxies"' || { echo "❌ trusted_proxies absent"; FAILED=1; }
+echo "$ADAPTED" | grep -q '"client_ip"' || { echo "❌ matcher client_ip absent"; FAILED=1; }
+
+# 2. Caddy lancé sur ce Caddyfile ; les requêtes partent d'une adresse de la plage de confiance
+ip addr add "$PROXY_IP/32" dev lo 2>/dev/null || ip addr show dev lo | grep -q "$PROXY_IP" || {
+    echo "❌ alias $PROXY_IP impossible sur lo (root / CAP_NET_ADMIN requis)"
+    exit 1
+}
+caddy run --config "$CADDYFILE" --adapter caddyfile >/dev/null 2>&1 &
+CADDY_PID=$!
+trap 'kill $CADDY_PID 2>/dev/null; ip addr del "$PROXY_IP/32" dev lo 2>/dev/null' EXIT
+sleep 2
+
+URL="http://$PROXY_IP:$PORT/"
+expect "IP bloquée via un proxy de confiance ($BLOCKED_IP)" 403 \
+    "$(status "$URL" "$BLOCKED_IP" --interface "$PROXY_IP")"
+expect "IP libre via un proxy de confiance ($ALLOWED_IP)" "not 403" \
+    "$(status "$URL" "$ALLOWED_IP" --interface "$PROXY_IP")"
+# Proxy hors trusted_proxies : X-Forwarded-For ignoré, l'IP bloquée passe (mode d'échec documenté)
+expect "IP bloquée via un proxy NON déclaré (127.0.0.1)" "not 403" \
+    "$(status "http://127.0.0.1:$PORT/" "$BLOCKED_IP")"
+
+exit $FAILED
@@ -0,0 +1,287 @@
+"""Forme en colonnes d'un graphe {'nodes': [...], 'edges': [...]} : la structure de GraphIndex.
+
+Les ids sont internés (id -> entier), les extrémités des edges, les types de nœuds
+et les labels d'edges sont des tableaux numpy de codes. L'adjacence (edges
+sortantes / entrantes d'un id) est un tableau CSR dérivé de ces codes : aucun
+dict ni liste Python par nœud ou par edge.
+
+Chaque autre attribut de nœud ou d'edge est une colonne : codes entiers +
+vocabulaire pour les chaînes, tableau numérique pour les nombres. La conversion
+est exacte dans les deux sens (to_json() == le JSON d'origine, ordre des clés
+compris) : l'ordre et la présence des clés de chaque élément sont gardés sous
+forme de « motif » interné. GraphIndex se passe des colonnes (attributes=False) :
+ses attributs restent dans les dicts du graphe, partagés et jamais copiés.
+"""
+import numpy as np
+
+from metrics import sized
+
+# Code des valeurs absentes (clé non présente dans l'élément, ou extrémité sans nœud)
+MISSING = -1
+
+
+def _code_dtype(size):
+    """Plus petit type entier signé pouvant coder `size` valeurs (et MISSING)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class Column:
+    """Une colonne d'attribut : chaînes codées, entiers, flottants ou objets quelconques"""
+
+    __slots__ = ("kind", "values", "vocabulary")
+
+    def __init__(self, kind, values, vocabulary=None):
+        self.kind = kind                # "str" | "int" | "float" | "object"
+        self.values = values
+        self.vocabulary = vocabulary    # "str" seulement : code -> chaîne
+
+    @classmethod
+    def encode(cls, values, present):
+        """Colonne la plus compacte pour ces valeurs (`present` : la clé existe dans l'élément)"""
+        kept = [v for v, p in zip(values, present) if p]
+        if kept and all(type(v) is str for v in kept):
+            codes = {}
+            encoded = [codes.setdefault(v, len(codes)) if p else MISSING for v, p in zip(values, present)]
+            return cls("str", np.asarray(encoded, dtype=_code_dtype(len(codes))), list(codes))
+        if kept and all(type(v) is int for v in kept) and all(-2**63 <= v < 2**63 for v in kept):
+            return cls("int", np.asarray([v if p else 0 for v, p in zip(values, present)], dtype=np.int64))
+        if kept and all(type(v) is float for v in kept):
+            return cls("float", np.asarray([v if p else 0.0 for v, p in zip(values, present)], dtype=np.float64))
+        return cls("object", [v if p else None for v, p in zip(values, present)])
+
+    def decode(self):
+        """Liste Python des valeurs (positions absentes comprises, à filtrer par le motif)"""
+        if self.kind == "str":
+            vocabulary = self.vocabulary
+            return [vocabulary[c] if c != MISSING else None for c in self.values.tolist()]
+        return self.values.tolist() if self.kind in ("int", "float") else list(self.values)
+
+    @property
+    def nbytes(self):
+        if self.kind == "object":
+            return 8 * len(self.values)
+        return self.values.nbytes + sum(len(v) + 49 for v in self.vocabulary or ())
+
+
+class _Records:
+    """Éléments (nœuds ou edges) en colonnes + motif de clés par élément"""
+
+    def __init__(self, items, skip=()):
+        pattern_codes = {}
+        self.patterns = np.asarray(
+            [pattern_codes.setdefault(tuple(item), len(pattern_codes)) for item in items],
+            dtype=_code_dtype(len(pattern_codes))
+        )
+        self.pattern_keys = list(pattern_codes)
+        keys = []
+        for pattern in self.pattern_keys:
+            keys.extend(k for k in pattern if k not in keys and k not in skip)
+        self.columns = {}
+        for key in keys:
+            present = [key in item for item in items]
+            self.columns[key] = Column.encode([item.get(key) for item in items], present)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    @property
+    def nbytes(self):
+        return self.patterns.nbytes + sum(column.nbytes for column in self.columns.values())
+
+
+def csr_ranges(offsets, rows):
+    """Positions (concaténées) des lignes `rows` d'un tableau CSR décrit par offsets, sans boucle Python"""
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return shift + np.arange(int(lengths.sum()))
+
+
+def _csr(keys, n_rows):
+    """(offsets, positions) : positions des éléments groupées par clé, dans leur ordre d'origine"""
+    positions = np.argsort(keys, kind="stable").astype(np.int32)
+    offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_rows), out=offsets[1:])
+    return offsets, positions
+
+
+@sized
+class ColumnarGraph:
+    """Graphe compact : ids internés, endpoints, types et labels en tableaux, adjacence CSR,
+    attributs en colonnes.
+
+    - ids[i] : id du i-ème code ; au-delà de n_nodes, ids référencés par des edges
+      mais sans nœud (edges pendantes)
+    - node_id_codes : code d'id de chaque nœud ; node_position : code -> position
+      du nœud (MISSING sans nœud ; ids en double : le dernier l'emporte)
+    - src / dst : code d'id des extrémités de chaque edge (int32)
+    - node_type : code de type par nœud (types = vocabulaire)
+    - edge_label : code de label par edge (labels = vocabulaire, MISSING sans label)
+    - node_records / edge_records : colonnes d'attributs et motifs de clés
+      (None avec attributes=False : to_json() n'est alors pas disponible)
+    """
+
+    def __init__(self, data, attributes=True):
+        nodes = data.get('nodes', [])
+        edges = data.get('edges', [])
+        # Autres clés de premier niveau (rares) : conservées telles quelles
+        self.extra = [(k, v) for k, v in data.items() if k not in ('nodes', 'edges')]
+        self.keys = list(data)
+
+        self.ids = []
+        self.id_index = {}
+        for node in nodes:
+            self._intern(node.get('id'))
+        self.n_nodes = len(self.ids)
+        self._duplicate_ids = len(self.id_index) != len(nodes)
+        # Code d'id de chaque nœud (identité, sauf ids en double dans un graphe non validé)
+        self.node_id_codes = np.asarray([self.id_index[n.get('id')] for n in nodes], dtype=np.int32) \
+            if self._duplicate_ids else np.arange(len(nodes), dtype=np.int32)
+
+        self.node_records = _Records(nodes, skip=('id',)) if attributes else None
+        self.edge_records = _Records(edges, skip=('from', 'to')) if attributes else None
+        self.src = np.asarray([self._intern(e.get('from')) for e in edges], dtype=np.int32)
+        self.dst = np.asarray([self._intern(e.get('to')) for e in edges], dtype=np.int32)
+
+        self.node_type, self.types = self._category(self.node_records, nodes, 'type')
+        self.edge_label, self.labels = self._category(self.edge_records, edges, 'label')
+
+        self.node_position = np.full(len(self.ids), MISSING, dtype=np.int32)
+        self.node_position[self.node_id_codes] = np.arange(len(nodes), dtype=np.int32)
+
+        # Code de type de chaque extrémité d'edge (MISSING si pendante), calculé une fois :
+        # une sélection de types se résout ensuite par simple lookup dans une table de booléens
+        id_type = np.full(len(self.ids), MISSING, dtype=self.node_type.dtype)
+        id_type[self.node_id_codes] = self.node_type
+        self.src_type = id_type[self.src]
+        self.dst_type = id_type[self.dst]
+        # Id en double avec des types différents : le type d'une extrémité est ambigu
+        self._ambiguous_endpoints = self._duplicate_ids and bool(
+            (id_type[self.node_id_codes] != self.node_type).any()
+        )
+
+        # Edges sortantes / entrantes de chaque code d'id : une tranche contiguë
+        self.out_offsets, self.out_edges = _csr(self.src, len(self.ids))
+        self.in_offsets, self.in_edges = _csr(self.dst, len(self.ids))
+
+    def _intern(self, node_id):
+        code = self.id_index.get(node_id)
+        if code is None:
+            code = self.id_index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+        return code
+
+    @staticmethod
+    def _category(records, items, key):
+        """(codes, vocabulaire) d'un attribut catégoriel ; partagés avec la colonne si ce sont des chaînes"""
+        column = records.columns.get(key) if records is not None else None
+        if column is not None and column.kind == "str":
+            return column.values, column.vocabulary
+        # Sans colonnes, ou valeurs hétérogènes (graphe non validé) : codes dédiés,
+        # MISSING si absente ou non hachable
+        vocabulary = {}
+        codes = []
+        for item in items:
+            try:
+                codes.append(MISSING if key not in item else vocabulary.setdefault(item[key], len(vocabulary)))
+            except TypeError:
+                codes.append(MISSING)
+        return np.asarray(codes, dtype=_code_dtype(len(vocabulary))), list(vocabulary)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data)
+
+    def to_json(self):
+        """Graphe au format JSON d'origine (mêmes clés, même ordre, mêmes valeurs)"""
+        if self.node_records is None:
+            raise ValueError("ColumnarGraph built with attributes=False cannot be converted back to JSON")
+        node_ids = [self.ids[c] for c in self.node_id_codes.tolist()]
+        nodes = self._rebuild(self.node_records, {'id': node_ids})
+        edges = self._rebuild(self.edge_records, {
+            'from': [self.ids[c] for c in self.src.tolist()],
+            'to': [self.ids[c] for c in self.dst.tolist()],
+        })
+        parts = {'nodes': nodes, 'edges': edges, **dict(self.extra)}
+        return {key: parts[key] for key in self.keys}
+
+    @staticmethod
+    def _rebuild(records, fixed):
+        columns = {key: column.decode() for key, column in records.columns.items()}
+        columns.update(fixed)
+        patterns = records.pattern_keys
+        return [
+            {key: columns[key][i] for key in patterns[p]}
+            for i, p in enumerate(records.patterns.tolist())
+        ]
+
+    # --- opérations vectorisées ---
+
+    @property
+    def n_edges(self):
+        return len(self.src)
+
+    def code(self, node_id):
+        """Code d'un id (None s'il n'apparaît nulle part dans le graphe)"""
+        return self.id_index.get(node_id)
+
+    def out_edge_ids(self, code):
+        """Positions des edges sortant d'un code d'id (ordre de data['edges'])"""
+        return self.out_edges[self.out_offsets[code]:self.out_offsets[code + 1]]
+
+    def in_edge_ids(self, code):
+        """Positions des edges arrivant sur un code d'id (ordre de data['edges'])"""
+        return self.in_edges[self.in_offsets[code]:self.in_offsets[code + 1]]
+
+    def label_code(self, label):
+        """Code d'un label d'edge (None s'il n'existe pas dans le graphe)"""
+        return self.labels.index(label) if label in self.labels else None
+
+    def type_codes(self, selected_types):
+        """Codes des types sélectionnés présents dans le graphe"""
+        wanted = set(selected_types)
+        return np.asarray([code for code, t in enumerate(self.types) if t in wanted], dtype=np.int64)
+
+    def type_mask(self, selected_types):
+        """Masque booléen des nœuds dont le type est sélectionné"""
+        return np.isin(self.node_type, self.type_codes(selected_types))
+
+    def type_selection(self, selected_types):
+        """(masque des nœuds, masque des edges) des types sélectionnés, en O(N + E) vectorisé"""
+        # Table code de type -> sélectionné ; la dernière case sert au code MISSING (-1)
+        table = np.zeros(len(self.types) + 1, dtype=bool)
+        table[self.type_codes(selected_types)] = True
+        node_mask = table[self.node_type]
+        if self._ambiguous_endpoints:
+            return node_mask, self.edge_mask(node_mask)
+        return node_mask, table[self.src_type] & table[self.dst_type]
+
+    def edge_mask(self, node_mask):
+        """Edges dont les deux extrémités sont des nœuds du masque (edges pendantes exclues)"""
+        id_mask = np.zeros(len(self.ids), dtype=bool)
+        id_mask[self.node_id_codes[node_mask]] = True
+        return id_mask[self.src] & id_mask[self.dst]
+
+    def label_mask(self, label):
+        code = self.label_code(label)
+        if code is None:
+            return np.zeros(self.n_edges, dtype=bool)
+        return self.edge_label == code
+
+    def node_column(self, key):
+        """Colonne d'un attribut de nœud (values : tableau numpy pour les colonnes numériques)"""
+        if self.node_records is None:
+            raise ValueError("ColumnarGraph built with attributes=False has no attribute columns")
+        return self.node_records.columns[key]
+
+    @property
+    def nbytes(self):
+        """Taille approximative en mémoire (tableaux + dict des ids + colonnes d'attributs s'il y en a)"""
+        arrays = (self.node_id_codes, self.node_position, self.src, self.dst, self.node_type, self.edge_label,
+                  self.src_type, self.dst_type, self.out_offsets, self.out_edges, self.in_offsets, self.in_edges)
+        records = sum(r.nbytes for r in (self.node_records, self.edge_records) if r is not None)
+        return sum(a.nbytes for a in arrays) + 8 * len(self.ids) + 100 * len(self.id_index) + records
@@ -0,0 +1,223 @@
+import json
+import time
+
+from graph_logic import validate_and_enhance_graph
+from metrics import metrics
+from pdf_text import PdfTextError, extract_pdf_text
+from prompts import EXTRACTION_PROMPT
+
+
+def build_contents(file_bytes, prompt=EXTRACTION_PROMPT):
+    """Contenu de la requête Gemini : le PDF brut suivi du prompt d'extraction"""
+    return [
+        {"mime_type": "application/pdf", "data": file_bytes},
+        prompt
+    ]
+
+
+def build_text_contents(text, prompt=EXTRACTION_PROMPT):
+    """Contenu de la requête Gemini : le texte extrait du CV suivi du prompt d'extraction"""
+    return [
+        f"CV text (extracted from the PDF):\n\n{text}",
+        prompt
+    ]
+
+
+def prepare_contents(file_bytes, pre_extract_text=False, prompt=EXTRACTION_PROMPT):
+    """Retourne (contents, rapport) : texte extrait localement si demandé, sinon (ou en cas d'échec) le PDF"""
+    if pre_extract_text:
+        try:
+            text, report = extract_pdf_text(file_bytes)
+            return build_text_contents(text, prompt), report
+        except PdfTextError as e:
+            return build_contents(file_bytes, prompt), {"mode": "pdf", "pdf_bytes": len(file_bytes),
+                                                         "fallback_reason": str(e)}
+    return build_contents(file_bytes, prompt), {"mode": "pdf", "pdf_bytes": len(file_bytes)}
+
+
+def model_name(model):
+    """Nom du modèle pour les métriques (les modèles de test n'en ont pas)"""
+    return getattr(model, "model_name", type(model).__name__)
+
+
+def request_options(timeout):
+    """Options de requête Gemini : timeout HTTP si demandé (les modèles de test n'en ont pas)"""
+    return {"request_options": {"timeout": timeout}} if timeout else {}
+
+
+def generate(model, contents, timeout=None):
+    """Appel Gemini bloquant, chronométré ; tokens et coût relevés dans usage_metadata"""
+    name = model_name(model)
+    with metrics.timer("model", mode="blocking"):
+        response = model.generate_content(contents, **request_options(timeout))
+    metrics.record_usage(getattr(response, "usage_metadata", None), name)
+    return response
+
+
+def extract_graph(model, contents):
+    """Extraction bloquante : appel Gemini, parsing puis validation du graphe"""
+    response = generate(model, contents)
+    with metrics.timer("parse"):
+        raw_data = parse_graph_response(response.text)
+    with metrics.timer("validate"):
+        return validate_and_enhance_graph(raw_data)
+
+
+def parse_graph_response(text):
+    """Nettoie les balises ``` de la réponse Gemini et parse le JSON du graphe"""
+    clean_json = text.replace("```json", "").replace("```", "").strip()
+    return json.loads(clean_json)
+
+
+class GraphStreamParser:
+    """Parser JSON incrémental pour une réponse {"nodes": [...], "edges": [...]}.
+
+    On lui donne les morceaux de texte au fil de l'eau (feed) ; il retourne les
+    nodes et edges dès que leur objet JSON est complet, sans attendre la fin de
+    la réponse. Tout ce qui précède la première accolade (balises ```json) est ignoré.
+    """
+
+    # Profondeurs : 1 = objet racine, 2 = tableau nodes/edges, 3 = un élément
+    ITEM_DEPTH = 3
+    KEYS = {"nodes": "node", "edges": "edge"}
+
+    def __init__(self):
+        # Morceaux reçus (joints une seule fois, à la lecture de .text) et texte
+        # encore nécessaire au parsing : depuis le début de l'élément ou de la chaîne en cours
+        self.chunks = []
+        self.buffer = ""
+        # Temps passé à parser (hors attente du réseau) et usage_metadata du dernier chunk
+        self.parse_seconds = 0.0
+        self.usage = None
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_string = None
+        self.current_key = None
+        self.array_key = None
+        self.item_start = None
+        # Vrai une fois l'accolade fermante de l'objet racine reçue (flux non tronqué)
+        self.complete = False
+        self.nodes = []
+        self.edges = []
+
+    @property
+    def text(self):
+        """Texte complet reçu jusqu'ici"""
+        if len(self.chunks) > 1:
+            self.chunks = ["".join(self.chunks)]
+        return self.chunks[0] if self.chunks else ""
+
+    def feed(self, chunk):
+        """Ajoute un morceau de texte, retourne la liste des (kind, item) complétés"""
+        started_at = time.perf_counter()
+        self.chunks.append(chunk)
+        completed = []
+        text = self.buffer + chunk
+
+        for i in range(self.pos, len(text)):
+            char = text[i]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self.last_string = text[self.string_start + 1:i]
+                continue
+
+            if char == '"':
+                if self.depth > 0:
+                    self.in_string = True
+                    self.string_start = i
+            elif char == ':' and self.depth == 1:
+                self.current_key = self.last_string
+            elif char in '{[':
+                self.depth += 1
+                if self.depth == 2 and char == '[':
+                    self.array_key = self.current_key
+                elif self.depth == self.ITEM_DEPTH and char == '{':
+                    self.item_start = i
+            elif char in '}]':
+                if self.depth == self.ITEM_DEPTH and char == '}' and self.item_start is not None:
+                    kind = self.KEYS.get(self.array_key)
+                    if kind:
+                        try:
+                            item = json.loads(text[self.item_start:i + 1])
+                        except json.JSONDecodeError:
+                            item = None
+                        if isinstance(item, dict):
+                            (self.nodes if kind == "node" else self.edges).append(item)
+                            completed.append((kind, item))
+                    self.item_start = None
+                elif self.depth == 2:
+                    self.array_key = None
+                elif self.depth == 1 and char == '}':
+                    self.complete = True
+                self.depth = max(0, self.depth - 1)
+
+        # Seul le texte de l'élément (ou de la chaîne) en cours est gardé pour le prochain morceau
+        keep = len(text)
+        if self.item_start is not None:
+            keep = self.item_start
+        elif self.in_string:
+            keep = self.string_start
+        self.buffer = text[keep:]
+        if self.item_start is not None:
+            self.item_start -= keep
+        if self.in_string:
+            self.string_start -= keep
+        self.pos = len(self.buffer)
+        self.parse_seconds += time.perf_counter() - started_at
+        return completed
+
+    def finish(self):
+        """Retourne le graphe complet ; repli sur un parsing classique si le flux était atypique.
+
+        Un flux tronqué (limite de tokens, connexion coupée) lève json.JSONDecodeError
+        au lieu de rendre les éléments reçus comme un graphe terminé.
+        """
+        if self.complete and (self.nodes or self.edges):
+            return {'nodes': self.nodes, 'edges': self.edges}
+        return parse_graph_response(self.text)
+
+
+def stream_graph_items(model, contents, parser=None, timeout=None):
+    """Appelle Gemini en streaming et produit les (kind, item) au fur et à mesure.
+
+    La phase "model" ne compte que l'attente des chunks : ni le parsing incrémental
+    (phase "parse"), ni le temps passé par l'appelant entre deux items.
+    """
+    parser = parser or GraphStreamParser()
+    waited = 0.0
+    try:
+        started_at = time.perf_counter()
+        chunks = iter(model.generate_content(contents, stream=True, **request_options(timeout)))
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            finally:
+                waited += time.perf_counter() - started_at
+            # Le dernier chunk porte le décompte de tokens de toute la réponse
+            parser.usage = getattr(chunk, "usage_metadata", None) or parser.usage
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk sans partie texte (ex. fin de génération, safety)
+                text = ""
+            for item in parser.feed(text):
+                yield item
+            started_at = time.perf_counter()
+    finally:
+        metrics.observe("phase_seconds", waited, phase="model", mode="streaming")
+        metrics.observe("phase_seconds", parser.parse_seconds, phase="parse", mode="streaming")
+        metrics.log("phase", phase="model", mode="streaming", seconds=round(waited, 6),
+                    parse_seconds=round(parser.parse_seconds, 6), chars=len(parser.text))
+        metrics.record_usage(parser.usage, model_name(model))
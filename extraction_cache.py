@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Dossier du cache disque (surchargeable pour Cloud Run / volume monté)
+DEFAULT_CACHE_DIR = os.getenv(
+    "EXTRACTION_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "extractions")
+)
+
+
+def extraction_key(file_bytes, model_name, system_prompt, extraction_prompt, variant=""):
+    """Clé SHA-256 du couple (PDF, modèle, prompts) : même entrée = même graphe.
+
+    variant distingue les modes d'envoi (ex. "text" pour la pré-extraction locale) ;
+    vide, la clé est identique à celle des entrées déjà en cache.
+    """
+    digest = hashlib.sha256()
+    parts = [file_bytes, model_name.encode('utf-8'), system_prompt.encode('utf-8'), extraction_prompt.encode('utf-8')]
+    if variant:
+        parts.append(variant.encode('utf-8'))
+    for part in parts:
+        # Préfixe de longueur pour éviter les collisions par concaténation
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Cache à deux niveaux (mémoire process + disque) des graphes validés, en LRU borné"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_memory_entries=64,
+                 max_disk_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        # On stocke le JSON sérialisé : chaque lecture rend une copie indépendante
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "seconds_saved": 0.0,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Retourne le graphe en cache (copie) ou None"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                entry = json.loads(payload)
+                self._counters["seconds_saved"] += entry.get("extraction_seconds", 0.0)
+                return entry["graph"]
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = f.read()
+            entry = json.loads(payload)
+            # Touche le fichier : le mtime sert d'horodatage LRU côté disque
+            os.utime(path, None)
+        except (OSError, ValueError):
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        with self._lock:
+            self._remember(key, payload)
+            self._counters["disk_hits"] += 1
+            self._counters["seconds_saved"] += entry.get("extraction_seconds", 0.0)
+        return entry["graph"]
+
+    def put(self, key, graph, extraction_seconds=0.0):
+        """Enregistre un graphe validé dans les deux niveaux"""
+        payload = json.dumps({
+            "graph": graph,
+            "extraction_seconds": extraction_seconds,
+            "created_at": time.time(),
+        }, ensure_ascii=False)
+
+        with self._lock:
+            self._remember(key, payload)
+            self._counters["writes"] += 1
+
+        # Écriture atomique : un lecteur concurrent ne voit jamais un fichier tronqué
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+            tmp_path = None
+        except OSError:
+            # Disque plein, dossier en lecture seule... : l'entrée reste dans le cache mémoire
+            return
+        finally:
+            if tmp_path is not None:
+                # Écriture interrompue (erreur ou exception) : pas de .tmp orphelin dans le cache
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_disk_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+                total += stat.st_size
+
+        if total <= self.max_disk_bytes:
+            return
+
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._counters["evictions"] += evicted
+
+    def stats(self):
+        """Compteurs hit/miss et estimation du temps Gemini économisé"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,226 @@
+"""Extractions Gemini en tâche de fond : pool borné par process, timeout, annulation.
+
+Le script Streamlit soumet un job puis se contente de le sonder à chaque rerun
+(statut, progression, aperçu) : aucun appel réseau ne bloque le thread de la
+session. Un job non sondé depuis `abandon_after` secondes (onglet fermé,
+navigation ailleurs) est annulé, tout comme un job qui dépasse son timeout.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extraction import generate, parse_graph_response, stream_graph_items
+from graph_logic import validate_and_enhance_graph
+from metrics import metrics
+
+# Extractions simultanées par process, et jobs acceptés au total (en cours + en attente)
+DEFAULT_MAX_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+DEFAULT_MAX_PENDING = int(os.getenv("EXTRACTION_MAX_PENDING", "8"))
+# Durée maximale d'une extraction, et délai sans sondage avant abandon
+DEFAULT_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "180"))
+DEFAULT_ABANDON_AFTER = 30.0
+
+ACTIVE = ("queued", "running")
+
+
+class JobRejected(Exception):
+    """Trop de jobs en cours dans le process : l'upload doit être retenté plus tard"""
+
+
+class JobStopped(Exception):
+    """Levée dans le worker quand le job est annulé, abandonné ou hors délai"""
+
+
+class ExtractionJob:
+    """Statut d'une extraction, partagé entre le worker et la session qui la sonde"""
+
+    def __init__(self, key, timeout, abandon_after, clock=time.monotonic):
+        self.id = None
+        self.key = key
+        self.timeout = timeout
+        self.abandon_after = abandon_after
+        self.clock = clock
+        self.status = "queued"   # queued | running | done | failed | cancelled | timeout
+        self.submitted_at = clock()
+        self.started_at = None
+        self.finished_at = None
+        self.last_polled = self.submitted_at
+        self.progress = {}       # mis à jour par le worker (nodes reçus, sections...)
+        self.result = None
+        self.error = None
+        self.response_text = ""  # réponse brute (affichée en cas d'erreur de parsing JSON)
+        self.payload = None      # état propre au mode (parser de flux, SectionedExtraction)
+        self._stop_reason = None
+        self._lock = threading.Lock()
+        self.future = None
+
+    @property
+    def active(self):
+        return self.status in ACTIVE
+
+    @property
+    def elapsed(self):
+        end = self.finished_at or self.clock()
+        return end - (self.started_at or self.submitted_at)
+
+    def remaining(self):
+        """Secondes restantes avant le timeout (pour le timeout HTTP de l'appel Gemini)"""
+        return max(0.1, self.timeout - (self.clock() - (self.started_at or self.submitted_at)))
+
+    def poll(self):
+        """Appelé par l'UI à chaque rerun : signale que la session attend toujours, gère le timeout"""
+        self.last_polled = self.clock()
+        if self.active and self.started_at and self.clock() - self.started_at > self.timeout:
+            self.stop("timeout")
+        return self.status
+
+    def stop(self, reason="cancelled"):
+        """Demande l'arrêt (cancelled / timeout) ; un job pas encore démarré n'est jamais lancé"""
+        with self._lock:
+            if not self.active:
+                return
+            self._stop_reason = reason
+            self.status = reason
+            self.finished_at = self.clock()
+            self.error = self.error or ("cancelled" if reason == "cancelled" else
+                                        f"no result after {self.timeout:.0f}s")
+        if self.future is not None:
+            self.future.cancel()
+
+    def should_stop(self):
+        """Vrai si le worker doit s'interrompre (annulé, hors délai ou plus sondé)"""
+        now = self.clock()
+        if self._stop_reason is None and now - self.last_polled > self.abandon_after:
+            self.stop("cancelled")
+        elif self._stop_reason is None and self.started_at and now - self.started_at > self.timeout:
+            self.stop("timeout")
+        return self._stop_reason is not None
+
+    def check(self):
+        """Point d'arrêt coopératif du worker"""
+        if self.should_stop():
+            raise JobStopped(self._stop_reason)
+
+    def _run(self, work):
+        with self._lock:
+            if self._stop_reason is not None:
+                return
+            self.status = "running"
+            self.started_at = self.clock()
+        try:
+            result = work(self)
+        except JobStopped:
+            return
+        except Exception as e:
+            with self._lock:
+                if self._stop_reason is None:
+                    self.status, self.error, self.finished_at = "failed", e, self.clock()
+            return
+        with self._lock:
+            # Un résultat arrivé après l'annulation ou le timeout est ignoré
+            if self._stop_reason is None:
+                self.status, self.result, self.finished_at = "done", result, self.clock()
+
+
+class JobManager:
+    """Pool d'extraction partagé par toutes les sessions du process"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_TIMEOUT, abandon_after=DEFAULT_ABANDON_AFTER):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.abandon_after = abandon_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extraction")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0, "timeout": 0}
+
+    def submit(self, key, work, payload=None):
+        """Lance work(job) en tâche de fond ; JobRejected si le process est saturé"""
+        with self._lock:
+            self._sweep()
+            # Les jobs arrêtés dont le thread n'a pas encore rendu la main comptent aussi
+            if len(self._jobs) >= self.max_pending:
+                self.counters["rejected"] += 1
+                raise JobRejected(f"{self.max_pending} extractions already in progress")
+            job = ExtractionJob(key, self.timeout, self.abandon_after)
+            job.id = next(self._ids)
+            job.payload = payload
+            self._jobs[job.id] = job
+            self.counters["submitted"] += 1
+        job.future = self._executor.submit(job._run, work)
+        return job
+
+    def _sweep(self):
+        """Vérifie les abandons / timeouts et oublie les jobs terminés dont le thread est libéré"""
+        for job_id, job in list(self._jobs.items()):
+            if job.active:
+                job.should_stop()
+            if not job.active and job.future is not None and job.future.done():
+                self.counters[job.status] += 1
+                del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            self._sweep()
+            jobs = list(self._jobs.values())
+            return {
+                "running": sum(job.status == "running" for job in jobs),
+                "queued": sum(job.status == "queued" for job in jobs),
+                "stopping": sum(not job.active for job in jobs),
+                **self.counters,
+            }
+
+
+# --- Travaux exécutés dans le pool (aucun appel Streamlit ici) ---
+
+def blocking_work(model, contents):
+    """Appel Gemini unique, parsing puis validation"""
+    def work(job):
+        response = generate(model, contents, timeout=job.remaining())
+        job.check()
+        job.response_text = response.text
+        with metrics.timer("parse"):
+            raw_data = parse_graph_response(job.response_text)
+        with metrics.timer("validate"):
+            return validate_and_enhance_graph(raw_data)
+    return work
+
+
+def streaming_work(model, contents):
+    """Flux Gemini : job.payload (GraphStreamParser) se remplit au fil des chunks pour l'aperçu"""
+    def work(job):
+        parser = job.payload
+        items = stream_graph_items(model, contents, parser, timeout=job.remaining())
+        try:
+            for _ in items:
+                job.check()
+                job.progress = {"nodes": len(parser.nodes), "edges": len(parser.edges)}
+        finally:
+            # Ferme le flux HTTP si le job est interrompu en cours de route
+            items.close()
+            job.response_text = parser.text
+        job.check()
+        with metrics.timer("parse"):
+            raw_data = parser.finish()
+        with metrics.timer("validate"):
+            return validate_and_enhance_graph(raw_data)
+    return work
+
+
+def sections_work(model, indexes):
+    """Sections en attente de job.payload (SectionedExtraction) extraites en parallèle"""
+    def work(job):
+        section_job = job.payload
+
+        def progress(section, done, total):
+            job.progress = {"done": done, "total": total, "pages": section["pages"]}
+
+        section_job.run(model, indexes=indexes, progress=progress, timeout=job.remaining(),
+                        should_stop=job.should_stop)
+        job.check()
+        return section_job
+    return work
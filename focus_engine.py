@@ -0,0 +1,192 @@
+"""Requêtes du mode focus : voisinage à k sauts, chemin entre deux nœuds, filtre par relation.
+
+L'adjacence (non orientée) est un tableau CSR sur les codes d'id du graphe en
+colonnes : les voisins d'un nœud et les edges qui y mènent sont une tranche
+contiguë. Un parcours en largeur avance niveau par niveau en numpy, et le
+chemin le plus court est cherché par BFS bidirectionnel : le coût dépend de la
+partie du graphe atteinte, pas de sa taille. Les résultats sont mémoïsés par
+(nœud, k, labels) et (source, cible, labels).
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from columnar_graph import csr_ranges
+from metrics import sized
+
+# Requêtes de focus gardées en mémoire (un clic ou un changement de k les rejoue)
+MAX_CACHED_FOCUS = 256
+
+# nodes : ids des nœuds actifs ; edges : positions (data['edges']) des edges actives ;
+# path : ids du chemin dans l'ordre (requête de chemin), sinon None
+Focus = namedtuple("Focus", "nodes edges path")
+
+
+@sized
+class FocusEngine:
+    """Index d'adjacence d'un graphe pour le mode focus (construit une fois, partagé)"""
+
+    def __init__(self, index):
+        columns = index.columns
+        self.ids = columns.ids
+        self.id_index = columns.id_index
+        self.labels = columns.labels
+        n_ids, n_edges = len(columns.ids), columns.n_edges
+
+        # Chaque edge apparaît deux fois (depuis chaque extrémité) : parcours non orienté
+        ends = np.concatenate([columns.src, columns.dst])
+        order = np.argsort(ends, kind="stable")
+        self.neighbor = np.concatenate([columns.dst, columns.src])[order]
+        self.edge = np.tile(np.arange(n_edges, dtype=np.int32), 2)[order]
+        self.offsets = np.zeros(n_ids + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=n_ids), out=self.offsets[1:])
+        self._edge_label = columns.edge_label
+
+        self._allowed = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- filtre par label de relation ---
+
+    @staticmethod
+    def labels_key(labels):
+        """Clé canonique d'un filtre de labels (None : toutes les relations)"""
+        return tuple(sorted(set(labels))) if labels else None
+
+    def _allowed_slots(self, labels_key):
+        """Masque des cases d'adjacence dont l'edge a un label autorisé (None : tout est permis)"""
+        if labels_key is None:
+            return None
+        allowed = self._allowed.get(labels_key)
+        if allowed is None:
+            table = np.zeros(len(self.labels) + 1, dtype=bool)  # dernière case : MISSING (-1)
+            for code, label in enumerate(self.labels):
+                table[code] = label in labels_key
+            allowed = self._allowed[labels_key] = table[self._edge_label[self.edge]]
+        return allowed
+
+    def _memoised(self, key, compute):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        result = compute()
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > MAX_CACHED_FOCUS:
+                self._cache.popitem(last=False)
+        return result
+
+    # --- requêtes ---
+
+    def neighborhood(self, node_id, hops=1, labels=None):
+        """Nœuds à au plus `hops` sauts (None : toute la composante) et edges parcourues.
+
+        Les edges actives sont celles qui touchent un nœud à moins de `hops` sauts :
+        avec hops=1, exactement les edges du nœud (le focus historique).
+        """
+        labels_key = self.labels_key(labels)
+        return self._memoised(("hops", node_id, hops, labels_key),
+                              lambda: self._neighborhood(node_id, hops, labels_key))
+
+    def _neighborhood(self, node_id, hops, labels_key):
+        start = self.id_index.get(node_id)
+        if start is None:
+            return Focus(frozenset([node_id]), frozenset(), None)
+        allowed = self._allowed_slots(labels_key)
+
+        visited = np.zeros(len(self.ids), dtype=bool)
+        visited[start] = True
+        frontier = np.asarray([start], dtype=np.int64)
+        reached = [frontier]
+        edge_parts = []
+        depth = 0
+        while frontier.size and (hops is None or depth < hops):
+            slots = csr_ranges(self.offsets, frontier)
+            if allowed is not None:
+                slots = slots[allowed[slots]]
+            edge_parts.append(self.edge[slots])
+            neighbors = self.neighbor[slots]
+            frontier = np.unique(neighbors[~visited[neighbors]])
+            visited[frontier] = True
+            reached.append(frontier)
+            depth += 1
+
+        codes = np.concatenate(reached).tolist()
+        edges = np.unique(np.concatenate(edge_parts)).tolist() if edge_parts else []
+        return Focus(frozenset(self.ids[c] for c in codes), frozenset(edges), None)
+
+    def path(self, source_id, target_id, labels=None):
+        """Plus court chemin (en sauts, sens des edges ignoré) entre deux nœuds ; None s'il n'y en a pas"""
+        labels_key = self.labels_key(labels)
+        return self._memoised(("path", source_id, target_id, labels_key),
+                              lambda: self._path(source_id, target_id, labels_key))
+
+    def _path(self, source_id, target_id, labels_key):
+        source, target = self.id_index.get(source_id), self.id_index.get(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return Focus(frozenset([source_id]), frozenset(), [source_id])
+        allowed = self._allowed_slots(labels_key)
+
+        # BFS bidirectionnel : code -> (code précédent, edge, profondeur), un côté par sens
+        parents = ({source: (None, None, 0)}, {target: (None, None, 0)})
+        frontiers = ([source], [target])
+        offsets, neighbor, edge = self.offsets, self.neighbor, self.edge
+        while frontiers[0] and frontiers[1]:
+            # Étend le plus petit front, sur un niveau complet
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, other = parents[side], parents[1 - side]
+            next_frontier = []
+            best = None
+            for u in frontiers[side]:
+                depth = seen[u][2] + 1
+                lo, hi = offsets[u], offsets[u + 1]
+                slots = zip(neighbor[lo:hi].tolist(), edge[lo:hi].tolist(),
+                            allowed[lo:hi].tolist() if allowed is not None else [True] * (hi - lo))
+                for v, edge_id, ok in slots:
+                    if not ok:
+                        continue
+                    if v not in seen:
+                        seen[v] = (u, edge_id, depth)
+                        next_frontier.append(v)
+                    if v in other:
+                        # Rencontre : on finit le niveau pour garder le chemin le plus court
+                        length = depth + other[v][2]
+                        if best is None or length < best[0]:
+                            best = (length, u, v, edge_id)
+            if best is not None:
+                return self._join(parents, side, best)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return None
+
+    def _join(self, parents, side, meeting):
+        """Chemin source -> cible à partir du point de rencontre des deux parcours"""
+        _, u, v, meeting_edge = meeting
+        # Moitié du côté étendu (jusqu'à u), puis l'edge u-v, puis la moitié de l'autre côté (depuis v)
+        near, far = [], []
+        node, edges = u, [meeting_edge]
+        while node is not None:
+            near.append(node)
+            previous, edge_id, _ = parents[side][node]
+            if edge_id is not None:
+                edges.append(edge_id)
+            node = previous
+        node = v
+        while node is not None:
+            far.append(node)
+            previous, edge_id, _ = parents[1 - side][node]
+            if edge_id is not None:
+                edges.append(edge_id)
+            node = previous
+        codes = near[::-1] + far
+        if side == 1:
+            codes.reverse()
+        path = [self.ids[c] for c in codes]
+        return Focus(frozenset(path), frozenset(edges), path)
+
+    def reachable(self, node_id, labels):
+        """Tout ce qui est relié au nœud par des relations de ces labels seulement"""
+        return self.neighborhood(node_id, None, labels)
@@ -0,0 +1,277 @@
+"""Analyses structurelles d'un graphe : PageRank, betweenness approchée, communautés.
+
+Le graphe est vu comme non orienté (une relation CV relie deux entités, son sens
+n'est pas un « vote ») : matrice d'adjacence creuse au format CSR (tableaux numpy),
+produits matrice-vecteur par np.bincount. Chaque mesure est calculée au premier
+accès puis gardée : l'objet vit sur le GraphIndex, donc une fois par empreinte de
+graphe (et une seule fois pour toutes les sessions d'un graphe partagé).
+
+Les scores servent de source d'importance alternative (échelle 1-10, comme
+l'importance donnée par le LLM) pour la taille des nœuds, les flux du Sankey et
+les poids de la matrice.
+"""
+import threading
+
+import numpy as np
+
+from columnar_graph import csr_ranges
+from metrics import metrics, sized
+
+# Sources d'importance : "llm" = champ 'importance' des nœuds (Gemini)
+IMPORTANCE_SOURCES = ("llm", "pagerank", "betweenness")
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-9
+PAGERANK_MAX_ITERATIONS = 100
+# Sources échantillonnées pour la betweenness (Brandes) : exacte en dessous
+BETWEENNESS_SAMPLES = 64
+# Communautés : niveaux d'agrégation, tours par niveau, part (aléatoire) des nœuds
+# autorisés à bouger à chaque tour
+COMMUNITY_MAX_LEVELS = 10
+COMMUNITY_MAX_ITERATIONS = 30
+COMMUNITY_UPDATE_SHARE = 0.5
+SEED = 0
+
+
+def _accumulate(values, positions, weights):
+    """values[positions] += weights, positions répétées comprises (sans np.add.at, lent)"""
+    if positions.size == 0:
+        return
+    unique, inverse = np.unique(positions, return_inverse=True)
+    values[unique] += np.bincount(inverse, weights=weights)
+
+
+def importance_scale(scores):
+    """Scores -> échelle 1-10 : 1 + 9 × part des nœuds strictement moins centraux.
+
+    Un rang plutôt qu'une mise à l'échelle linéaire : les centralités sont très
+    asymétriques (quelques hubs), les ex aequo (feuilles à betweenness nulle)
+    reçoivent la même valeur.
+    """
+    n = len(scores)
+    if n < 2:
+        return np.full(n, 10.0)
+    below = np.searchsorted(np.sort(scores), scores, side="left")
+    return np.round(1.0 + 9.0 * below / (n - 1), 1)
+
+
+@sized
+class GraphAnalytics:
+    """Centralités et communautés d'un graphe, alignées sur index.nodes (calculées à la demande)"""
+
+    def __init__(self, index):
+        self._index = index
+        n = self.n = len(index.nodes)
+
+        src, dst = index.edge_sources.astype(np.int64), index.edge_targets.astype(np.int64)
+        # Edges entre deux nœuds existants, boucles exclues ; une seule arête par paire
+        # (A USES B et B ENABLES A ne font pas deux chemins distincts)
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        low, high = np.minimum(src[keep], dst[keep]), np.maximum(src[keep], dst[keep])
+        pairs = np.unique(low * max(n, 1) + high)
+        src, dst = pairs // max(n, 1), pairs % max(n, 1)
+        self.n_edges = len(src)
+
+        # Adjacence symétrique en CSR
+        ends = np.concatenate([src, dst])
+        order = np.argsort(ends, kind="stable")
+        self.neighbor = np.concatenate([dst, src])[order]
+        self.row = ends[order]
+        self.degree = np.bincount(ends, minlength=n).astype(np.float64)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.degree.astype(np.int64), out=self.offsets[1:])
+
+        self._results = {}
+        self._lock = threading.RLock()
+
+    def _cached(self, name, compute):
+        # Calcul sous verrou (réentrant : une mesure peut en utiliser une autre) :
+        # deux sessions d'un graphe partagé ne le font pas en double
+        with self._lock:
+            if name not in self._results:
+                with metrics.timer("analytics", measure=name):
+                    self._results[name] = compute()
+            return self._results[name]
+
+    # --- mesures ---
+
+    @property
+    def pagerank(self):
+        """PageRank (somme 1) par itération de puissance sur la marche aléatoire non orientée"""
+        return self._cached("pagerank", self._pagerank)
+
+    def _pagerank(self):
+        n = self.n
+        if n == 0:
+            return np.zeros(0)
+        dangling = self.degree == 0
+        inverse_degree = np.divide(1.0, self.degree, out=np.zeros(n), where=~dangling)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(PAGERANK_MAX_ITERATIONS):
+            # Produit creux A·(r / d) : chaque case CSR (row -> neighbor) transmet la part de row
+            spread = np.bincount(self.neighbor, weights=(rank * inverse_degree)[self.row], minlength=n)
+            teleport = (1.0 - PAGERANK_DAMPING + PAGERANK_DAMPING * rank[dangling].sum()) / n
+            updated = PAGERANK_DAMPING * spread + teleport
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < PAGERANK_TOLERANCE:
+                break
+        return rank
+
+    @property
+    def betweenness(self):
+        """Betweenness normalisée (0-1), approchée par Brandes sur un échantillon de sources"""
+        return self._cached("betweenness", self._betweenness)
+
+    def _betweenness(self):
+        n = self.n
+        scores = np.zeros(n)
+        if n < 3:
+            return scores
+        rng = np.random.default_rng(SEED)
+        sources = np.arange(n) if n <= BETWEENNESS_SAMPLES else rng.choice(n, BETWEENNESS_SAMPLES, replace=False)
+        for source in sources.tolist():
+            scores += self._dependencies(source)
+        # Extrapolation à toutes les sources, chaque paire comptée deux fois (non orienté)
+        scores *= n / len(sources) / 2.0
+        return scores / ((n - 1) * (n - 2) / 2.0)
+
+    def _dependencies(self, source):
+        """Dépendances de `source` envers chaque nœud (une passe de Brandes, niveau par niveau en numpy)"""
+        n = self.n
+        distance = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        distance[source], sigma[source] = 0, 1.0
+        frontier = np.asarray([source], dtype=np.int64)
+        levels = []
+        depth = 0
+        while frontier.size:
+            slots = csr_ranges(self.offsets, frontier)
+            parents, children = self.row[slots], self.neighbor[slots]
+            discovered = np.unique(children[distance[children] < 0])
+            distance[discovered] = depth + 1
+            # Cases sur un plus court chemin : parent au niveau d, enfant au niveau d + 1
+            tree = distance[children] == depth + 1
+            parents, children = parents[tree], children[tree]
+            _accumulate(sigma, children, sigma[parents])
+            levels.append((parents, children))
+            frontier = discovered
+            depth += 1
+        delta = np.zeros(n)
+        for parents, children in reversed(levels):
+            _accumulate(delta, parents, sigma[parents] / sigma[children] * (1.0 + delta[children]))
+        delta[source] = 0.0
+        return delta
+
+    @property
+    def communities(self):
+        """Numéro de communauté par nœud (0 = la plus grande), par la méthode de Louvain"""
+        return self._cached("communities", self._communities)
+
+    def _communities(self):
+        """Louvain vectorisé : déplacements locaux à gain de modularité, puis agrégation
+        de chaque communauté en un nœud, et ainsi de suite tant que des nœuds fusionnent."""
+        n = self.n
+        membership = np.arange(n)
+        if self.n_edges == 0:
+            return membership
+        rng = np.random.default_rng(SEED)
+        # Graphe du niveau courant : cases symétriques (ligne, colonne, poids), boucles comprises
+        row, col, weight = self.row, self.neighbor, np.ones(len(self.row))
+        size = n
+        for _ in range(COMMUNITY_MAX_LEVELS):
+            labels = self._local_moves(row, col, weight, size, rng)
+            _, labels = np.unique(labels, return_inverse=True)
+            merged = int(labels.max()) + 1
+            membership = labels[membership]
+            if merged == size:
+                break
+            # Agrégation : une case par paire de communautés, poids additionnés
+            keys, inverse = np.unique(labels[row] * merged + labels[col], return_inverse=True)
+            row, col = keys // merged, keys % merged
+            weight = np.bincount(inverse, weights=weight)
+            size = merged
+        # Renumérotation par taille décroissante
+        _, inverse, sizes = np.unique(membership, return_inverse=True, return_counts=True)
+        rank = np.empty(len(sizes), dtype=np.int64)
+        rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+        return rank[inverse]
+
+    @staticmethod
+    def _local_moves(row, col, weight, size, rng):
+        """Chaque nœud rejoint la communauté voisine qui augmente le plus la modularité"""
+        degree = np.bincount(row, weights=weight, minlength=size)
+        two_m = degree.sum()
+        labels = np.arange(size)
+        links = row != col
+        row, col, weight = row[links], col[links], weight[links]
+        for _ in range(COMMUNITY_MAX_ITERATIONS):
+            # Poids des liens de chaque nœud vers chaque communauté voisine, (nœud, communauté) triés
+            keys, inverse = np.unique(row * size + labels[col], return_inverse=True)
+            to_community = np.bincount(inverse, weights=weight)
+            nodes, candidates = keys // size, keys % size
+            totals = np.bincount(labels, weights=degree, minlength=size)
+            own = candidates == labels[nodes]
+            # Gain (à constante près) : liens vers C - k_i × degré total de C (sans le nœud) / 2m
+            gain = to_community - degree[nodes] * (totals[candidates] - own * degree[nodes]) / two_m
+            stay = -degree * (totals[labels] - degree) / two_m
+            stay[nodes[own]] = gain[own]
+            # Meilleure communauté par nœud (la première à gain maximal) sans tri supplémentaire
+            starts = np.flatnonzero(np.r_[True, nodes[1:] != nodes[:-1]])
+            best_gain = np.maximum.reduceat(gain, starts)
+            counts = np.diff(np.r_[starts, len(nodes)])
+            is_best = np.flatnonzero(gain == np.repeat(best_gain, counts))
+            first = is_best[np.r_[True, nodes[is_best[1:]] != nodes[is_best[:-1]]]]
+            movers, targets = nodes[first], candidates[first]
+            better = gain[first] > stay[movers] + 1e-12
+            if not better.any():
+                break
+            # Une partie des nœuds seulement : des déplacements simultanés peuvent
+            # osciller (graphes bipartis Projects <-> Skills)
+            better &= rng.random(len(movers)) < COMMUNITY_UPDATE_SHARE
+            labels[movers[better]] = targets[better]
+        return labels
+
+    def _partition_quality(self, labels):
+        """Modularité d'une partition (entre -0.5 et 1)"""
+        if self.n_edges == 0:
+            return 0.0
+        two_m = 2.0 * self.n_edges
+        inside = (labels[self.row] == labels[self.neighbor]).sum() / two_m
+        degree_share = np.bincount(labels, weights=self.degree) / two_m
+        return float(inside - (degree_share ** 2).sum())
+
+    @property
+    def modularity(self):
+        """Modularité de la partition en communautés"""
+        return self._cached("modularity", lambda: self._partition_quality(self.communities))
+
+    # --- importance ---
+
+    def importance(self, source):
+        """Importance 1-10 alignée sur index.nodes selon la source (voir IMPORTANCE_SOURCES)"""
+        if source == "llm":
+            return self._index.importance
+        if source not in ("pagerank", "betweenness"):
+            raise ValueError(f"unknown importance source: {source!r}")
+        return self._cached(f"importance:{source}", lambda: importance_scale(getattr(self, source)))
+
+    def importance_by_id(self, source):
+        """{id: importance} selon la source (Sankey, qui travaille sur des listes de nœuds)"""
+        values = self.importance(source).tolist()
+        return {node['id']: value for node, value in zip(self._index.nodes, values)}
+
+    def top(self, measure, k=5):
+        """Positions des k nœuds les plus centraux pour une mesure ("pagerank" | "betweenness")"""
+        scores = getattr(self, measure)
+        return np.argsort(-scores, kind="stable")[:k].tolist()
+
+    def summary(self):
+        """Résumé pour le mode debug (calcule les mesures manquantes)"""
+        sizes = np.bincount(self.communities) if self.n else np.zeros(0, dtype=np.int64)
+        return {
+            "communities": len(sizes),
+            "largest_community": int(sizes.max()) if sizes.size else 0,
+            "modularity": self.modularity,
+            "sampled_sources": min(self.n, BETWEENNESS_SAMPLES),
+        }
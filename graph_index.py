@@ -0,0 +1,240 @@
+import hashlib
+import json
+
+import numpy as np
+
+from columnar_graph import ColumnarGraph
+from focus_engine import FocusEngine
+from graph_analytics import GraphAnalytics
+from metrics import sized
+from search_index import DEFAULT_FIELDS, SearchIndex
+
+
+def graph_fingerprint(data):
+    """Empreinte stable du contenu d'un graphe (sert de version pour les caches de vues)"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@sized
+class TypeSelection:
+    """Sous-graphe d'une sélection de types, partagé par la sidebar et les trois vues.
+
+    Masques numpy alignés sur data['nodes'] / data['edges'] et listes prêtes à
+    l'emploi ; l'appelant ne doit pas les modifier (elles sont mises en cache).
+    """
+
+    __slots__ = ("types", "node_mask", "edge_mask", "nodes", "node_ids", "edge_ids", "edges")
+
+    def __init__(self, index, types):
+        self.types = types
+        self.node_mask, self.edge_mask = index.columns.type_selection(types)
+        self.nodes = [index.nodes[i] for i in np.flatnonzero(self.node_mask).tolist()]
+        self.node_ids = {n['id'] for n in self.nodes}
+        self.edge_ids = np.flatnonzero(self.edge_mask).tolist()
+        self.edges = [index.edges[i] for i in self.edge_ids]
+
+    def data(self):
+        """Sous-graphe au format {'nodes', 'edges'} (Sankey)"""
+        return {'nodes': self.nodes, 'edges': self.edges}
+
+
+@sized
+class GraphIndex:
+    """Index en mémoire d'un graphe {'nodes': [...], 'edges': [...]}, construit une seule fois.
+
+    La structure tient dans la forme en colonnes (ColumnarGraph) : ids internés,
+    extrémités et adjacence en tableaux numpy. Les edges sont référencées par leur
+    position dans data['edges'], les nœuds par leur position dans data['nodes'] ;
+    les dicts du graphe ne sont ni copiés ni réindexés.
+    """
+
+    def __init__(self, data):
+        self.nodes = data['nodes']
+        self.edges = data['edges']
+        self.version = graph_fingerprint(data)
+
+        # Forme en colonnes (types et extrémités codés en entiers) pour les masques vectorisés ;
+        # sans colonnes d'attributs : les attributs restent dans les dicts du graphe
+        self.columns = columns = ColumnarGraph(data, attributes=False)
+
+        # Position des nœuds de chaque edge dans data['nodes'] (-1 : extrémité sans nœud)
+        self.edge_sources = columns.node_position[columns.src]
+        self.edge_targets = columns.node_position[columns.dst]
+
+        # Tableaux de degrés alignés sur l'ordre de data['nodes'] (edges entre deux nœuds)
+        n = len(self.nodes)
+        internal = (self.edge_sources >= 0) & (self.edge_targets >= 0)
+        self.out_degree = np.bincount(self.edge_sources[internal], minlength=n)
+        self.in_degree = np.bincount(self.edge_targets[internal], minlength=n)
+        self.degree_array = self.out_degree + self.in_degree
+
+        self.importance = np.asarray([node.get('importance', 5) for node in self.nodes])
+        self._type_counts = None
+        self._incidence = {}
+        self._type_filters = {}
+        self._search_index = None
+        self._focus = None
+        self._analytics = None
+
+    def position(self, node_id):
+        """Position du nœud dans data['nodes'] (ou None)"""
+        code = self.columns.code(node_id)
+        if code is None:
+            return None
+        position = int(self.columns.node_position[code])
+        return position if position >= 0 else None
+
+    def node(self, node_id):
+        """Retourne le nœud correspondant à l'ID (ou None)"""
+        position = self.position(node_id)
+        return self.nodes[position] if position is not None else None
+
+    def degree(self, node_id):
+        """Nombre de connexions (entrantes + sortantes) d'un nœud"""
+        pos = self.position(node_id)
+        return int(self.degree_array[pos]) if pos is not None else 0
+
+    def out_edge_ids(self, node_id):
+        """Positions des edges sortantes d'un nœud (ordre de data['edges'])"""
+        code = self.columns.code(node_id)
+        return self.columns.out_edge_ids(code).tolist() if code is not None else []
+
+    def in_edge_ids(self, node_id):
+        """Positions des edges entrantes d'un nœud (ordre de data['edges'])"""
+        code = self.columns.code(node_id)
+        return self.columns.in_edge_ids(code).tolist() if code is not None else []
+
+    def neighbors(self, node_id):
+        """IDs des nœuds directement connectés (dans les deux sens)"""
+        code = self.columns.code(node_id)
+        if code is None:
+            return set()
+        columns = self.columns
+        codes = np.concatenate([columns.dst[columns.out_edge_ids(code)], columns.src[columns.in_edge_ids(code)]])
+        return {columns.ids[c] for c in np.unique(codes).tolist()}
+
+    def incident_edge_ids(self, node_id):
+        """Positions des edges touchant un nœud"""
+        return set(self.out_edge_ids(node_id)) | set(self.in_edge_ids(node_id))
+
+    def _labelled(self, edge_ids, label, ends):
+        label_code = self.columns.label_code(label)
+        if label_code is None or not len(edge_ids):
+            return []
+        columns = self.columns
+        return [columns.ids[c] for c in ends[edge_ids[columns.edge_label[edge_ids] == label_code]].tolist()]
+
+    def successors(self, node_id, label):
+        """Cibles des edges sortantes d'un label donné"""
+        code = self.columns.code(node_id)
+        return self._labelled(self.columns.out_edge_ids(code), label, self.columns.dst) if code is not None else []
+
+    def predecessors(self, node_id, label):
+        """Sources des edges entrantes d'un label donné"""
+        code = self.columns.code(node_id)
+        return self._labelled(self.columns.in_edge_ids(code), label, self.columns.src) if code is not None else []
+
+    def type_counts(self):
+        """Nombre de nœuds par type (ordre de première apparition)"""
+        if self._type_counts is None:
+            counts = np.bincount(self.columns.node_type.astype(np.int64) + 1, minlength=len(self.columns.types) + 1)
+            self._type_counts = dict(zip(self.columns.types, counts[1:].tolist()))
+        return dict(self._type_counts)
+
+    def node_positions_of_type(self, node_type):
+        """Positions (data['nodes']) des nœuds d'un type"""
+        return np.flatnonzero(self.columns.type_mask([node_type]))
+
+    def relation_labels(self):
+        """Labels de relation présents dans le graphe"""
+        return list(self.columns.labels)
+
+    def select_types(self, selected_types):
+        """TypeSelection (masques + listes) d'une sélection de types, calculée une fois par sélection"""
+        key = frozenset(selected_types)
+        selection = self._type_filters.get(key)
+        if selection is None:
+            selection = self._type_filters[key] = TypeSelection(self, key)
+        return selection
+
+    def filter_by_types(self, selected_types):
+        """(nodes, ids, positions des edges) visibles pour une sélection de types, mémoïsé"""
+        selection = self.select_types(selected_types)
+        return selection.nodes, selection.node_ids, selection.edge_ids
+
+    def type_mask(self, selected_types):
+        """Masque booléen (aligné sur data['nodes']) des nœuds dont le type est sélectionné"""
+        return self.select_types(selected_types).node_mask
+
+    @property
+    def search_index(self):
+        """Index de recherche des nœuds, construit au premier appel"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    @property
+    def focus(self):
+        """Moteur du mode focus (voisinage à k sauts, chemins), construit au premier appel"""
+        if self._focus is None:
+            self._focus = FocusEngine(self)
+        return self._focus
+
+    @property
+    def analytics(self):
+        """Centralités et communautés (calculées à la demande, gardées pour ce graphe)"""
+        if self._analytics is None:
+            self._analytics = GraphAnalytics(self)
+        return self._analytics
+
+    def search(self, query, k=10, fields=DEFAULT_FIELDS):
+        """(k meilleurs nœuds, nombre trouvé, exhaustif) pour une recherche par label"""
+        return self.search_index.hits(query, k, fields)
+
+    def incidence_matrix(self, label, row_type, col_type):
+        """Matrice booléenne row_type × col_type des edges (col -> row) d'un label donné.
+
+        Construite en une seule passe sur les edges du label puis mise en cache.
+        Retourne (positions des lignes, positions des colonnes, matrice) : les
+        positions indexent data['nodes'], donc un masque de filtre s'applique
+        directement en sélection de lignes/colonnes.
+        """
+        key = (label, row_type, col_type)
+        if key in self._incidence:
+            return self._incidence[key]
+
+        row_positions = np.flatnonzero(self.columns.type_mask([row_type]))
+        col_positions = np.flatnonzero(self.columns.type_mask([col_type]))
+        # Position du nœud -> ligne / colonne (-1 : hors de la matrice)
+        row_of = np.full(len(self.nodes) + 1, -1, dtype=np.int64)
+        col_of = np.full(len(self.nodes) + 1, -1, dtype=np.int64)
+        row_of[row_positions] = np.arange(len(row_positions))
+        col_of[col_positions] = np.arange(len(col_positions))
+
+        # Extrémités -1 (sans nœud) : dernière case, toujours hors de la matrice
+        edge_ids = np.flatnonzero(self.columns.label_mask(label))
+        rows = row_of[self.edge_targets[edge_ids]]
+        cols = col_of[self.edge_sources[edge_ids]]
+        inside = (rows >= 0) & (cols >= 0)
+
+        matrix = np.zeros((len(row_positions), len(col_positions)), dtype=bool)
+        matrix[rows[inside], cols[inside]] = True
+
+        self._incidence[key] = (row_positions, col_positions, matrix)
+        return self._incidence[key]
+
+    def weighted_incidence(self, label, row_type, col_type, node_mask=None, importance=None):
+        """Incidence pondérée par l'importance des lignes, filtrée par un masque de nœuds.
+
+        importance : tableau aligné sur data['nodes'] (analytics.importance), par défaut celle du LLM
+        """
+        row_positions, col_positions, matrix = self.incidence_matrix(label, row_type, col_type)
+        if node_mask is not None:
+            row_keep = node_mask[row_positions]
+            col_keep = node_mask[col_positions]
+            row_positions = row_positions[row_keep]
+            col_positions = col_positions[col_keep]
+            matrix = matrix[np.ix_(row_keep, col_keep)]
+        weights = (self.importance if importance is None else importance)[row_positions]
+        return row_positions, col_positions, matrix * weights[:, None]
@@ -0,0 +1,229 @@
+import heapq
+from collections import Counter
+from itertools import combinations
+
+from inference_rules import default_rules
+
+# Couleurs des nœuds par type (Network Graph + légende)
+COLOR_MAP = {
+    "Person": "#FF4B4B",   # Rouge
+    "Role": "#F39C12",     # Orange
+    "Skill": "#00ADEE",    # Bleu
+    "Project": "#2ECC71",  # Vert
+    "Entity": "#9B59B6",   # Violet
+    "Concept": "#95A5A6"   # Gris
+}
+
+# Contrôles d'espacement (forces ULTRA renforcées pour éviter chevauchement labels)
+SPACING_CONFIGS = {
+    "Compact": {"gravity": -20000, "spring": 350},     # Augmenté encore
+    "Normal": {"gravity": -40000, "spring": 500},      # Augmenté encore
+    "Large": {"gravity": -70000, "spring": 700},       # Augmenté encore
+    "Extra Large": {"gravity": -110000, "spring": 950},   # Augmenté encore
+    "Ultra Wide": {"gravity": -160000, "spring": 1300},   # Augmenté encore
+    "Mega Wide": {"gravity": -250000, "spring": 1800}     # EXTRÊME pour aucun chevauchement
+}
+SPACING_LEVELS = list(SPACING_CONFIGS)
+
+def validate_and_enhance_graph(data, rules=None):
+    """Nettoie et enrichit le graphe retourné par Gemini (rules : RuleSet, défaut inference_rules.json)"""
+    
+    # 1. Déduplication des nodes
+    seen_ids = set()
+    unique_nodes = []
+    id_mapping = {}  # Pour remapper les IDs
+    
+    for node in data['nodes']:
+        # Normalisation de l'ID
+        original_id = node['id']
+        node_id = original_id.lower().replace(' ', '_').replace('-', '_')
+        
+        if node_id not in seen_ids:
+            node['id'] = node_id
+            seen_ids.add(node_id)
+            unique_nodes.append(node)
+            id_mapping[original_id] = node_id
+        else:
+            # Si doublon, on mappe quand même l'ancien ID
+            id_mapping[original_id] = node_id
+    
+    # 2. Validation et normalisation des edges
+    valid_edges = []
+    edge_set = set()  # Pour éviter les doublons d'edges
+    
+    for edge in data['edges']:
+        # Remapper les IDs avec normalisation
+        edge_from = edge['from'].lower().replace(' ', '_').replace('-', '_')
+        edge_to = edge['to'].lower().replace(' ', '_').replace('-', '_')
+        
+        # Utiliser le mapping si disponible
+        edge_from = id_mapping.get(edge['from'], edge_from)
+        edge_to = id_mapping.get(edge['to'], edge_to)
+        
+        if edge_from in seen_ids and edge_to in seen_ids:
+            edge['from'] = edge_from
+            edge['to'] = edge_to
+            # Normaliser le label si manquant
+            if 'label' not in edge or not edge['label']:
+                edge['label'] = 'RELATES_TO'
+            
+            # Éviter les doublons d'edges
+            edge_key = (edge_from, edge_to, edge['label'])
+            if edge_key not in edge_set:
+                edge_set.add(edge_key)
+                valid_edges.append(edge)
+    
+    # 3. Inférence de relationships supplémentaires (enrichissement automatique)
+    # Moteur d'inférence sur index inversés : skill -> projects pour le co-usage,
+    # règles par mots-clés (inference_rules.json) appliquées en une passe sur les labels
+    rules = rules or default_rules()
+    label_matches = rules.match_labels([n['label'] for n in unique_nodes])
+    rule_hits = Counter()
+    projects = [n for n in unique_nodes if n['type'] == 'Project']
+    
+    # Index inversé skill -> projects qui l'utilisent (une seule passe sur les edges)
+    project_positions = {project['id']: i for i, project in enumerate(projects)}
+    skill_projects = {}
+    skill_usage = {}
+    for edge in valid_edges:
+        if edge['label'] == 'USES':
+            skill_usage[edge['to']] = skill_usage.get(edge['to'], 0) + 1
+            if edge['from'] in project_positions:
+                skill_projects.setdefault(edge['to'], []).append(project_positions[edge['from']])
+    
+    # 3a. Projects partageant 2+ skills : paires issues des listes skill -> projects
+    # (coût proportionnel aux co-usages réels, pas au nombre de paires de projects)
+    shared_counts = Counter()
+    for users in skill_projects.values():
+        shared_counts.update(combinations(sorted(users), 2))
+    
+    for i, j in sorted(pair for pair, count in shared_counts.items() if count >= 2):
+        proj1, proj2 = projects[i], projects[j]
+        edge_key = (proj1['id'], proj2['id'], 'RELATED_TO')
+        reverse_key = (proj2['id'], proj1['id'], 'RELATED_TO')
+        if edge_key not in edge_set and reverse_key not in edge_set:
+            valid_edges.append({
+                'from': proj1['id'],
+                'to': proj2['id'],
+                'label': 'RELATED_TO'
+            })
+            edge_set.add(edge_key)
+    
+    # 3b. Connecter les skills fréquemment utilisées aux concepts (concept_rules)
+    rule_concepts = []  # par règle : positions des concepts correspondants
+    skill_rules = {}    # position de la skill -> règles applicables
+    for rule_id, rule in enumerate(rules.concept_rules):
+        matched_concepts = [
+            p for p in rules.positions(label_matches, rule['concept_keywords'])
+            if unique_nodes[p]['type'] == 'Concept'
+        ]
+        rule_concepts.append(matched_concepts)
+        if not matched_concepts:
+            continue
+        for p in rules.positions(label_matches, rule['skill_keywords']):
+            skill = unique_nodes[p]
+            # Si une skill est utilisée dans min_usage+ projects, la relier aux concepts pertinents
+            if skill['type'] == 'Skill' and skill_usage.get(skill['id'], 0) >= rule['min_usage']:
+                skill_rules.setdefault(p, []).append(rule_id)
+    
+    for p in sorted(skill_rules):
+        skill = unique_nodes[p]
+        rule_ids = skill_rules[p]
+        # Concepts dans l'ordre des nodes, puis règles dans l'ordre du fichier
+        if len(rule_ids) == 1:
+            targets = [(c, rule_ids[0]) for c in rule_concepts[rule_ids[0]]]
+        else:
+            targets = heapq.merge(*[[(c, r) for c in rule_concepts[r]] for r in rule_ids])
+        for c, rule_id in targets:
+            rule = rules.concept_rules[rule_id]
+            concept = unique_nodes[c]
+            edge_key = (skill['id'], concept['id'], rule['label'])
+            if edge_key not in edge_set:
+                valid_edges.append({
+                    'from': skill['id'],
+                    'to': concept['id'],
+                    'label': rule['label']
+                })
+                edge_set.add(edge_key)
+                rule_hits[rule['name']] += 1
+    
+    # 3c. Ajouter des relationships technologiques logiques (tech_rules)
+    # Mapping des nodes par label (case-insensitive) : le dernier nœud d'un label l'emporte,
+    # l'ordre des labels est celui de leur première apparition
+    nodes_by_label = {}
+    for node in unique_nodes:
+        nodes_by_label[node['label'].lower()] = node
+    label_rank = {label: rank for rank, label in enumerate(nodes_by_label)}
+    
+    label_match_cache = {}
+    
+    def last_label_match(keyword, types):
+        """Nœud du dernier label (dans l'ordre des labels) contenant le mot-clé"""
+        if (keyword, types) in label_match_cache:
+            return label_match_cache[keyword, types]
+        best = None
+        for p in rules.positions(label_matches, [keyword]):
+            label = unique_nodes[p]['label'].lower()
+            node = nodes_by_label[label]
+            if node['type'] in types and (best is None or label_rank[label] > label_rank[best]):
+                best = label
+        label_match_cache[keyword, types] = nodes_by_label[best] if best is not None else None
+        return label_match_cache[keyword, types]
+    
+    for rule in rules.tech_rules:
+        skill_a_node = last_label_match(rule['from'], ('Skill',))
+        skill_b_node = last_label_match(rule['to'], ('Skill', 'Concept'))
+        
+        # Si les deux nodes existent, créer la relation
+        if skill_a_node and skill_b_node:
+            edge_key = (skill_a_node['id'], skill_b_node['id'], rule['label'])
+            reverse_key = (skill_b_node['id'], skill_a_node['id'], rule['label'])
+            
+            if edge_key not in edge_set and reverse_key not in edge_set:
+                valid_edges.append({
+                    'from': skill_a_node['id'],
+                    'to': skill_b_node['id'],
+                    'label': rule['label']
+                })
+                edge_set.add(edge_key)
+                rule_hits[rule['name']] += 1
+    
+    rules.record(rule_hits)
+    
+    # 4. Calcul des connexions pour ajuster l'importance
+    connections = {nid: 0 for nid in seen_ids}
+    for edge in valid_edges:
+        connections[edge['from']] += 1
+        connections[edge['to']] += 1
+    
+    for node in unique_nodes:
+        # Boost l'importance des nodes très connectés
+        base_importance = node.get('importance', 5)
+        if connections[node['id']] >= 5:
+            node['importance'] = min(10, base_importance + 2)
+        elif connections[node['id']] >= 3:
+            node['importance'] = min(10, base_importance + 1)
+    
+    return {'nodes': unique_nodes, 'edges': valid_edges}
+
+def calculate_node_size(node_type, importance):
+    """Calcule la taille du nœud en fonction du type et de l'importance"""
+    base_sizes = {
+        "Person": 55,      # Réduit de 70 à 55 (-21%)
+        "Skill": 32,       # Réduit de 40 à 32 (-20%)
+        "Project": 36,     # Réduit de 45 à 36 (-20%)
+        "Role": 28,        # Réduit de 35 à 28 (-20%)
+        "Entity": 26,      # Réduit de 33 à 26 (-21%)
+        "Concept": 30      # Réduit de 37 à 30 (-19%)
+    }
+    base = base_sizes.get(node_type, 24)  # Réduit de 30 à 24
+    # Légèrement moins d'impact de l'importance pour garder les bulles compactes
+    return base + (importance * 2.0)  # Réduit de 2.5 à 2.0
+
+def get_connected_nodes(node_id, index):
+    """Retourne tous les nodes directement connectés à un nœud donné"""
+    return index.neighbors(node_id)
+
+def get_relevant_edges(node_id, index):
+    """Retourne les edges connectés à un nœud donné"""
+    return [index.edges[i] for i in sorted(index.incident_edge_ids(node_id))]
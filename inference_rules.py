@@ -0,0 +1,168 @@
+"""Règles d'inférence déclaratives (inference_rules.json) compilées en un seul automate.
+
+- concept_rules : une skill utilisée dans `min_usage`+ projects est reliée aux
+  concepts dont le label contient un des `concept_keywords`
+- tech_rules : relation fixe entre deux technologies (ex. docker RUNS_ON linux)
+
+Tous les mots-clés de toutes les règles forment un automate d'Aho–Corasick :
+une seule passe sur les labels du graphe, quel que soit le nombre de règles.
+Un mot-clé correspond à n'importe quelle position, comme le test `kw in label`
+d'origine ("ai" trouve "AI Automation" mais aussi "OpenAI" et "maintenance").
+"""
+import json
+import os
+import threading
+from collections import Counter, deque
+from functools import lru_cache
+
+# Fichier de règles (surchargeable pour tester un autre jeu de règles)
+DEFAULT_RULES_PATH = os.getenv(
+    "INFERENCE_RULES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "inference_rules.json")
+)
+
+class KeywordMatcher:
+    """Automate d'Aho–Corasick sur un ensemble de mots-clés en minuscules"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = self._goto[state][char]
+            self._output[state] += (keyword_id,)
+
+        # Liens d'échec (parcours en largeur) : plus long suffixe qui est aussi un préfixe
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def find(self, text):
+        """Ids des mots-clés présents n'importe où dans `text` (déjà en minuscules)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_id in output[state]:
+                found.add(keyword_id)
+        return found
+
+
+def _keywords(rule, field):
+    """Mots-clés normalisés d'un champ de règle (liste ou chaîne seule)"""
+    value = rule.get(field)
+    values = [value] if isinstance(value, str) else list(value or [])
+    keywords = [str(k).strip().lower() for k in values]
+    if not keywords or not all(keywords):
+        raise ValueError(f"inference rule {rule!r}: '{field}' needs non-empty keywords")
+    return keywords
+
+
+class RuleSet:
+    """Jeu de règles compilé, avec compteurs de hits par règle (partagés entre threads)"""
+
+    def __init__(self, concept_rules=(), tech_rules=()):
+        self.concept_rules = []
+        for rule in concept_rules:
+            self.concept_rules.append({
+                "name": rule.get("name") or "+".join(_keywords(rule, "concept_keywords")),
+                "concept_keywords": _keywords(rule, "concept_keywords"),
+                "skill_keywords": _keywords(rule, "skill_keywords"),
+                "label": rule.get("label", "ENABLES"),
+                "min_usage": int(rule.get("min_usage", 2)),
+            })
+
+        self.tech_rules = []
+        for rule in tech_rules:
+            if not rule.get("label"):
+                raise ValueError(f"inference rule {rule!r}: 'label' is required")
+            source, target = _keywords(rule, "from")[0], _keywords(rule, "to")[0]
+            self.tech_rules.append({
+                "name": rule.get("name") or f"{source} {rule['label']} {target}",
+                "from": source,
+                "to": target,
+                "label": rule["label"],
+            })
+
+        names = [r["name"] for r in self.concept_rules + self.tech_rules]
+        duplicates = {n for n, count in Counter(names).items() if count > 1}
+        if duplicates:
+            raise ValueError(f"duplicate inference rule names: {sorted(duplicates)}")
+
+        # Un seul automate pour tous les mots-clés de toutes les règles
+        self._keyword_ids = {}
+        for rule in self.concept_rules:
+            for keyword in rule["concept_keywords"] + rule["skill_keywords"]:
+                self._keyword_ids.setdefault(keyword, len(self._keyword_ids))
+        for rule in self.tech_rules:
+            for keyword in (rule["from"], rule["to"]):
+                self._keyword_ids.setdefault(keyword, len(self._keyword_ids))
+        self.matcher = KeywordMatcher(self._keyword_ids)
+
+        self._lock = threading.Lock()
+        self.graphs = 0
+        self.hits = {name: 0 for name in names}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        return cls(rules.get("concept_rules", []), rules.get("tech_rules", []))
+
+    def match_labels(self, labels):
+        """Une passe sur les labels : id du mot-clé -> positions (croissantes) des labels"""
+        matches = [[] for _ in self._keyword_ids]
+        for position, label in enumerate(labels):
+            for keyword_id in self.matcher.find(label.lower()):
+                matches[keyword_id].append(position)
+        return matches
+
+    def positions(self, matches, keywords):
+        """Positions (triées) des labels contenant au moins un des mots-clés"""
+        if len(keywords) == 1:
+            return matches[self._keyword_ids[keywords[0]]]
+        return sorted({p for keyword in keywords for p in matches[self._keyword_ids[keyword]]})
+
+    def record(self, rule_hits):
+        """Ajoute les edges inférées par règle lors d'un enrichissement"""
+        with self._lock:
+            self.graphs += 1
+            for name, count in rule_hits.items():
+                self.hits[name] += count
+
+    def stats(self):
+        """Hits par règle (edges inférées), règles les plus productives d'abord"""
+        with self._lock:
+            rules = [
+                {"name": r["name"], "kind": kind, "hits": self.hits[r["name"]]}
+                for kind, group in (("concept", self.concept_rules), ("tech", self.tech_rules))
+                for r in group
+            ]
+            graphs = self.graphs
+        rules.sort(key=lambda r: -r["hits"])
+        return {"graphs": graphs, "keywords": len(self._keyword_ids), "rules": rules}
+
+
+@lru_cache(maxsize=None)
+def default_rules():
+    """Règles du fichier par défaut, chargées et compilées une fois par process"""
+    return RuleSet.from_file()
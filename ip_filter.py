@@ -1,66 +1,206 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
 import streamlit as st
-from datetime import datetime, timedelta
-from collections import defaultdict
-
-# Bots confirmés à bloquer
-BLOCKED_IPS = [
-    "185.136.92.136",    # Iguane Solutions - Bot IA
-    "103.197.153.253",   # Asie - Comportement suspect
-    "190.44.117.142",    # Amérique du Sud - Trop de requêtes
-    "103.167.135.173",   # Asie - Comportement suspect
-    "119.111.248.104",   # Pakistan - Trop de requêtes
-]
-
-# Rate limiting pour les autres
-if 'ip_requests' not in st.session_state:
-    st.session_state.ip_requests = defaultdict(list)
+
+from blocklist import Blocklist
+
+# Rate limiting pour les autres : 15 requêtes par fenêtre glissante de 5 minutes
+RATE_LIMIT = 15
+RATE_WINDOW_SECONDS = 300
+# Nombre maximal d'IPs suivies en mémoire (les moins récentes sont évincées au-delà)
+RATE_MAX_KEYS = 100_000
+# Store partagé optionnel (plusieurs instances Cloud Run) : redis://host:6379/0
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+
+class SlidingWindowLimiter:
+    """Limiteur par clé (IP) en compteur à fenêtre glissante, partagé par tout le process.
+
+    Chaque clé garde deux compteurs (fenêtre courante et précédente) : le nombre de
+    requêtes sur la dernière fenêtre est estimé par pondération, en O(1) et en mémoire
+    constante par clé. Les clés inactives depuis deux fenêtres sont évincées au fil
+    des appels, et au plus `max_keys` clés sont conservées (LRU).
+    """
+
+    def __init__(self, limit=RATE_LIMIT, window=RATE_WINDOW_SECONDS, max_keys=RATE_MAX_KEYS, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        # clé -> [début de la fenêtre courante, compteur courant, compteur précédent]
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def _estimate(self, state, now):
+        """Avance la fenêtre de la clé si besoin, retourne le compte glissant estimé"""
+        elapsed_windows = int((now - state[0]) // self.window)
+        if elapsed_windows >= 1:
+            state[2] = state[1] if elapsed_windows == 1 else 0
+            state[1] = 0
+            state[0] += elapsed_windows * self.window
+        previous_weight = 1 - (now - state[0]) / self.window
+        return state[1] + state[2] * previous_weight
+
+    def hit(self, key):
+        """Enregistre une requête pour `key` ; False si la limite est atteinte"""
+        now = self.clock()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                state = self._keys[key] = [now, 0, 0]
+            else:
+                self._keys.move_to_end(key)
+
+            allowed = self._estimate(state, now) < self.limit
+            if allowed:
+                state[1] += 1
+                self.allowed += 1
+            else:
+                self.limited += 1
+
+            self._evict(now)
+        return allowed
+
+    def _evict(self, now):
+        """Retire les clés les moins récentes : inactives depuis 2 fenêtres ou en surnombre"""
+        while self._keys:
+            oldest_key, oldest = next(iter(self._keys.items()))
+            idle = now - oldest[0] >= 2 * self.window
+            if not idle and len(self._keys) <= self.max_keys:
+                break
+            del self._keys[oldest_key]
+            self.evictions += 1
+
+    def stats(self):
+        """Compteurs exportables (requêtes acceptées / limitées, clés suivies)"""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "keys": len(self._keys),
+                "allowed": self.allowed,
+                "limited": self.limited,
+                "evictions": self.evictions,
+            }
+
+
+# Lecture des deux fenêtres, décision et incrément en une seule opération atomique :
+# deux instances ne peuvent pas accepter la même « dernière » requête
+REDIS_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current + previous * tonumber(ARGV[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisSlidingWindowLimiter:
+    """Même algorithme sur un store Redis partagé entre instances (dépendance optionnelle)"""
+
+    def __init__(self, url, limit=RATE_LIMIT, window=RATE_WINDOW_SECONDS, prefix="ratelimit"):
+        import redis  # optionnel : uniquement si RATE_LIMIT_REDIS_URL est défini
+
+        self.client = redis.Redis.from_url(url)
+        self._hit_script = self.client.register_script(REDIS_HIT_SCRIPT)
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def hit(self, key):
+        now = time.time()
+        current_window = int(now // self.window)
+        current_key = f"{self.prefix}:{key}:{current_window}"
+        previous_key = f"{self.prefix}:{key}:{current_window - 1}"
+
+        # Les compteurs expirent seuls après deux fenêtres : pas d'éviction à gérer
+        previous_weight = 1 - (now % self.window) / self.window
+        allowed = bool(self._hit_script(keys=[current_key, previous_key],
+                                        args=[repr(previous_weight), self.limit, 2 * self.window]))
+
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        return allowed
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "redis", "allowed": self.allowed, "limited": self.limited}
+
+
+@st.cache_resource
+def get_blocklist():
+    """Bots confirmés à bloquer (blocklist.txt, partagé avec le Caddyfile, rechargé à chaud)"""
+    return Blocklist()
+
+
+@st.cache_resource
+def get_rate_limiter():
+    """Limiteur unique pour toutes les sessions du process (Redis si configuré)"""
+    if RATE_LIMIT_REDIS_URL:
+        return RedisSlidingWindowLimiter(RATE_LIMIT_REDIS_URL)
+    return SlidingWindowLimiter()
+
 
 def get_client_ip():
     """Récupère l'IP réelle du client via headers Cloud Run"""
     try:
-        headers = st.context.headers
+        try:
+            headers = st.context.headers
+        except AttributeError:
+            # Streamlit < 1.37 : headers de la connexion websocket
+            from streamlit.web.server.websocket_headers import _get_websocket_headers
+            headers = _get_websocket_headers() or {}
         # Cloud Run utilise X-Forwarded-For
         ip = headers.get("X-Forwarded-For", "").split(",")[0].strip()
         if not ip:
             ip = headers.get("X-Real-IP", "unknown")
         return ip
-    except:
+    except Exception:
         return "unknown"
 
+
+def rate_limit_key(client_ip):
+    """Clé du limiteur : l'IP, ou la session si l'IP est inconnue (pas de compteur commun)"""
+    if client_ip != "unknown":
+        return client_ip
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return f"session:{ctx.session_id}" if ctx else client_ip
+
+
 def check_access():
-    """Filtre d'accès : Bloque les bots + rate limiting"""
-    
-    # INITIALISATION CRITIQUE : 
-    # On s'assure que l'objet existe AVANT toute manipulation
-    if 'ip_requests' not in st.session_state:
-        st.session_state['ip_requests'] = defaultdict(list)
-    
+    """Filtre d'accès : Bloque les bots + rate limiting.
+
+    La blocklist est vérifiée à chaque rerun ; le rate limit compte les ouvertures
+    de session (chargements de page), pas les reruns d'une session déjà acceptée.
+    """
     client_ip = get_client_ip()
-    
+
     # 1. BLOCAGE TOTAL des bots identifiés
-    if client_ip in BLOCKED_IPS:
+    if get_blocklist().match(client_ip):
         st.error(f"🚫 **Access Denied**")
         st.warning(f"IP {client_ip} has been flagged for aggressive behavior.")
         st.stop()
-    
-    # 2. RATE LIMITING
-    now = datetime.now()
-    cutoff = now - timedelta(minutes=5)
-    
-    # On récupère la liste ou une liste vide si l'IP n'existe pas encore
-    requests_list = st.session_state['ip_requests'].get(client_ip, [])
-    
-    # Nettoie les anciennes requêtes
-    st.session_state['ip_requests'][client_ip] = [
-        t for t in requests_list if t > cutoff
-    ]
-    
-    # Vérifie la limite
-    if len(st.session_state['ip_requests'][client_ip]) >= 15:
-        st.warning("⚠️ **Too many requests**")
-        st.stop()
-    
-    # Enregistre cette requête
-    st.session_state['ip_requests'][client_ip].append(now)
-    
-    return client_ip
\ No newline at end of file
+
+    # 2. RATE LIMITING (compteur partagé par toutes les sessions du process)
+    if not st.session_state.get('rate_limit_passed'):
+        if not get_rate_limiter().hit(rate_limit_key(client_ip)):
+            st.warning("⚠️ **Too many requests**")
+            st.stop()
+        st.session_state.rate_limit_passed = True
+
+    return client_ip
@@ -0,0 +1,74 @@
+import numpy as np
+
+from graph_logic import SPACING_CONFIGS
+
+# Taille des blocs de lignes pour la répulsion : mémoire bornée à BLOCK × n paires
+BLOCK = 512
+# Au-delà de EXACT_MAX_NODES, la répulsion est estimée sur REPULSION_SAMPLE nœuds tirés
+# à chaque itération (O(n·s) au lieu de O(n²))
+EXACT_MAX_NODES = 1000
+REPULSION_SAMPLE = 256
+
+
+def force_layout(index, spacing_level="Large", iterations=300, central_gravity=0.1, seed=42):
+    """Layout force-directed (Fruchterman–Reingold) vectorisé, calculé côté serveur.
+
+    Retourne un tableau (n, 2) de positions x/y aligné sur index.nodes.
+    La longueur de ressort du niveau d'espacement sert de distance idéale entre
+    voisins : même échelle que la physique barnesHut côté navigateur.
+    """
+    n = len(index.nodes)
+    if n == 0:
+        return np.zeros((0, 2))
+
+    spacing_params = SPACING_CONFIGS.get(spacing_level, SPACING_CONFIGS["Large"])
+    k = float(spacing_params["spring"])
+
+    # Extrémités des edges en positions de nœuds (edges hors graphe ignorées)
+    keep = (index.edge_sources >= 0) & (index.edge_targets >= 0) & (index.edge_sources != index.edge_targets)
+    sources, targets = index.edge_sources[keep].astype(np.intp), index.edge_targets[keep].astype(np.intp)
+
+    # Départ reproductible : même graphe + même niveau = même layout
+    rng = np.random.default_rng(seed)
+    radius = k * np.sqrt(n)
+    positions = rng.uniform(-radius, radius, (n, 2))
+    start_temperature = radius / 4
+
+    for step in range(iterations):
+        displacement = np.zeros_like(positions)
+
+        # Répulsion k²/d entre toutes les paires, par blocs de lignes (x et y séparés :
+        # les réductions se font sur l'axe contigu)
+        x, y = positions[:, 0], positions[:, 1]
+        if n > EXACT_MAX_NODES:
+            sample = rng.choice(n, REPULSION_SAMPLE, replace=False)
+            other_x, other_y, scale = x[sample], y[sample], n / REPULSION_SAMPLE
+        else:
+            other_x, other_y, scale = x, y, 1.0
+        for start in range(0, n, BLOCK):
+            dx = x[start:start + BLOCK, None] - other_x[None, :]
+            dy = y[start:start + BLOCK, None] - other_y[None, :]
+            weight = dx * dx
+            weight += dy * dy
+            np.maximum(weight, 1e-2, out=weight)
+            np.divide(k * k * scale, weight, out=weight)
+            displacement[start:start + BLOCK, 0] += (dx * weight).sum(axis=1)
+            displacement[start:start + BLOCK, 1] += (dy * weight).sum(axis=1)
+
+        # Attraction d²/k le long des edges
+        if len(sources):
+            delta = positions[sources] - positions[targets]
+            dist = np.sqrt((delta ** 2).sum(axis=-1))
+            force = delta * (dist / k)[:, None]
+            np.subtract.at(displacement, sources, force)
+            np.add.at(displacement, targets, force)
+
+        # Gravité centrale : garde les composantes déconnectées à portée
+        displacement -= central_gravity * positions
+
+        # Déplacement borné par une température décroissante (refroidissement linéaire)
+        temperature = start_temperature * (1 - step / iterations) + k * 0.01
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=-1)), 1e-9)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+
+    return positions - positions.mean(axis=0)
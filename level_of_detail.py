@@ -0,0 +1,246 @@
+"""Niveau de détail (LOD) du Network Graph pour les grands graphes.
+
+Au-delà d'un seuil de nœuds, les nœuds filtrés sont regroupés en super-nœuds :
+par communauté puis par type (ou l'inverse). Seule la tranche visible est envoyée
+au navigateur : les groupes repliés, et les membres des groupes dépliés (un clic
+sur un super-nœud le déplie). Un groupe déplié encore trop gros est découpé au
+niveau suivant ; trop de groupes, et les plus petits sont réunis dans un
+super-nœud « autres groupes », dépliable lui aussi. Les edges entre groupes sont
+agrégées (une par paire, épaisseur selon leur nombre).
+"""
+import json
+import math
+from collections import namedtuple
+
+import numpy as np
+from streamlit_agraph import Edge, Node
+
+from graph_logic import COLOR_MAP
+from views import build_network_elements, network_edge, network_node
+
+# Nœuds envoyés au navigateur au-delà desquels le graphe est regroupé
+DEFAULT_LOD_THRESHOLD = 300
+# Super-nœuds par niveau : au-delà, les plus petits groupes sont réunis dans « autres groupes »
+MAX_GROUPS = 40
+# Liens agrégés gardés par élément (les plus forts)
+MAX_CLUSTER_LINKS = 5
+CLUSTER_PREFIX = "cluster::"
+# Ordre des regroupements selon le critère choisi
+GROUP_LEVELS = {"community": ("community", "type"), "type": ("type", "community")}
+OTHERS = "…"
+
+# nodes / edges : éléments agraph envoyés ; clusters : id de super-nœud -> chemin (None : non dépliable) ;
+# level : profondeur de dépliage ("full" : graphe complet) ; payload_bytes : taille du JSON envoyé
+LodView = namedtuple("LodView", "nodes edges clusters level payload_bytes")
+
+
+def payload_bytes(nodes, edges):
+    """Taille du JSON que streamlit_agraph envoie au navigateur pour ces éléments"""
+    data = {"nodes": [node.to_dict() for node in nodes], "edges": [edge.to_dict() for edge in edges]}
+    return len(json.dumps(data).encode("utf-8"))
+
+
+def cluster_id(path):
+    return CLUSTER_PREFIX + "/".join(path)
+
+
+def lod_applies(index, selected_types, threshold):
+    """Vrai si la sélection dépasse le seuil (sinon le graphe est envoyé tel quel)"""
+    return threshold is not None and int(index.select_types(selected_types).node_mask.sum()) > threshold
+
+
+def build_lod_elements(index, selected_types, focus=None, show_edge_labels=False, positions=None,
+                       importance=None, threshold=None, group_by="community", expanded=frozenset(), reveal=None):
+    """LodView de la sélection : graphe complet sous le seuil (ou threshold=None), sinon regroupé.
+
+    expanded : chemins des super-nœuds dépliés (valeurs de LodView.clusters)
+    reveal : id d'un nœud toujours visible (nœud en focus) : les groupes qui le contiennent sont dépliés
+    """
+    if not lod_applies(index, selected_types, threshold):
+        nodes, edges = build_network_elements(index, selected_types, focus, show_edge_labels, positions, importance)
+        return LodView(nodes, edges, {}, "full", payload_bytes(nodes, edges))
+    return _LodBuilder(index, selected_types, focus, show_edge_labels, positions, importance,
+                       threshold, group_by, expanded, reveal).build()
+
+
+class _LodBuilder:
+    """Découpage récursif de la sélection en nœuds visibles et super-nœuds"""
+
+    def __init__(self, index, selected_types, focus, show_edge_labels, positions, importance,
+                 threshold, group_by, expanded, reveal):
+        self.index = index
+        self.selection = index.select_types(selected_types)
+        self.focus = focus
+        self.show_edge_labels = show_edge_labels
+        self.positions = positions
+        self.importance = importance
+        self.threshold = max(2, threshold)
+        self.expanded = expanded
+        self.root = (group_by,)
+        columns = index.columns
+        self.keys = [index.analytics.communities if level == "community" else columns.node_type.astype(np.int64)
+                     for level in GROUP_LEVELS[group_by]]
+        self.levels = GROUP_LEVELS[group_by]
+        self.rank = (index.importance if importance is None else importance).astype(np.float64)
+
+        # Nœuds du focus (les autres sont atténués) et position du nœud à garder visible
+        self.focus_mask = None
+        if focus is not None:
+            self.focus_mask = np.zeros(len(index.nodes), dtype=bool)
+            self.focus_mask[[p for p in map(index.position, focus.nodes) if p is not None]] = True
+        position = index.position(reveal) if reveal is not None else None
+        self.reveal = -1 if position is None else position
+
+        self.visible = []       # positions des nœuds affichés individuellement (tableaux)
+        self.clusters = []      # (chemin ou None, libellé, membres)
+        self.level = 0
+
+    def build(self):
+        members = np.flatnonzero(self.selection.node_mask)
+        self._expand(members, self.root, 0, self.reveal in members)
+        return self._elements()
+
+    def _expand(self, members, path, depth, revealing):
+        """Affiche `members` : individuellement s'ils tiennent sous le seuil, sinon en groupes"""
+        self.level = max(self.level, len(path) - 1)
+        if len(members) <= self.threshold:
+            self.visible.append(members)
+            return
+        if depth == len(self.levels):
+            # Plus de critère de regroupement : les plus importants, le reste en un super-nœud
+            order = np.argsort(-self.rank[members], kind="stable")
+            shown, rest = members[order[:self.threshold - 1]], members[order[self.threshold - 1:]]
+            if revealing and self.reveal in rest:
+                shown = np.append(shown, self.reveal)
+                rest = rest[rest != self.reveal]
+            self.visible.append(shown)
+            self.clusters.append((None, f"+{len(rest)} more", rest))
+            return
+
+        keys, inverse, counts = np.unique(self.keys[depth][members], return_inverse=True, return_counts=True)
+        if len(keys) == 1:
+            self._expand(members, path, depth + 1, revealing)
+            return
+        # Membres regroupés par clé (un tri, puis des tranches), groupes du plus gros au plus petit
+        grouped = members[np.argsort(inverse, kind="stable")]
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        order = np.argsort(-counts, kind="stable")
+        shown, others = order[:MAX_GROUPS - 1], order[MAX_GROUPS - 1:]
+        if revealing and len(others):
+            # Le groupe du nœud à révéler est affiché même s'il est petit (pas de pagination)
+            target = inverse[int(np.flatnonzero(members == self.reveal)[0])]
+            if target in others:
+                shown, others = np.append(shown, target), others[others != target]
+        for group in shown.tolist():
+            group_members = grouped[bounds[group]:bounds[group + 1]]
+            child = path + (self._key_label(depth, keys[group]),)
+            contains = revealing and bool((group_members == self.reveal).any())
+            if child in self.expanded or contains:
+                self._expand(group_members, child, depth + 1, contains)
+            else:
+                self.clusters.append((child, self._group_label(depth, keys[group], len(group_members)), group_members))
+        if len(others):
+            rest = np.concatenate([grouped[bounds[g]:bounds[g + 1]] for g in others.tolist()])
+            child = path + (OTHERS,)
+            if child in self.expanded:
+                # Page suivante : les groupes restants, au même niveau
+                self._expand(rest, child, depth, False)
+            else:
+                self.clusters.append((child, f"{len(others)} other groups ({len(rest)})", rest))
+
+    def _key_label(self, depth, key):
+        if self.levels[depth] == "community":
+            return f"community {int(key) + 1}"
+        types = self.index.columns.types
+        return str(types[key]) if 0 <= key < len(types) else "?"
+
+    def _group_label(self, depth, key, size):
+        return f"{self._key_label(depth, key)} ({size})"
+
+    # --- éléments agraph ---
+
+    def _elements(self):
+        index = self.index
+        n = len(index.nodes)
+        visible = np.concatenate(self.visible) if self.visible else np.zeros(0, dtype=np.int64)
+        # Élément affiché de chaque nœud : son propre Node, ou le super-nœud qui le contient
+        element = np.full(n, -1, dtype=np.int64)
+        element[visible] = np.arange(len(visible))
+        for c, (_, _, members) in enumerate(self.clusters):
+            element[members] = len(visible) + c
+
+        def active(positions):
+            return self.focus_mask is None or bool(self.focus_mask[positions].any())
+
+        element_active = [active([p]) for p in visible.tolist()] + [active(m) for _, _, m in self.clusters]
+        nodes = [network_node(index, index.nodes[p], is_active, self.positions, self.importance)
+                 for p, is_active in zip(visible.tolist(), element_active)]
+        clusters = {}
+        for (path, label, members), is_active in zip(self.clusters, element_active[len(visible):]):
+            node_id = cluster_id(path) if path is not None else cluster_id(self.root + ("more", str(len(clusters))))
+            clusters[node_id] = path
+            nodes.append(self._cluster_node(node_id, label, members, is_active))
+
+        # Extrémités des edges filtrées en positions de nœuds, puis en éléments affichés
+        edge_ids = np.asarray(self.selection.edge_ids, dtype=np.int64)
+        a = element[index.edge_sources[edge_ids]]
+        b = element[index.edge_targets[edge_ids]]
+        keep = (a >= 0) & (b >= 0) & (a != b)
+        edge_ids, a, b = edge_ids[keep], a[keep], b[keep]
+
+        # Entre deux nœuds visibles : l'edge elle-même ; sinon une edge agrégée par paire d'éléments
+        direct = (a < len(visible)) & (b < len(visible))
+        focus_edges = self.focus.edges if self.focus is not None else None
+        edges = [network_edge(index.edges[e], focus_edges is None or e in focus_edges, self.show_edge_labels)
+                 for e in edge_ids[direct].tolist()]
+        low, high = np.minimum(a[~direct], b[~direct]), np.maximum(a[~direct], b[~direct])
+        pairs, counts = np.unique(low * len(nodes) + high, return_counts=True)
+        low, high = pairs // len(nodes), pairs % len(nodes)
+        # Seuls les liens les plus forts de chaque élément sont gardés (sinon presque
+        # tous les groupes sont reliés entre eux)
+        rank = self._link_rank(np.concatenate([low, high]), np.concatenate([counts, counts]))
+        strongest = (rank[:len(low)] < MAX_CLUSTER_LINKS) | (rank[len(low):] < MAX_CLUSTER_LINKS)
+        for source, target, count in zip(low[strongest].tolist(), high[strongest].tolist(), counts[strongest].tolist()):
+            is_active = element_active[source] and element_active[target]
+            source, target = nodes[source], nodes[target]
+            edges.append(Edge(
+                source=source.id,
+                target=target.id,
+                label=str(count) if self.show_edge_labels and is_active else '',
+                color="#95A5A6" if is_active else "#E8E8E8",
+                width=1 + math.log2(count),
+                title=f"{count} relationship(s)"
+            ))
+        return LodView(nodes, edges, clusters, self.level, payload_bytes(nodes, edges))
+
+    @staticmethod
+    def _link_rank(ends, counts):
+        """Rang de chaque (extrémité, lien) parmi les liens de cette extrémité, du plus fort au plus faible"""
+        order = np.lexsort((-counts, ends))
+        starts = np.flatnonzero(np.r_[True, ends[order][1:] != ends[order][:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.repeat(starts, sizes)
+        return rank
+
+    def _cluster_node(self, node_id, label, members, active):
+        """Super-nœud : couleur du type dominant, taille selon le nombre de membres"""
+        node_type = np.bincount(self.index.columns.node_type[members].astype(np.int64) + 1).argmax() - 1
+        types = self.index.columns.types
+        color = COLOR_MAP.get(types[node_type], "#BDC3C7") if node_type >= 0 else "#BDC3C7"
+        # Survol : les membres les plus importants
+        top = members[np.argsort(-self.rank[members], kind="stable")[:5]]
+        title = ", ".join(str(self.index.nodes[p].get('label', '')) for p in top.tolist())
+        coordinates = {}
+        if self.positions is not None:
+            x, y = self.positions[members].mean(axis=0)
+            coordinates = {'x': round(float(x), 1), 'y': round(float(y), 1)}
+        return Node(
+            id=node_id,
+            label=label,
+            title=title + (", …" if len(members) > len(top) else ""),
+            size=30 + 12 * math.log10(len(members)),
+            color=color if active else "#E0E0E0",
+            shape="diamond",
+            **coordinates
+        )
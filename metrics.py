@@ -0,0 +1,291 @@
+"""Instrumentation par phase : durées, tokens Gemini, mémoire par session, caches.
+
+Tout est local (aucun service externe) :
+- métriques au format texte Prometheus, servies par un petit serveur HTTP
+  (METRICS_PORT, 127.0.0.1 par défaut) et visibles dans le panneau debug ;
+- une ligne de log JSON par événement, sur demande (METRICS_LOG : "off" par
+  défaut, "stderr" ou un chemin de fichier).
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_LOG = os.getenv("METRICS_LOG", "off")
+PREFIX = "kgcv"
+
+# Bornes des histogrammes de durée (secondes) : du rendu d'une vue à un appel Gemini lent
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Prix indicatifs en $ par million de tokens (entrée, sortie), à ajuster selon la grille Gemini
+MODEL_PRICES = {
+    "gemini-3-flash-preview": (0.50, 3.00),
+    "gemini-3-pro-preview": (2.00, 12.00),
+}
+# Sessions dont la mémoire est suivie (les plus anciennes sont oubliées au-delà)
+MAX_TRACKED_SESSIONS = 1000
+# Classes dont deep_sizeof parcourt les attributs (graphes et index, voir sized())
+_SIZED_CLASSES = set()
+
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _value_text(value):
+    return str(value) if isinstance(value, int) else f"{value:.10g}"
+
+
+def _metric_name(*parts):
+    return "_".join(p.replace("-", "_").replace(" ", "_").lower() for p in (PREFIX,) + parts)
+
+
+def _counter_name(*parts):
+    """Nom Prometheus d'un compteur (suffixe _total)"""
+    name = _metric_name(*parts)
+    return name if name.endswith("_total") else name + "_total"
+
+
+class Metrics:
+    """Registre de métriques du process (histogrammes, compteurs, jauges), thread-safe"""
+
+    def __init__(self, logger=None):
+        self._lock = threading.Lock()
+        # (nom, labels triés) -> [compteurs par bucket, somme, nombre]
+        self._histograms = {}
+        # (nom, labels triés) -> valeur
+        self._counters = {}
+        self._session_bytes = {}
+        self._collectors = {}
+        self.logger = logger or logging.getLogger(PREFIX)
+
+    # --- enregistrement ---
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(DURATION_BUCKETS), 0.0, 0]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def log(self, event, **fields):
+        """Log structuré : une ligne JSON par événement"""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+    @contextmanager
+    def timer(self, phase, **labels):
+        """Chronomètre une phase (histogramme phase_seconds + log), y compris en cas d'erreur"""
+        started_at = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException as e:
+            # st.stop() / st.rerun() sont des BaseException : ce ne sont pas des erreurs
+            if isinstance(e, Exception):
+                status = "error"
+            raise
+        finally:
+            seconds = time.perf_counter() - started_at
+            self.observe("phase_seconds", seconds, phase=phase, **labels)
+            self.log("phase", phase=phase, seconds=round(seconds, 6), status=status, **labels)
+
+    def record_usage(self, usage, model):
+        """Tokens d'une réponse Gemini (usage_metadata) et coût estimé ; retourne le détail"""
+        if usage is None:
+            return None
+        input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        model = model.rsplit("/", 1)[-1]
+        input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+        self.inc("gemini_tokens_total", input_tokens, model=model, direction="input")
+        self.inc("gemini_tokens_total", output_tokens, model=model, direction="output")
+        self.inc("gemini_cost_usd_total", cost, model=model)
+        self.inc("gemini_requests_total", model=model)
+        usage_report = {"model": model, "input_tokens": input_tokens, "output_tokens": output_tokens,
+                        "cost_usd": round(cost, 6)}
+        self.log("gemini_usage", **usage_report)
+        return usage_report
+
+    def set_session_memory(self, session_id, size_bytes):
+        with self._lock:
+            self._session_bytes.pop(session_id, None)
+            self._session_bytes[session_id] = size_bytes
+            while len(self._session_bytes) > MAX_TRACKED_SESSIONS:
+                self._session_bytes.pop(next(iter(self._session_bytes)))
+
+    def register_collector(self, name, collect, counters=()):
+        """collect() -> dict de valeurs numériques, lu à chaque export (stats des caches...).
+
+        counters : clés qui ne font que croître (hits, misses...), exportées en compteurs
+        """
+        with self._lock:
+            self._collectors[name] = (collect, frozenset(counters))
+
+    # --- export ---
+
+    def render_prometheus(self):
+        """Toutes les métriques au format d'exposition texte Prometheus"""
+        with self._lock:
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self._histograms.items()}
+            counters = dict(self._counters)
+            sessions = list(self._session_bytes.values())
+            collectors = dict(self._collectors)
+
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            metric = _metric_name(name)
+            declare(metric, "histogram")
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f"{metric}_bucket{_labels_text(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{metric}_bucket{_labels_text(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{metric}_sum{_labels_text(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_labels_text(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            metric = _counter_name(name)
+            declare(metric, "counter")
+            lines.append(f"{metric}{_labels_text(labels)} {_value_text(value)}")
+
+        for name, value in (("sessions", len(sessions)), ("session_memory_bytes_sum", sum(sessions)),
+                            ("session_memory_bytes_max", max(sessions, default=0))):
+            metric = _metric_name(name)
+            declare(metric, "gauge")
+            lines.append(f"{metric} {value}")
+
+        for collector_name, (collect, counter_keys) in sorted(collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if key in counter_keys:
+                        metric = _counter_name(collector_name, key)
+                        declare(metric, "counter")
+                    else:
+                        metric = _metric_name(collector_name, key)
+                        declare(metric, "gauge")
+                    lines.append(f"{metric} {_value_text(value)}")
+        return "\n".join(lines) + "\n"
+
+    def phase_summary(self):
+        """{phase: (nombre, durée moyenne)} pour l'affichage debug"""
+        with self._lock:
+            summary = {}
+            for (name, labels), (_, total, count) in self._histograms.items():
+                if name == "phase_seconds" and count:
+                    label = " ".join(str(v) for _, v in labels)
+                    summary[label] = (count, total / count)
+            return dict(sorted(summary.items()))
+
+
+def sized(cls):
+    """Décorateur de classe : deep_sizeof compte aussi les attributs de ses instances"""
+    _SIZED_CLASSES.add(cls)
+    return cls
+
+
+def deep_sizeof(obj, exclude=(), _seen=None):
+    """Taille mémoire approximative d'un objet et de ce qu'il contient (octets).
+
+    Parcourt les conteneurs, les tableaux numpy et les classes marquées sized()
+    (graphes, index) ; les autres objets (jobs, modèles Gemini, pools de threads...)
+    ne comptent que pour leur taille propre. Les objets de `exclude` (partagés
+    entre sessions) et leur contenu ne sont pas comptés.
+    """
+    seen = _seen if _seen is not None else {id(shared) for shared in exclude}
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen=seen) + deep_sizeof(v, _seen=seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen=seen) for item in obj)
+    elif type(obj) in _SIZED_CLASSES:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), _seen=seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            size += deep_sizeof(getattr(obj, slot, None), _seen=seen)
+    return size
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # les scrapes ne polluent pas les logs
+
+
+def start_metrics_server(registry, host=METRICS_HOST, port=METRICS_PORT):
+    """Sert /metrics dans un thread démon ; None si le port est pris ou METRICS_PORT=0"""
+    if not port:
+        return None
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def _configure_logger():
+    logger = logging.getLogger(PREFIX)
+    if METRICS_LOG == "off" or logger.handlers:
+        return logger
+    handler = logging.StreamHandler(sys.stderr) if METRICS_LOG == "stderr" else logging.FileHandler(METRICS_LOG)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+# Registre unique du process (app, extraction, batch)
+metrics = Metrics(_configure_logger())
@@ -0,0 +1,91 @@
+"""Pré-extraction locale du texte d'un CV PDF (pypdf, optionnel).
+
+Le texte normalisé (sans images, en-têtes/pieds de page répétés ni espaces en
+double) remplace le PDF dans la requête Gemini : beaucoup moins d'octets et de
+tokens pour les CV riches en images. En cas d'échec (pypdf absent, PDF chiffré,
+PDF scanné sans couche texte), l'appelant repasse au PDF brut.
+"""
+import io
+import math
+import re
+from collections import Counter
+
+# En dessous, on considère que le PDF n'a pas de couche texte exploitable (scan)
+MIN_TEXT_CHARS = 200
+# Estimations de tokens : Gemini facture un PDF ~258 tokens par page (rendu image) en plus
+# de son texte natif ; ~4 caractères par token de texte
+PDF_TOKENS_PER_PAGE = 258
+CHARS_PER_TOKEN = 4
+# Lignes examinées en haut et en bas de chaque page pour détecter en-têtes et pieds de page
+EDGE_LINES = 2
+
+PAGE_NUMBER = re.compile(r'^(page\s*)?\d+(\s*(/|sur|of)\s*\d+)?$', re.IGNORECASE)
+SPACES = re.compile(r'[ \t ]+')
+
+
+class PdfTextError(Exception):
+    """Texte non extractible : l'appelant doit envoyer le PDF"""
+
+
+def _page_lines(page_text):
+    """Lignes non vides d'une page, espaces normalisés"""
+    lines = (SPACES.sub(' ', line).strip() for line in page_text.splitlines())
+    return [line for line in lines if line]
+
+
+def _repeated_edges(pages):
+    """Lignes présentes en haut/bas de la majorité des pages (en-têtes, pieds de page)"""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update(set(lines[:EDGE_LINES] + lines[-EDGE_LINES:]))
+    threshold = max(2, math.ceil(len(pages) / 2))
+    return {line for line, count in counts.items() if count >= threshold}
+
+
+def normalize_pages(page_texts):
+    """Texte compact : sans en-têtes/pieds répétés, numéros de page ni blancs en double"""
+    pages = [_page_lines(text or '') for text in page_texts]
+    repeated = _repeated_edges(pages)
+    kept = []
+    for lines in pages:
+        kept.append('\n'.join(
+            line for line in lines
+            if line not in repeated and not PAGE_NUMBER.match(line)
+        ))
+    return '\n\n'.join(page for page in kept if page)
+
+
+def extract_pdf_text(file_bytes):
+    """Retourne (texte normalisé, rapport octets/tokens) ; PdfTextError si inexploitable"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise PdfTextError("pypdf is not installed") from None
+
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        if reader.is_encrypted:
+            reader.decrypt("")
+        page_texts = [page.extract_text() for page in reader.pages]
+    except Exception as e:
+        raise PdfTextError(f"text extraction failed: {type(e).__name__}: {e}") from None
+
+    text = normalize_pages(page_texts)
+    if len(text) < MIN_TEXT_CHARS:
+        raise PdfTextError(f"only {len(text)} characters of text (scanned PDF?)")
+
+    text_tokens = math.ceil(len(text) / CHARS_PER_TOKEN)
+    pdf_tokens = len(page_texts) * PDF_TOKENS_PER_PAGE + text_tokens
+    text_bytes = len(text.encode('utf-8'))
+    return text, {
+        "mode": "text",
+        "pages": len(page_texts),
+        "pdf_bytes": len(file_bytes),
+        "text_bytes": text_bytes,
+        "bytes_saved": len(file_bytes) - text_bytes,
+        "pdf_tokens_est": pdf_tokens,
+        "text_tokens_est": text_tokens,
+        "tokens_saved_est": pdf_tokens - text_tokens,
+    }
@@ -0,0 +1,360 @@
+"""Index de recherche de nœuds (barre « Recherche de Nœud »), construit une fois par graphe.
+
+- vocabulaire trié des termes des labels (label entier et mots, normalisés) : un
+  préfixe correspond à une plage contiguë trouvée par dichotomie, et les occurrences
+  sont rangées dans le même ordre (CSR) : une seule tranche numpy par préfixe ;
+- bigrammes et trigrammes des mots pour les sous-chaînes ("script" trouve
+  "JavaScript") et les candidats de la recherche approchée ("pyhton" trouve "Python") ;
+- types de nœuds et labels de relations : petits vocabulaires comparés directement,
+  puis projetés sur les nœuds par les colonnes du graphe (codes de type, extrémités).
+
+Étapes : préfixes, puis sous-chaînes (seulement si elles peuvent encore entrer dans
+les k meilleurs), puis recherche approchée (seulement s'il y a moins de k résultats).
+"""
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from columnar_graph import csr_ranges
+from metrics import sized
+
+# Champs interrogeables et leur poids dans le score (les relations comptent moins que le label)
+FIELD_WEIGHTS = {"label": 1.0, "type": 0.5, "relation": 0.4}
+# Champs interrogés par défaut (la sidebar cherche dans les labels)
+DEFAULT_FIELDS = ("label",)
+
+# Qualité d'une correspondance, de la meilleure à la plus lâche
+EXACT, PREFIX, TOKEN_PREFIX, SUBSTRING, FUZZY = 1.0, 0.85, 0.7, 0.5, 0.35
+# Étapes de recherche, de la plus stricte à la plus lâche
+STAGES = ("prefix", "substring", "fuzzy")
+# Part du score apportée par l'importance et par le degré (départage les correspondances égales)
+IMPORTANCE_BOOST = 0.1
+DEGREE_BOOST = 0.1
+
+# Recherche approchée : longueur minimale d'un mot et termes candidats vérifiés au plus
+FUZZY_MIN_LENGTH = 4
+FUZZY_CANDIDATES = 64
+# Requêtes récentes gardées en mémoire (une même requête revient à chaque rerun)
+MAX_CACHED_QUERIES = 256
+
+TOKEN_RE = re.compile(r"[0-9a-z+#]+")
+
+# positions (data['nodes']) et scores des k meilleurs nœuds ; total trouvé, exhaustif ou non
+SearchResult = namedtuple("SearchResult", "positions scores total exhaustive")
+
+
+def normalize(text):
+    """Minuscules sans accents, espaces réduits ("Développement  Web" -> "developpement web")"""
+    text = str(text)
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def _grams(term):
+    """Bigrammes et trigrammes d'un mot, bornés par ^ (début) et $ (fin)"""
+    padded = f"^{term}$"
+    return {padded[i:i + n] for n in (2, 3) for i in range(len(padded) - n + 1)}
+
+
+def _max_distance(token):
+    return 1 if len(token) < 8 else 2
+
+
+def _prefix_distance(query, term, max_distance):
+    """Distance d'édition (transpositions comprises) entre la requête et le meilleur préfixe du terme.
+
+    None au-delà de max_distance ; seules les len(query) + max_distance premières
+    lettres du terme sont comparées.
+    """
+    term = term[:len(query) + max_distance]
+    previous_previous = None
+    previous = list(range(len(term) + 1))
+    for i, q in enumerate(query, 1):
+        current = [i] + [0] * len(term)
+        for j, t in enumerate(term, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (q != t))
+            if previous_previous is not None and j > 1 and q == term[j - 2] and query[i - 2] == t:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    distance = min(previous)
+    return distance if distance <= max_distance else None
+
+
+def match_quality(token, value, stage):
+    """Qualité de la correspondance token / valeur normalisée (0 si aucune) jusqu'à l'étape donnée"""
+    if value == token:
+        return EXACT
+    words = TOKEN_RE.findall(value)
+    if value.startswith(token) or token in words:
+        return PREFIX
+    if any(word.startswith(token) for word in words):
+        return TOKEN_PREFIX
+    if stage >= 1 and token in value:
+        return SUBSTRING
+    if stage >= 2 and len(token) >= FUZZY_MIN_LENGTH:
+        distances = [_prefix_distance(token, word, _max_distance(token)) for word in words]
+        distances = [d for d in distances if d]
+        if distances:
+            return FUZZY / min(distances)
+    return 0.0
+
+
+def _assign_max(scores, positions, values):
+    """scores[positions] = max(scores[positions], values), valeur par valeur (il n'y en a que quelques-unes)"""
+    values = np.broadcast_to(values, positions.shape)
+    for value in np.unique(values).tolist():
+        selected = positions[values == value]
+        scores[selected] = np.maximum(scores[selected], value)
+
+
+@sized
+class SearchIndex:
+    """Index de recherche d'un graphe (nœuds dans l'ordre de data['nodes'])"""
+
+    def __init__(self, index):
+        self.nodes = index.nodes
+        self.columns = index.columns
+        normalized = {}
+        postings = {}   # terme -> [(position du nœud, terme = label entier)]
+
+        for position, node in enumerate(self.nodes):
+            label = node.get('label', node.get('id'))
+            full = normalized.get(label) if isinstance(label, str) else None
+            if full is None:
+                full = normalize(label)
+                if isinstance(label, str):
+                    normalized[label] = full
+            if not full:
+                continue
+            postings.setdefault(full, []).append((position, True))
+            tokens = TOKEN_RE.findall(full)
+            if tokens != [full]:
+                for token in dict.fromkeys(tokens):
+                    postings.setdefault(token, []).append((position, False))
+
+        # Vocabulaire trié + occurrences en CSR : le terme t occupe offsets[t]:offsets[t + 1]
+        self.terms = sorted(postings)
+        counts = [len(postings[term]) for term in self.terms]
+        self.offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        flat = [p for term in self.terms for p in postings[term]]
+        self.doc = np.asarray([p[0] for p in flat], dtype=np.int32)
+        self.full = np.asarray([p[1] for p in flat], dtype=bool)
+
+        # N-grammes des mots seulement (les labels de plusieurs mots sont couverts par leurs mots)
+        grams = {}
+        for term_id, term in enumerate(self.terms):
+            if " " not in term:
+                for gram in _grams(term):
+                    grams.setdefault(gram, []).append(term_id)
+        self.grams = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in grams.items()}
+
+        # Vocabulaires des champs catégoriels (types de nœuds, labels de relations)
+        self.types = [normalize(t) for t in self.columns.types]
+        self.relations = [normalize(label) for label in self.columns.labels]
+        # Positions des nœuds touchés par chaque label de relation (une extrémité au moins)
+        columns = self.columns
+        self.relation_nodes = []
+        for code in range(len(self.relations)):
+            id_mask = np.zeros(len(columns.ids), dtype=bool)
+            edges = columns.edge_label == code
+            id_mask[columns.src[edges]] = True
+            id_mask[columns.dst[edges]] = True
+            self.relation_nodes.append(np.flatnonzero(id_mask[columns.node_id_codes]))
+
+        # Score statique : importance (0-10) et degré (échelle log), chacun ramené à [0, 1]
+        importance = np.asarray([self._number(n.get('importance', 5)) for n in self.nodes], dtype=np.float64)
+        degree = np.log1p(np.asarray(index.degree_array, dtype=np.float64))
+        self.static = (IMPORTANCE_BOOST * np.clip(importance, 0, 10) / 10
+                       + DEGREE_BOOST * degree / (float(degree.max(initial=0.0)) or 1.0))
+        self._max_static = IMPORTANCE_BOOST + DEGREE_BOOST
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _number(value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return 5.0
+        return value if math.isfinite(value) else 5.0
+
+    # --- labels : termes correspondant à un mot de la requête ---
+
+    def _prefix_range(self, prefix):
+        """Plage [lo, hi) des termes du vocabulaire commençant par prefix"""
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _substring_terms(self, token):
+        """Mots contenant token ailleurs qu'au début (intersection des n-grammes)"""
+        if len(token) < 2:
+            return []
+        n = 3 if len(token) >= 3 else 2
+        candidates = None
+        for i in range(len(token) - n + 1):
+            term_ids = self.grams.get(token[i:i + n])
+            if term_ids is None:
+                return []
+            candidates = term_ids if candidates is None else np.intersect1d(candidates, term_ids, assume_unique=True)
+        terms = self.terms
+        return [t for t in candidates.tolist() if token in terms[t] and not terms[t].startswith(token)]
+
+    def _fuzzy_terms(self, token):
+        """(mot, distance) des mots dont un préfixe est à 1-2 fautes de frappe de token"""
+        if len(token) < FUZZY_MIN_LENGTH:
+            return []
+        padded = f"^{token}"
+        term_ids = [self.grams[g] for g in {padded[i:i + 3] for i in range(len(padded) - 2)} if g in self.grams]
+        if not term_ids:
+            return []
+        # Candidats : mots partageant le plus de trigrammes avec le début de token
+        candidates, shared = np.unique(np.concatenate(term_ids), return_counts=True)
+        if len(candidates) > FUZZY_CANDIDATES:
+            candidates = candidates[np.argpartition(-shared, FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]]
+        matches = []
+        for term_id in candidates.tolist():
+            distance = _prefix_distance(token, self.terms[term_id], _max_distance(token))
+            if distance:  # 0 : déjà trouvé par préfixe
+                matches.append((term_id, distance))
+        return matches
+
+    def _label_matches(self, token, stage):
+        """(positions des nœuds, qualités) des labels correspondant à token à cette étape ; None si aucun"""
+        if stage == 0:
+            lo, hi = self._prefix_range(token)
+            if lo == hi:
+                return None
+            start, end = self.offsets[lo], self.offsets[hi]
+            # Label entier commençant par token, sinon mot commençant par token
+            quality = np.where(self.full[start:end], PREFIX, TOKEN_PREFIX)
+            if self.terms[lo] == token:
+                exact = self.offsets[lo + 1] - start
+                quality[:exact] = np.where(self.full[start:start + exact], EXACT, PREFIX)
+            return self.doc[start:end], quality
+        if stage == 1:
+            term_ids = self._substring_terms(token)
+            return (self.doc[csr_ranges(self.offsets, term_ids)], SUBSTRING) if term_ids else None
+        matches = self._fuzzy_terms(token)
+        if not matches:
+            return None
+        term_ids, distances = zip(*matches)
+        lengths = self.offsets[np.asarray(term_ids) + 1] - self.offsets[np.asarray(term_ids)]
+        return self.doc[csr_ranges(self.offsets, term_ids)], np.repeat(FUZZY / np.asarray(distances), lengths)
+
+    # --- scores par nœud ---
+
+    def _token_scores(self, scores, token, stage, fields):
+        """Met à jour scores (meilleur score par nœud, 0 si non trouvé) avec token à cette étape"""
+        if "label" in fields:
+            matches = self._label_matches(token, stage)
+            if matches is not None:
+                docs, quality = matches
+                _assign_max(scores, docs, quality * FIELD_WEIGHTS["label"])
+
+        # Petits vocabulaires : préfixes et sous-chaînes comparés dès la première étape
+        if stage == 1:
+            return
+        category_stage = max(stage, 1)
+
+        if "type" in fields:
+            table = self._category_table(self.types, token, category_stage, FIELD_WEIGHTS["type"])
+            if table is not None:
+                np.maximum(scores, table[self.columns.node_type], out=scores)
+
+        if "relation" in fields:
+            table = self._category_table(self.relations, token, category_stage, FIELD_WEIGHTS["relation"])
+            if table is not None:
+                # Score de la relation reporté sur les nœuds qu'elle touche
+                for code in np.flatnonzero(table[:-1]).tolist():
+                    _assign_max(scores, self.relation_nodes[code], table[code])
+
+    @staticmethod
+    def _category_table(vocabulary, token, stage, weight):
+        """Table code -> score (la dernière case sert au code MISSING, -1) ; None si rien ne correspond"""
+        table = np.zeros(len(vocabulary) + 1, dtype=np.float64)
+        for code, value in enumerate(vocabulary):
+            table[code] = match_quality(token, value, stage) * weight
+        return table if table.any() else None
+
+    # --- requête ---
+
+    def search(self, query, k=10, fields=DEFAULT_FIELDS):
+        """SearchResult des k meilleurs nœuds pour la requête (mémoïsé par requête).
+
+        Tous les mots de la requête doivent correspondre ; la requête entière peut aussi
+        être un début de label ("machine lea"). La recherche approchée n'est tentée
+        que s'il y a moins de k résultats.
+        """
+        key = (query, k, tuple(fields))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        result = self._search(normalize(query), k, fields)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > MAX_CACHED_QUERIES:
+                self._cache.popitem(last=False)
+        return result
+
+    def _search(self, query, k, fields):
+        tokens = list(dict.fromkeys(TOKEN_RE.findall(query)))
+        if not tokens or not self.nodes or k <= 0:
+            return SearchResult(np.zeros(0, dtype=np.int64), np.zeros(0), 0, True)
+
+        # Scores denses par mot (et pour la phrase entière) ; seuls les nœuds trouvés sont relus
+        n = len(self.nodes)
+        token_scores = [np.zeros(n, dtype=np.float64) for _ in tokens]
+        phrase_scores = np.zeros(n, dtype=np.float64) if tokens != [query] else None
+        weight = max(FIELD_WEIGHTS[f] for f in fields)
+
+        exhaustive = True
+        for stage, name in enumerate(STAGES):
+            # Recherche approchée seulement en dernier recours (moins de k résultats)
+            if name == "fuzzy" and (len(found) >= k or not any(len(t) >= FUZZY_MIN_LENGTH for t in tokens)):
+                break
+            for token, scores in zip(tokens, token_scores):
+                self._token_scores(scores, token, stage, fields)
+            if phrase_scores is not None and stage == 0:
+                self._token_scores(phrase_scores, query, stage, fields)
+
+            # Nœuds où tous les mots correspondent (score moyen), ou dont le label commence par la phrase
+            matched = np.logical_and.reduce([scores > 0 for scores in token_scores])
+            if phrase_scores is not None:
+                matched |= phrase_scores > 0
+            found = np.flatnonzero(matched)
+            combined = sum(scores[found] for scores in token_scores) / len(tokens)
+            if len(tokens) > 1:
+                combined *= np.logical_and.reduce([scores[found] > 0 for scores in token_scores])
+            if phrase_scores is not None:
+                combined = np.maximum(combined, phrase_scores[found])
+            ranked = combined + self.static[found]
+            top = np.argpartition(-ranked, k - 1)[:k] if len(found) > k else np.arange(len(found))
+
+            # Sous-chaînes inutiles si elles ne peuvent pas déloger le k-ième résultat
+            if name == "prefix" and len(found) >= k:
+                bound = ((len(tokens) - 1) * EXACT + SUBSTRING) / len(tokens) * weight + self._max_static
+                if ranked[top].min() >= bound:
+                    exhaustive = False
+                    break
+
+        # Ordre : score décroissant, puis ordre du graphe
+        top = top[np.lexsort((found[top], -ranked[top]))]
+        return SearchResult(found[top], ranked[top], len(found), exhaustive)
+
+    def hits(self, query, k=10, fields=DEFAULT_FIELDS):
+        """(nœuds, total, exhaustif) : les k meilleurs nœuds et le nombre de correspondances trouvées"""
+        result = self.search(query, k, fields)
+        return [self.nodes[p] for p in result.positions.tolist()], result.total, result.exhaustive
@@ -0,0 +1,127 @@
+"""Extraction map-reduce des CV longs : une requête Gemini par plage de pages.
+
+Les sections sont extraites en parallèle (durée ≈ section la plus lente), puis les
+sous-graphes bruts sont concaténés et passent une seule fois par
+validate_and_enhance_graph : la normalisation des ids fusionne les entités
+communes et l'inférence tourne sur l'union. Une section en échec se relance seule.
+"""
+import copy
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from batch_extract import RateLimiter, extract_with_retry
+from extraction import generate, parse_graph_response, prepare_contents
+from graph_logic import validate_and_enhance_graph
+from metrics import metrics, sized
+from prompts import SECTION_PROMPT
+
+# Pages par section : assez pour garder le contexte d'une expérience, assez peu pour paralléliser
+DEFAULT_PAGES_PER_SECTION = 2
+
+
+def split_pdf(file_bytes, pages_per_section=DEFAULT_PAGES_PER_SECTION):
+    """Découpe le PDF en sous-PDF de `pages_per_section` pages : [(première, dernière page, octets)].
+
+    Sans pypdf ou sur un PDF illisible, une seule section couvre tout le document.
+    """
+    try:
+        from pypdf import PdfReader, PdfWriter
+
+        reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(reader.pages)
+        if page_count <= pages_per_section:
+            return [(1, page_count, file_bytes)]
+
+        sections = []
+        for start in range(0, page_count, pages_per_section):
+            writer = PdfWriter()
+            for page in reader.pages[start:start + pages_per_section]:
+                writer.add_page(page)
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            sections.append((start + 1, min(start + pages_per_section, page_count), buffer.getvalue()))
+        return sections
+    except Exception:
+        return [(1, None, file_bytes)]
+
+
+def extract_section(model, contents, timeout=None):
+    """Sous-graphe brut d'une section (validé plus tard, sur l'union)"""
+    response = generate(model, contents, timeout)
+    with metrics.timer("parse"):
+        return parse_graph_response(response.text)
+
+
+@sized
+class SectionedExtraction:
+    """État d'une extraction par sections : sous-graphes obtenus et sections en échec"""
+
+    def __init__(self, file_bytes, pages_per_section=DEFAULT_PAGES_PER_SECTION, pre_extract_text=False):
+        self.sections = []
+        splits = split_pdf(file_bytes, pages_per_section)
+        for i, (first_page, last_page, section_bytes) in enumerate(splits):
+            prompt = SECTION_PROMPT.format(part=i + 1, parts=len(splits), first_page=first_page,
+                                           last_page=last_page or "end")
+            contents, report = prepare_contents(section_bytes, pre_extract_text, prompt)
+            self.sections.append({
+                "index": i,
+                "pages": (first_page, last_page),
+                "contents": contents,
+                "input": report,
+            })
+        self.results = {}   # index -> sous-graphe brut
+        self.errors = {}    # index -> message d'erreur
+        self.seconds = {}   # index -> durée de la dernière tentative
+
+    def pending(self):
+        """Index des sections sans sous-graphe (jamais lancées ou en échec)"""
+        return [s["index"] for s in self.sections if s["index"] not in self.results]
+
+    def run(self, model, max_workers=4, retries=2, indexes=None, progress=None, timeout=None, should_stop=None):
+        """Extrait les sections demandées (par défaut : celles en attente) en parallèle.
+
+        progress(section, done, total) est appelé dans le thread appelant (compatible Streamlit).
+        timeout borne chaque appel Gemini ; si should_stop() devient vrai, les sections
+        pas encore lancées sont abandonnées (elles restent en attente).
+        """
+        indexes = self.pending() if indexes is None else indexes
+        limiter = RateLimiter(0)
+
+        def timed_extract(section):
+            started_at = time.perf_counter()
+            try:
+                return extract_with_retry(model, section["contents"], limiter, retries,
+                                          extract=lambda m, c: extract_section(m, c, timeout))[0]
+            finally:
+                self.seconds[section["index"]] = round(time.perf_counter() - started_at, 3)
+
+        if not indexes:
+            return self
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(indexes))) as pool:
+            futures = {pool.submit(timed_extract, self.sections[i]): self.sections[i] for i in indexes}
+            for done, future in enumerate(as_completed(futures), 1):
+                section = futures[future]
+                try:
+                    self.results[section["index"]] = future.result()
+                    self.errors.pop(section["index"], None)
+                except Exception as e:
+                    self.errors[section["index"]] = f"{type(e).__name__}: {e}"
+                if progress:
+                    progress(section, done, len(futures))
+                if should_stop and should_stop():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return self
+
+    def merge(self):
+        """Union des sous-graphes (ordre des sections) validée et enrichie en une seule passe"""
+        union = {"nodes": [], "edges": []}
+        for index in sorted(self.results):
+            # Copie : la validation modifie les nodes (ids, importance) et merge() peut être rappelé
+            subgraph = copy.deepcopy(self.results[index])
+            union["nodes"].extend(subgraph.get("nodes", []))
+            union["edges"].extend(subgraph.get("edges", []))
+        with metrics.timer("validate", mode="sections"):
+            return validate_and_enhance_graph(union)
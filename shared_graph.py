@@ -0,0 +1,125 @@
+"""Graphes en lecture seule partagés par toutes les sessions du process.
+
+Un graphe partagé est figé (dicts non modifiables, listes en tuples) et porte son
+GraphIndex déjà construit : les sessions n'en gardent qu'une référence. Pour le
+modifier, une session travaille sur une copie (thaw), jamais sur l'original.
+"""
+import threading
+from collections import OrderedDict
+
+from graph_index import GraphIndex
+from metrics import sized
+
+
+class FrozenDict(dict):
+    """dict en lecture seule (reste sérialisable en JSON comme un dict)"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared graph is read-only: use thaw() to get a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def freeze(value):
+    """Copie figée d'un graphe JSON : dict -> FrozenDict, list -> tuple"""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Copie modifiable (dicts et listes ordinaires) d'un graphe figé"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+@sized
+class SharedGraph:
+    """Graphe figé + index précalculé (filtre « tous types », incidence Skills × Projects, recherche)"""
+
+    def __init__(self, data):
+        self.data = freeze(data)
+        self.index = GraphIndex(self.data)
+        self.version = self.index.version
+        self.index.filter_by_types(self.index.type_counts())
+        self.index.incidence_matrix('USES', 'Skill', 'Project')
+        self.index.search_index
+
+
+class GraphStore:
+    """Graphes partagés du process, dédupliqués par empreinte de contenu (LRU borné).
+
+    Les graphes épinglés (démo) ne sont jamais évincés. Une session qui référence
+    un graphe évincé le garde vivant ; elle retombe simplement sur un index à elle.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._graphs = OrderedDict()    # version -> SharedGraph
+        self._by_nodes = {}             # id(data['nodes']) -> SharedGraph
+        self._pinned = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def share(self, data, pin=False):
+        """SharedGraph pour ce contenu : existant si déjà partagé, sinon créé"""
+        shared = self.get(data)
+        if shared is not None:
+            with self._lock:
+                self.hits += 1
+        else:
+            candidate = SharedGraph(data)
+            with self._lock:
+                shared = self._graphs.get(candidate.version)
+                if shared is None:
+                    self.misses += 1
+                    shared = self._graphs[candidate.version] = candidate
+                    self._by_nodes[id(shared.data['nodes'])] = shared
+                else:
+                    self.hits += 1
+        with self._lock:
+            if shared.version in self._graphs:
+                self._graphs.move_to_end(shared.version)
+            if pin:
+                self._pinned.add(shared.version)
+            self._evict()
+        return shared
+
+    def get(self, data):
+        """SharedGraph dont `data` est le graphe figé (même objet), sinon None"""
+        shared = self._by_nodes.get(id(data.get('nodes')))
+        return shared if shared is not None and shared.data is data else None
+
+    def _evict(self):
+        for version in list(self._graphs):
+            if len(self._graphs) <= self.max_entries:
+                break
+            if version not in self._pinned:
+                evicted = self._graphs.pop(version)
+                self._by_nodes.pop(id(evicted.data['nodes']), None)
+
+    def shared_objects(self):
+        """Objets partagés (graphes et index), à exclure de la mémoire par session"""
+        with self._lock:
+            return [obj for shared in self._graphs.values() for obj in (shared.data, shared.index)]
+
+    def stats(self):
+        with self._lock:
+            return {"graphs": len(self._graphs), "pinned": len(self._pinned),
+                    "hits": self.hits, "misses": self.misses}
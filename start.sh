@@ -1,9 +1,10 @@
 #!/bin/bash
 # start.sh
 
-# Start Streamlit in background
+# Start Streamlit in background (served under /app, the demo snapshot is served by Caddy)
 streamlit run app.py \
     --server.port=8501 \
+    --server.baseUrlPath=app \
     --server.address=127.0.0.1 \
     --server.headless=true \
     --server.runOnSave=false &
@@ -0,0 +1,67 @@
+"""Forme en colonnes : aller-retour exact avec le JSON d'origine et cohérence avec GraphIndex."""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from columnar_graph import MISSING, ColumnarGraph
+from graph_index import GraphIndex
+
+DEMO = Path(__file__).resolve().parent.parent / "demo_cv_data.json"
+
+
+def dumps(data):
+    # Sans sort_keys : l'ordre des clés de chaque élément doit aussi être retrouvé
+    return json.dumps(data, ensure_ascii=False)
+
+
+def test_demo_round_trip_is_exact():
+    demo = json.loads(DEMO.read_text(encoding="utf-8"))
+    restored = ColumnarGraph.from_json(demo).to_json()
+    assert restored == demo
+    assert dumps(restored) == dumps(demo)
+
+
+@pytest.mark.parametrize("data", [
+    {"nodes": [], "edges": []},
+    # Ids en double, edge pendante, label absent, clés dans un ordre différent
+    {"nodes": [{"id": "a", "type": "Skill"}, {"type": "Project", "id": "a", "label": "A"}, {"id": "b"}],
+     "edges": [{"from": "a", "to": "b", "label": "USES"}, {"label": "USES", "to": "ghost", "from": "a"},
+               {"from": "b", "to": "a"}]},
+    # Attributs numériques, mixtes, imbriqués, et clés de premier niveau en plus
+    {"meta": {"source": "cv.pdf"},
+     "nodes": [{"id": 1, "importance": 7, "weight": 0.5, "tags": ["x"]},
+               {"id": "n2", "importance": 3, "weight": 1, "tags": None, "level": True}],
+     "edges": [{"from": 1, "to": "n2", "label": "RELATED_TO", "score": 2 ** 70}],
+     "version": 2},
+])
+def test_edge_cases_round_trip(data):
+    restored = ColumnarGraph.from_json(data).to_json()
+    assert restored == data
+    assert dumps(restored) == dumps(data)
+    assert [type(v) for n in restored["nodes"] for v in n.values()] == \
+        [type(v) for n in data["nodes"] for v in n.values()]
+
+
+def test_columns_are_typed_arrays():
+    demo = json.loads(DEMO.read_text(encoding="utf-8"))
+    graph = ColumnarGraph.from_json(demo)
+    assert graph.src.dtype == np.int32 and graph.dst.dtype == np.int32
+    assert graph.node_column("label").kind == "str"
+    assert graph.node_column("importance").kind == "int"
+    # Types de nœuds : mêmes codes que la colonne "type"
+    assert graph.node_type is graph.node_column("type").values
+    assert graph.edge_label.max() < len(graph.labels) and graph.edge_label.min() > MISSING
+
+
+def test_structure_matches_index_without_attributes():
+    demo = json.loads(DEMO.read_text(encoding="utf-8"))
+    full = ColumnarGraph.from_json(demo)
+    index = GraphIndex(demo)
+    assert index.columns.node_records is None
+    for name in ("node_position", "src", "dst", "node_type", "edge_label", "out_offsets", "out_edges"):
+        assert np.array_equal(getattr(full, name), getattr(index.columns, name))
+    assert full.types == index.columns.types and full.labels == index.columns.labels
+    with pytest.raises(ValueError):
+        index.columns.to_json()
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+
+
+class ViewCache:
+    """Cache LRU borné des vues construites (figures Plotly, listes Node/Edge agraph).
+
+    Les clés commencent par la version (empreinte) du graphe : deux sessions qui
+    affichent le même graphe avec les mêmes filtres partagent la même figure.
+    Les valeurs mises en cache ne doivent pas être modifiées par l'appelant.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, builder):
+        """Retourne la vue en cache pour `key`, ou la construit avec builder()"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Construction hors verrou : une construction lente ne bloque pas les autres sessions
+        value = builder()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """Compteurs hits / misses / évictions"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
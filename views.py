@@ -0,0 +1,349 @@
+import pandas as pd
+import plotly.graph_objects as go
+from streamlit_agraph import Config, Edge, Node
+
+from graph_logic import COLOR_MAP, SPACING_CONFIGS, calculate_node_size
+
+# Couleurs Sankey par type (versions rgba des couleurs du Network Graph)
+SANKEY_COLOR_MAP = {
+    "Person": "rgba(255, 75, 75, 0.8)",
+    "Role": "rgba(243, 156, 18, 0.8)",
+    "Skill": "rgba(0, 173, 238, 0.8)",
+    "Project": "rgba(46, 204, 113, 0.8)",
+    "Entity": "rgba(155, 89, 182, 0.8)",
+    "Concept": "rgba(149, 165, 166, 0.8)"
+}
+
+
+def build_network_config(spacing_level, static_layout=False):
+    """Configuration agraph (vis.js) pour un niveau d'espacement donné"""
+    if static_layout:
+        # Positions x/y fournies par le serveur : pas de stabilisation dans le navigateur
+        return Config(
+            width=1600,
+            height=900,
+            directed=True,
+            physics=False,
+            nodeHighlightBehavior=True,
+            highlightColor="#FFD700",
+            collapsible=True
+        )
+    
+    # Récupérer les paramètres d'espacement
+    spacing_params = SPACING_CONFIGS.get(spacing_level, SPACING_CONFIGS["Large"])
+    
+    config = Config(
+        width=1600,  # Réduit pour fit tous les écrans
+        height=900,  # Réduit pour fit Full HD (1080p)
+        directed=True,
+        physics=True,
+        nodeHighlightBehavior=True,
+        highlightColor="#FFD700",
+        collapsible=True,
+        physicsOptions={
+            "barnesHut": {
+                "gravitationalConstant": spacing_params["gravity"],  # Paramètre ajustable
+                "centralGravity": 0.1,
+                "springLength": spacing_params["spring"],            # Paramètre ajustable
+                "springConstant": 0.02,
+                "damping": 0.5,
+                "avoidOverlap": 1
+            },
+            "solver": "barnesHut",
+            "stabilization": {
+                "enabled": True,
+                "iterations": 500,
+                "updateInterval": 25,
+                "fit": True
+            },
+            "minVelocity": 0.75
+        }
+    )
+    return config
+
+
+def build_network_elements(index, selected_types, focus=None, show_edge_labels=False, positions=None,
+                           importance=None):
+    """Listes Node/Edge agraph pour les types sélectionnés, avec atténuation hors focus.
+
+    focus : Focus (index.focus) des nœuds et edges mis en avant, ou None (tout est actif)
+    positions : tableau (n, 2) aligné sur index.nodes (layout serveur), ou None pour la physique vis.js
+    importance : tableau aligné sur index.nodes (index.analytics.importance), ou None pour celle du LLM
+    """
+    filtered_nodes_data, filtered_node_ids, filtered_edge_ids = index.filter_by_types(selected_types)
+
+    # Nodes et edges actifs : ceux du focus (voisinage, chemin), sinon tout le filtre
+    if focus is not None:
+        active_node_ids = focus.nodes
+        active_edge_ids = focus.edges
+    else:
+        active_node_ids = filtered_node_ids
+        active_edge_ids = set(filtered_edge_ids)
+
+    nodes = [
+        network_node(index, n, focus is None or n['id'] in active_node_ids, positions, importance)
+        for n in filtered_nodes_data
+    ]
+    edges = [
+        network_edge(index.edges[edge_id], focus is None or edge_id in active_edge_ids, show_edge_labels)
+        for edge_id in filtered_edge_ids
+    ]
+    return nodes, edges
+
+
+def network_node(index, n, active=True, positions=None, importance=None):
+    """Node agraph d'un nœud du graphe (atténué s'il est hors focus)"""
+    node_color = COLOR_MAP.get(n['type'], "#BDC3C7")
+    if importance is None:
+        node_size = calculate_node_size(n['type'], n.get('importance', 5))
+    else:
+        node_size = calculate_node_size(n['type'], float(importance[index.position(n['id'])]))
+
+    # Appliquer le style atténué si pas dans le focus
+    if not active:
+        # Couleur grise et taille réduite pour les nodes non connectés
+        node_color = "#E0E0E0"
+        node_size = node_size * 0.6
+
+    # Coordonnées fixes si le layout est calculé côté serveur
+    coordinates = {}
+    if positions is not None:
+        x, y = positions[index.position(n['id'])]
+        coordinates = {'x': round(float(x), 1), 'y': round(float(y), 1)}
+
+    return Node(
+        id=n['id'],
+        label=n['label'],
+        size=node_size,
+        color=node_color,
+        shape="dot",
+        **coordinates
+    )
+
+
+def network_edge(e, active=True, show_edge_labels=False):
+    """Edge agraph d'une relation du graphe (grisée si elle est hors focus)"""
+    edge_color = "#95A5A6" if active else "#E8E8E8"
+
+    # Afficher le label seulement si demandé par l'utilisateur ET si l'edge est active
+    edge_label = ''
+    if show_edge_labels and active:
+        edge_label = e.get('label', '')
+
+    return Edge(
+        source=e['from'],
+        target=e['to'],
+        label=edge_label,
+        color=edge_color
+    )
+
+
+def create_sankey_diagram(data, importance=None):
+    """Crée un diagramme Sankey montrant les flux Person → Skills → Projects → Concepts
+
+    importance : {id: importance} (index.analytics.importance_by_id), ou None pour celle du LLM
+    """
+    
+    # Créer un mapping id -> index
+    node_dict = {node['id']: i for i, node in enumerate(data['nodes'])}
+    
+    # Préparer les nodes
+    node_labels = [node['label'] for node in data['nodes']]
+    node_colors = [SANKEY_COLOR_MAP.get(node['type'], "rgba(189, 195, 199, 0.8)") for node in data['nodes']]
+    
+    # Préparer les liens avec values basées sur l'importance
+    sources = []
+    targets = []
+    values = []
+    link_colors = []
+    
+    for edge in data['edges']:
+        if edge['from'] in node_dict and edge['to'] in node_dict:
+            sources.append(node_dict[edge['from']])
+            targets.append(node_dict[edge['to']])
+            
+            # value basée sur l'importance du nœud cible
+            if importance is None:
+                target_node = data['nodes'][node_dict[edge['to']]]
+                values.append(target_node.get('importance', 5))
+            else:
+                values.append(importance.get(edge['to'], 5))
+            
+            # Couleur du lien = couleur du nœud source avec transparence
+            source_node = data['nodes'][node_dict[edge['from']]]
+            link_colors.append(SANKEY_COLOR_MAP.get(source_node['type'], "rgba(189, 195, 199, 0.4)").replace("0.8", "0.3"))
+    
+    # Créer le diagramme Sankey
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=40,  # EXTRÊME : 40px entre nodes (+33% vs V7.5)
+            thickness=15,  # Très fin : 15px (-25% vs V7.5)
+            line=dict(color="white", width=2),
+            label=node_labels,
+            color=node_colors,
+            hovertemplate='%{label}<br>Importance: %{value}<extra></extra>'
+        ),
+        link=dict(
+            source=sources,
+            target=targets,
+            value=values,
+            color=link_colors,
+            hovertemplate='%{source.label} → %{target.label}<br>Importance: %{value}<extra></extra>'
+        ),
+        # Paramètres d'arrangement
+        arrangement='snap',
+        orientation='h'
+    )])
+    
+    fig.update_layout(
+        title={
+            'text': "Career Flow: Skills → Projects → Expertise",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 24, 'family': 'Verdana, Segoe UI, Noto Sans, sans-serif'}
+        },
+        font=dict(
+            size=14,  # Réduit de 15 à 14 (labels moins volumineux)
+            family="Verdana, Segoe UI, Noto Sans, sans-serif", 
+            color="#000000"
+        ),
+        height=1500,  # EXTRÊME : 1500px (+25% vs V7.5)
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=10, r=10, t=80, b=10)
+    )
+    
+    # Désactiver les effets de bordure/ombre sur les labels
+    fig.update_traces(
+        textfont=dict(
+            family="Verdana, Segoe UI, Noto Sans, sans-serif",
+            size=14,  # Cohérent avec font global
+            color="#000000"
+        )
+    )
+    
+    return fig
+
+
+def create_skills_matrix(index, node_mask=None, importance=None):
+    """Crée une matrice heatmap Skills × Projects (importance : tableau aligné sur index.nodes, ou None)"""
+    
+    # Incidence USES (construite une fois par graphe) pondérée par l'importance des skills,
+    # le filtre de catégories n'est qu'un masque lignes/colonnes
+    skill_positions, project_positions, matrix = index.weighted_incidence('USES', 'Skill', 'Project', node_mask,
+                                                                          importance)
+    
+    if len(skill_positions) == 0 or len(project_positions) == 0:
+        return None
+    
+    skill_labels = [index.nodes[p]['label'] for p in skill_positions]
+    project_labels = [index.nodes[p]['label'] for p in project_positions]
+    
+    # Créer le DataFrame
+    df = pd.DataFrame(matrix, index=skill_labels, columns=project_labels)
+    
+    # Créer la heatmap
+    fig = go.Figure(data=go.Heatmap(
+        z=df.values,
+        x=df.columns,
+        y=df.index,
+        colorscale=[
+            [0, 'rgba(240, 240, 240, 0.3)'],      # Pas utilisé (gris très clair)
+            [0.3, 'rgba(135, 206, 235, 0.5)'],    # Faible importance (bleu clair)
+            [0.6, 'rgba(0, 173, 238, 0.7)'],      # Moyenne importance (bleu)
+            [1, 'rgba(0, 123, 167, 0.9)']         # Haute importance (bleu foncé)
+        ],
+        text=df.values,
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        hovertemplate='<b>%{y}</b><br>Project: %{x}<br>Importance: %{z}<extra></extra>',
+        showscale=True,
+        colorbar=dict(
+            title="Importance",
+            titleside="right",
+            tickmode="linear",
+            tick0=0,
+            dtick=2
+        )
+    ))
+    
+    fig.update_layout(
+        title={
+            'text': "Skills × Projects Matrix",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 20}
+        },
+        xaxis=dict(
+            title="Projects",
+            tickangle=-45,
+            side='top'
+        ),
+        yaxis=dict(
+            title="Skills",
+            autorange='reversed'
+        ),
+        font=dict(size=11, family="Arial"),
+        height=600 + len(skill_labels) * 25,  # Hauteur dynamique
+        plot_bgcolor='white',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig
+
+
+def create_network_figure(index, positions):
+    """Network Graph en figure Plotly autonome (snapshot statique) : layout serveur, une trace par type
+
+    positions : tableau (n, 2) aligné sur index.nodes (layout.force_layout)
+    Chaque point porte l'id du nœud (customdata) pour le focus au clic côté navigateur.
+    """
+    # Edges : un seul tracé de segments (None sépare deux segments)
+    xs, ys = [], []
+    for source, target in zip(index.edge_sources.tolist(), index.edge_targets.tolist()):
+        if source < 0 or target < 0:
+            continue
+        xs += [float(positions[source][0]), float(positions[target][0]), None]
+        ys += [float(positions[source][1]), float(positions[target][1]), None]
+    traces = [go.Scatter(x=xs, y=ys, mode='lines', line=dict(color="#95A5A6", width=1),
+                         hoverinfo='skip', showlegend=False, name='edges')]
+
+    # Nœuds : une trace par type (la légende sert de filtre de catégories)
+    for node_type in sorted(index.type_counts()):
+        node_positions = index.node_positions_of_type(node_type)
+        nodes = [index.nodes[p] for p in node_positions.tolist()]
+        points = positions[node_positions]
+        traces.append(go.Scatter(
+            x=[round(float(x), 1) for x, _ in points],
+            y=[round(float(y), 1) for _, y in points],
+            mode='markers+text',
+            name=node_type,
+            text=[n['label'] for n in nodes],
+            textposition='bottom center',
+            customdata=[n['id'] for n in nodes],
+            marker=dict(
+                # Même échelle relative que le Network Graph (calculate_node_size), en pixels Plotly
+                size=[calculate_node_size(node_type, n.get('importance', 5)) / 2 for n in nodes],
+                color=COLOR_MAP.get(node_type, "#BDC3C7"),
+                line=dict(color="white", width=1)
+            ),
+            hovertext=[f"{n['label']}<br>{node_type} • {n.get('importance', '?')}/10 • "
+                       f"{index.degree(n['id'])} connexions" for n in nodes],
+            hoverinfo='text'
+        ))
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        showlegend=True,
+        legend=dict(orientation='h', y=-0.02),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor='x'),
+        height=900,
+        margin=dict(l=10, r=10, t=10, b=10),
+        plot_bgcolor='white',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Verdana, Segoe UI, Noto Sans, sans-serif", size=11),
+        hovermode='closest',
+        dragmode='pan'
+    )
+    return fig